@@ -0,0 +1,343 @@
+"""
+Micro-benchmarks of the data structures used by the searches.
+
+Every operation of Queue, Stack and PriorityQueue is timed with timeit under FIFO,
+LIFO, random priority and monotone priority workloads, next to collections.deque,
+heapq and list doing the same, along with the memory each element takes. A run can
+be saved as a baseline JSON file, and later runs compared against it:
+
+    python -m src.benchmarks.data_structures_benchmark --save-baseline
+    python -m src.benchmarks.data_structures_benchmark --baseline
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import timeit
+import tracemalloc
+from collections import deque
+from heapq import heappop
+from heapq import heappush
+
+from src.data_structures import PriorityQueue
+from src.data_structures import Queue
+from src.data_structures import Stack
+
+
+DEFAULT_SIZES = [100, 1000]  # elements put in each structure before emptying it
+DEFAULT_SEED = 0  # the seed of the random priorities
+REPETITIONS = 7  # timed runs of each operation, summarized in the results
+WARMUP = 2  # runs of each operation before the timed ones, thrown away
+# the elements the memory is measured with, enough for the free lists of Python
+# reusing some of the memory to be negligible
+MEMORY_ELEMENTS = 100_000
+THRESHOLD = 0.25  # a median this much slower than the baseline is a regression
+BASELINE_PATH = "data_structures_baseline.json"  # where baselines are saved
+
+# how each structure is made, then given an element, peeked at and emptied of one,
+# as timeit statements: the element is v and its priority p
+WORKLOADS = {
+    "fifo": {
+        "Queue": ("s = Queue()", "s.enqueue(v)", "s.peek()", "s.dequeue()"),
+        "deque": ("s = deque()", "s.append(v)", "s[0]", "s.popleft()"),
+        "list": ("s = []", "s.append(v)", "s[0]", "s.pop(0)"),
+    },
+    "lifo": {
+        "Stack": ("s = Stack()", "s.push(v)", "s.peek()", "s.pop()"),
+        "deque": ("s = deque()", "s.append(v)", "s[-1]", "s.pop()"),
+        "list": ("s = []", "s.append(v)", "s[-1]", "s.pop()"),
+    },
+    "random_priority": {
+        "PriorityQueue": (
+            "s = PriorityQueue()",
+            "s.enqueue(v, p)",
+            "s.peek()",
+            "s.dequeue()",
+        ),
+        "heapq": ("s = []", "heappush(s, (p, v))", "s[0]", "heappop(s)"),
+    },
+}
+WORKLOADS["monotone_priority"] = WORKLOADS["random_priority"]
+# the names of the operations of each workload: adding, peeking and removing
+OPERATIONS = {
+    "fifo": ("enqueue", "peek", "dequeue"),
+    "lifo": ("push", "peek", "pop"),
+    "random_priority": ("enqueue", "peek", "dequeue"),
+    "monotone_priority": ("enqueue", "peek", "dequeue"),
+}
+NAMESPACE = {
+    "Queue": Queue,
+    "Stack": Stack,
+    "PriorityQueue": PriorityQueue,
+    "deque": deque,
+    "heappush": heappush,
+    "heappop": heappop,
+}
+
+
+def make_items(workload: str, size: int, seed: int = DEFAULT_SEED) -> list:
+    """
+    Get the (value, priority) pairs put in the structures
+    """
+    if workload == "random_priority":
+        rng = random.Random(seed)
+        return [(i, rng.random()) for i in range(size)]
+    return [(i, float(i)) for i in range(size)]
+
+
+def time_operation(
+    workload: str,
+    structure: str,
+    operation: int,
+    items: list,
+    repetitions: int = REPETITIONS,
+    warmup: int = WARMUP,
+) -> dict:
+    """
+    Time one operation of a structure done once for each item, on a structure
+    holding every item for the peeks and removals
+    Args:
+        workload (str): the name of the workload in WORKLOADS
+        structure (str): the name of the structure in the workload
+        operation (int): 0 to add, 1 to peek, 2 to remove
+        items (list): the (value, priority) pairs
+        repetitions (int, optional): the number of timed runs
+        warmup (int, optional): the number of runs before the timed ones
+    Returns:
+        dict: the summary of the runs, in nanoseconds per operation
+    """
+    make, add, peek, remove = WORKLOADS[workload][structure]
+    fill = f"for v, p in items:\n    {add}"
+    if operation == 0:
+        setup, stmt = make, fill
+    else:
+        setup = f"{make}\n{fill}"
+        stmt = f"for _ in items:\n    {(peek, remove)[operation - 1]}"
+    timer = timeit.Timer(stmt, setup, globals=dict(NAMESPACE, items=items))
+    # the setup runs again before each run, so every run starts from the same state
+    timer.repeat(repeat=warmup, number=1)
+    times = [t * 1e9 / len(items) for t in timer.repeat(repeat=repetitions, number=1)]
+    return {
+        "workload": workload,
+        "operation": OPERATIONS[workload][operation],
+        "structure": structure,
+        "size": len(items),
+        "repetitions": repetitions,
+        "min_ns": min(times),
+        "median_ns": statistics.median(times),
+        "mean_ns": statistics.mean(times),
+        "stdev_ns": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def memory_per_element(workload: str, structure: str) -> float:
+    """
+    Measure the bytes a structure takes for each element it holds, the elements
+    themselves not included
+    """
+    make, add, _, _ = WORKLOADS[workload][structure]
+    # in order, so the priority queues add them in O(1)
+    items = make_items("monotone_priority", MEMORY_ELEMENTS)
+    namespace = dict(NAMESPACE, items=items)
+    code = compile(f"{make}\nfor v, p in items:\n    {add}", "<benchmark>", "exec")
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        exec(code, namespace)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / len(items)
+
+
+def run_benchmark(
+    workloads=None,
+    sizes=None,
+    seed: int = DEFAULT_SEED,
+    repetitions: int = REPETITIONS,
+    warmup: int = WARMUP,
+    progress=None,
+) -> list:
+    """
+    Time every operation of every structure of the workloads at every size
+    Args:
+        workloads ([type], optional): names of the workloads (defaults to all)
+        sizes ([type], optional): the numbers of elements (defaults to DEFAULT_SIZES)
+        seed (int, optional): the seed of the random priorities
+        repetitions (int, optional): the number of timed runs of each operation
+        warmup (int, optional): the number of runs before the timed ones
+        progress ([type], optional): called with each result as soon as it is ready
+    Returns:
+        list: the summary of each operation, with the bytes per element
+    """
+    workloads = workloads or list(WORKLOADS)
+    sizes = sizes or DEFAULT_SIZES
+
+    results = []
+    memory = {}  # the bytes per element of each structure, whatever the size
+    for size in sizes:
+        for workload in workloads:
+            items = make_items(workload, size, seed)
+            for structure in WORKLOADS[workload]:
+                if (workload, structure) not in memory:
+                    memory[workload, structure] = memory_per_element(
+                        workload, structure
+                    )
+                for operation in range(3):
+                    result = time_operation(
+                        workload, structure, operation, items, repetitions, warmup
+                    )
+                    result["bytes_per_element"] = memory[workload, structure]
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+    return results
+
+
+def environment() -> dict:
+    """
+    Get the interpreter and machine the timings depend on
+    """
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+    }
+
+
+def save_baseline(results: list, path: str) -> None:
+    """
+    Save results as a baseline JSON file, along with the environment they were
+    measured in
+    Args:
+        results (list): the results of run_benchmark
+        path (str): the file to write
+    """
+    baseline = dict(environment(), results=results)
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=1)
+
+
+def find_regressions(
+    results: list,
+    path: str,
+    threshold: float = THRESHOLD,
+    check_environment: bool = True,
+) -> list:
+    """
+    Compare the results with the ones of a baseline file
+    Args:
+        results (list): the results of run_benchmark
+        path (str): the baseline saved by save_baseline
+        threshold (float, optional): how much slower a median can be, 0.25 for 25%
+        check_environment (bool, optional): refuse a baseline measured with another
+            interpreter or on another machine, whose timings are not comparable
+    Returns:
+        list: the (result, its median in the baseline) pairs slower than the
+            threshold, the results missing in the baseline are left out
+    Raises:
+        ValueError: if the environments differ and check_environment is set
+    """
+    with open(path) as file:
+        saved = json.load(file)
+    baseline = saved["results"]
+    if check_environment:
+        differences = [
+            f"{name} {saved.get(name)} instead of {value}"
+            for name, value in environment().items()
+            if saved.get(name) != value
+        ]
+        if differences:
+            raise ValueError(
+                f"The baseline {path} was measured with " + ", ".join(differences)
+            )
+
+    def key(result: dict) -> tuple:
+        return (
+            result["workload"],
+            result["operation"],
+            result["structure"],
+            result["size"],
+        )
+
+    medians = {key(result): result["median_ns"] for result in baseline}
+    return [
+        (result, medians[key(result)])
+        for result in results
+        if key(result) in medians
+        and result["median_ns"] > medians[key(result)] * (1 + threshold)
+    ]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repetitions", type=int, default=REPETITIONS)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--json", help="write the results to a JSON file")
+    parser.add_argument(
+        "--save-baseline", nargs="?", const=BASELINE_PATH, help="save as a baseline"
+    )
+    parser.add_argument(
+        "--baseline", nargs="?", const=BASELINE_PATH, help="compare with a baseline"
+    )
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument(
+        "--any-environment",
+        action="store_true",
+        help="compare with a baseline of another interpreter or machine",
+    )
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'workload':>17} {'operation':>9} {'structure':>13} {'size':>6} "
+        f"{'median ns/op':>12} {'stdev':>8} {'bytes/elem':>10}"
+    )
+
+    def progress(result):
+        print(
+            "{workload:>17} {operation:>9} {structure:>13} {size:>6} "
+            "{median_ns:>12.1f} {stdev_ns:>8.1f} {bytes_per_element:>10.1f}".format(
+                **result
+            )
+        )
+
+    results = run_benchmark(
+        args.workloads,
+        args.sizes,
+        args.seed,
+        args.repetitions,
+        args.warmup,
+        progress,
+    )
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=1)
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+    if args.baseline:
+        try:
+            regressions = find_regressions(
+                results, args.baseline, args.threshold, not args.any_environment
+            )
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            sys.exit(2)
+        for result, median in regressions:
+            print(
+                "regression: {workload} {operation} {structure} {size}: "
+                "{median_ns:.1f} ns/op, ".format(**result)
+                + f"{median:.1f} in the baseline",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Headless benchmark harness for the sorting algorithms.
+
+Every algorithm is run over a range of sizes and input distributions, the results
+are checked against sorted() and written as CSV, along with a log-log scaling chart:
+
+    python -m src.benchmarks.sorting_benchmark --csv sorting.csv --chart sorting.svg
+"""
+import argparse
+import csv
+import math
+import sys
+import time
+import tracemalloc
+
+from src.visualizers.sorting.data_generation import DEFAULT_SEED
+from src.visualizers.sorting.data_generation import DISTRIBUTIONS
+from src.visualizers.sorting.data_generation import generate
+from src.visualizers.sorting.sorting_algorithms import SORTING_ALGORITHMS
+from src.visualizers.sorting.sorting_algorithms import SortTracker
+
+
+DEFAULT_SIZES = [10**2, 10**3, 10**4, 10**5, 10**6]
+
+# the O(n^2) algorithms are only run up to this size by default
+QUADRATIC_SORTS = {"insertion_sort", "selection_sort", "bubble_sort"}
+QUADRATIC_LIMIT = 10**4
+
+# an algorithm slower than this (in seconds) on a distribution is not run on
+# the bigger sizes of that distribution, so a run that degrades cannot stall
+# the whole benchmark
+TIME_LIMIT = 60.0
+
+CSV_FIELDS = [
+    "algorithm",
+    "distribution",
+    "size",
+    "seconds",
+    "comparisons",
+    "swaps",
+    "writes",
+    "reads",
+    "peak_memory_bytes",
+    "correct",
+    "error",
+]
+
+
+def measure(algorithm: str, data: list, track_memory: bool = True) -> dict:
+    """
+    Run a single algorithm on a copy of the data
+    Args:
+        algorithm (str): the name of the algorithm in SORTING_ALGORITHMS
+        data (list): the input to sort, it is left untouched
+        track_memory (bool, optional): also measure the peak memory in a second run
+    Returns:
+        dict: the measurements, keyed by the CSV_FIELDS
+    """
+    sort = SORTING_ALGORITHMS[algorithm]
+    result = {field: "" for field in CSV_FIELDS}
+    result.update(algorithm=algorithm, size=len(data))
+
+    arr = list(data)
+    tracker = SortTracker()
+    try:
+        start = time.perf_counter()
+        sort(arr, tracker)
+        result["seconds"] = time.perf_counter() - start
+    except Exception as e:
+        result["error"] = type(e).__name__
+        result["correct"] = False
+        return result
+
+    result["comparisons"] = tracker.comparisons
+    result["swaps"] = tracker.swaps
+    result["writes"] = tracker.writes
+    result["reads"] = tracker.reads
+    result["correct"] = arr == sorted(data)
+
+    # tracemalloc slows everything down, so the memory is measured in its own run
+    if track_memory:
+        arr = list(data)
+        tracemalloc.start()
+        try:
+            sort(arr, SortTracker())
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmark(
+    algorithms=None,
+    distributions=None,
+    sizes=None,
+    seed: int = DEFAULT_SEED,
+    quadratic_limit: int = QUADRATIC_LIMIT,
+    track_memory: bool = True,
+    progress=None,
+    time_limit: float = TIME_LIMIT,
+) -> list:
+    """
+    Run every combination of algorithm, distribution and size
+    Args:
+        algorithms ([type], optional): names of the algorithms (defaults to all)
+        distributions ([type], optional): names of the distributions (defaults to all)
+        sizes ([type], optional): the input sizes (defaults to 10^2 to 10^6)
+        seed (int, optional): the seed used to generate the inputs
+        quadratic_limit (int, optional): the biggest size to run O(n^2) algorithms on
+        track_memory (bool, optional): measure the peak memory of each run
+        progress ([type], optional): called with each result as soon as it is ready
+        time_limit (float, optional): the seconds after which an algorithm is not
+            run on the bigger sizes of the same distribution
+    Returns:
+        list: the measurements of every run
+    """
+    algorithms = algorithms or list(SORTING_ALGORITHMS)
+    distributions = distributions or list(DISTRIBUTIONS)
+    sizes = sizes or DEFAULT_SIZES
+
+    results = []
+    too_slow = set()
+    for size in sorted(sizes):
+        for distribution in distributions:
+            data = generate(distribution, size, seed)
+            for algorithm in algorithms:
+                if algorithm in QUADRATIC_SORTS and size > quadratic_limit:
+                    continue
+                if (algorithm, distribution) in too_slow:
+                    continue
+                result = measure(algorithm, data, track_memory)
+                result["distribution"] = distribution
+                if result["error"] or result["seconds"] > time_limit:
+                    too_slow.add((algorithm, distribution))
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    return results
+
+
+def write_csv(results: list, file) -> None:
+    writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+
+
+def write_chart(results: list, path: str, distribution: str = "random") -> None:
+    """
+    Write a log-log chart of the running time against the input size as SVG
+    Args:
+        results (list): the measurements from run_benchmark
+        path (str): where to write the chart
+        distribution (str, optional): the distribution to plot
+    """
+    width, height, margin = 800, 500, 60
+    colors = [
+        "#e6194b",
+        "#3cb44b",
+        "#4363d8",
+        "#f58231",
+        "#911eb4",
+        "#42d4f4",
+        "#f032e6",
+        "#9a6324",
+        "#469990",
+        "#808000",
+        "#000075",
+        "#a9a9a9",
+    ]
+
+    series = {}
+    for result in results:
+        if result["distribution"] == distribution and result["seconds"] != "":
+            point = (math.log10(result["size"]), math.log10(result["seconds"] or 1e-9))
+            series.setdefault(result["algorithm"], []).append(point)
+    points = [point for line in series.values() for point in line]
+    if not points:
+        return
+
+    min_x = math.floor(min(x for x, _ in points))
+    max_x = math.ceil(max(x for x, _ in points))
+    min_y = math.floor(min(y for _, y in points))
+    max_y = math.ceil(max(y for _, y in points))
+    span_x = max(max_x - min_x, 1)
+    span_y = max(max_y - min_y, 1)
+
+    def to_svg(x, y):
+        return (
+            margin + (x - min_x) / span_x * (width - 2 * margin),
+            height - margin - (y - min_y) / span_y * (height - 2 * margin),
+        )
+
+    lines = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        'font-family="monospace" font-size="12">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+        f'<text x="{margin}" y="30" font-size="16">'
+        f"Sorting time by input size ({distribution} input)</text>",
+    ]
+    # the grid lines, one for each power of 10
+    for x in range(min_x, max_x + 1):
+        sx, _ = to_svg(x, min_y)
+        lines.append(
+            f'<line x1="{sx}" y1="{margin}" x2="{sx}" y2="{height - margin}" '
+            'stroke="#ddd"/>'
+        )
+        lines.append(
+            f'<text x="{sx}" y="{height - margin + 20}" text-anchor="middle">'
+            f"10^{x}</text>"
+        )
+    for y in range(min_y, max_y + 1):
+        _, sy = to_svg(min_x, y)
+        lines.append(
+            f'<line x1="{margin}" y1="{sy}" x2="{width - margin}" y2="{sy}" '
+            'stroke="#ddd"/>'
+        )
+        lines.append(
+            f'<text x="{margin - 8}" y="{sy + 4}" text-anchor="end">10^{y}s</text>'
+        )
+    # a line and a legend entry for each algorithm
+    for i, (algorithm, line) in enumerate(sorted(series.items())):
+        color = colors[i % len(colors)]
+        coords = " ".join("{:.1f},{:.1f}".format(*to_svg(x, y)) for x, y in line)
+        lines.append(
+            f'<polyline points="{coords}" fill="none" stroke="{color}" '
+            'stroke-width="2"/>'
+        )
+        legend_y = margin + 20 * i
+        lines.append(
+            f'<text x="{width - margin - 130}" y="{legend_y}" fill="{color}">'
+            f"{algorithm}</text>"
+        )
+    lines.append("</svg>")
+
+    with open(path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--algorithms", nargs="+", choices=list(SORTING_ALGORITHMS))
+    parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--quadratic-limit", type=int, default=QUADRATIC_LIMIT)
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT)
+    parser.add_argument("--no-memory", action="store_true", help="skip peak memory")
+    parser.add_argument("--csv", help="write the CSV to a file instead of stdout")
+    parser.add_argument("--chart", help="write an SVG scaling chart to this path")
+    parser.add_argument("--chart-distribution", default="random")
+    args = parser.parse_args(argv)
+
+    def progress(result):
+        print(
+            "{algorithm:>16} {distribution:>14} {size:>8} {seconds}".format(**result),
+            file=sys.stderr,
+        )
+
+    results = run_benchmark(
+        args.algorithms,
+        args.distributions,
+        args.sizes,
+        args.seed,
+        args.quadratic_limit,
+        not args.no_memory,
+        progress,
+        args.time_limit,
+    )
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as file:
+            write_csv(results, file)
+    else:
+        write_csv(results, sys.stdout)
+    if args.chart:
+        write_chart(results, args.chart, args.chart_distribution)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Headless command line: runs, benchmarks and replays printed as JSON.
+
+Nothing is displayed and pygame is not imported, so the runs can be scripted and
+scheduled on hosts without a display:
+
+    python -m src.cli path run --algorithms a_star alt_star --map maze.txt
+    python -m src.cli path bench --sizes 100 200 --seeds 5
+    python -m src.cli sort run --algorithms merge_sort quick_sort --size 100000
+    python -m src.cli sort bench --sizes 1000 10000 --no-memory
+    python -m src.cli replay sort_trace.npz --position 1000
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from src.benchmarks.sorting_benchmark import measure
+from src.benchmarks.sorting_benchmark import QUADRATIC_LIMIT
+from src.benchmarks.sorting_benchmark import run_benchmark
+from src.benchmarks.sorting_benchmark import TIME_LIMIT
+from src.visualizers.pathfinding.grid import Grid
+from src.visualizers.pathfinding.pathfinding_algorithms import distance_map
+from src.visualizers.pathfinding.pathfinding_algorithms import SEARCH_ALGORITHMS
+from src.visualizers.pathfinding.pathfinding_algorithms import SearchTracker
+from src.visualizers.sorting.data_generation import DEFAULT_SEED
+from src.visualizers.sorting.data_generation import DISTRIBUTIONS
+from src.visualizers.sorting.data_generation import generate
+from src.visualizers.sorting.sort_trace import record
+from src.visualizers.sorting.sort_trace import SortTrace
+from src.visualizers.sorting.sort_trace import TRACE_PATH
+from src.visualizers.sorting.sorting_algorithms import SORTING_ALGORITHMS
+
+
+GRID_SIZE = 100  # blocks on each side of the generated grids
+DENSITY = 0.2  # share of the blocks of the generated grids that are walls
+BENCH_SIZES = [50, 100, 200]  # sides of the grids of the pathfinding benchmark
+BENCH_SEEDS = 3  # grids generated for each size of the pathfinding benchmark
+REPEAT = 3  # runs of each search on a grid, the median time is kept
+OPERATION_NAMES = ["compare", "read", "swap", "write"]  # in the order of the codes
+
+
+def can_reach_end(grid: Grid) -> bool:
+    """
+    Tell whether an end can be reached from a start, with a breadth first search
+    on NumPy arrays: the searches are not run when it cannot, since some of them
+    take far longer than the others to prove that there is no path
+    """
+    distances, _ = distance_map(grid, goals=grid.ends)
+    return bool((distances[grid.ends] != -1).any())
+
+
+def search(
+    algorithm: str, grid: Grid, with_path: bool = False, skip: bool = False
+) -> dict:
+    """
+    Run a search on a grid and measure it
+    Args:
+        algorithm (str): the name of the algorithm in SEARCH_ALGORITHMS
+        grid (Grid): the grid to search
+        with_path (bool, optional): add the (x, y) positions of the path
+        skip (bool, optional): do not run the search, when no end can be reached
+    Returns:
+        dict: the length of the path found (None without one), the expansions,
+            discoveries and seconds of the search, all None if it was skipped
+    """
+    result = {"algorithm": algorithm, "skipped": skip, "length": None}
+    if skip:
+        result.update(seconds=None, expansions=None, discoveries=None)
+        if with_path:
+            result["path"] = None
+        return result
+
+    tracker = SearchTracker()
+    start = time.perf_counter()
+    path = SEARCH_ALGORITHMS[algorithm](grid, tracker)
+    result.update(
+        seconds=time.perf_counter() - start,
+        length=None if path is None else len(path) - 1,
+        expansions=tracker.expansions,
+        discoveries=tracker.discoveries,
+    )
+    if with_path:
+        result["path"] = None if path is None else [grid.position(c) for c in path]
+    return result
+
+
+def path_run(args) -> dict:
+    if args.map:
+        grid = Grid.load(args.map, args.start, args.end)
+    else:
+        grid = Grid.generate(
+            args.size,
+            args.size,
+            args.density,
+            args.seed,
+            args.start or (0, 0),
+            args.end,
+        )
+    for cell in grid.starts + grid.ends:
+        if grid.blocked[cell]:
+            raise ValueError(f"The start or end {grid.position(cell)} is a wall")
+    algorithms = args.algorithms or list(SEARCH_ALGORITHMS)
+    reachable = can_reach_end(grid)
+    skip = not reachable and not args.unreachable
+    return {
+        "map": args.map,
+        "width": grid.width,
+        "height": grid.height,
+        "walls": sum(grid.blocked),
+        "starts": [grid.position(cell) for cell in grid.starts],
+        "ends": [grid.position(cell) for cell in grid.ends],
+        "reachable": reachable,
+        "results": [search(name, grid, args.paths, skip) for name in algorithms],
+    }
+
+
+def path_bench(args) -> list:
+    algorithms = args.algorithms or list(SEARCH_ALGORITHMS)
+    results = []
+    for size in args.sizes:
+        for seed in range(args.seed, args.seed + args.seeds):
+            grid = Grid.generate(size, size, args.density, seed)
+            skip = not args.unreachable and not can_reach_end(grid)
+            for algorithm in algorithms:
+                if skip:
+                    result = search(algorithm, grid, skip=True)
+                else:
+                    runs = [search(algorithm, grid) for _ in range(args.repeat)]
+                    result = runs[0]
+                    result["seconds"] = statistics.median(
+                        run["seconds"] for run in runs
+                    )
+                result.update(size=size, seed=seed)
+                results.append(result)
+    return results
+
+
+def sort_run(args) -> list:
+    data = generate(args.distribution, args.size, args.seed)
+    results = []
+    for algorithm in args.algorithms or list(SORTING_ALGORITHMS):
+        result = measure(algorithm, data, not args.no_memory)
+        result["distribution"] = args.distribution
+        results.append(result)
+    if args.trace:
+        record(args.algorithms[0], data).save(args.trace)
+    return results
+
+
+def sort_bench(args) -> list:
+    return run_benchmark(
+        args.algorithms,
+        args.distributions,
+        args.sizes,
+        args.seed,
+        args.quadratic_limit,
+        not args.no_memory,
+        time_limit=args.time_limit,
+    )
+
+
+def replay(args) -> dict:
+    trace = SortTrace.load(args.trace)
+    position = len(trace) if args.position is None else args.position
+    position = min(max(position, 0), len(trace))
+    values = trace.state_at(position)
+    counts = np.bincount(trace.ops, minlength=len(OPERATION_NAMES))
+    result = {
+        "algorithm": trace.algorithm,
+        "size": len(trace.initial),
+        "operations": len(trace),
+        "counts": dict(zip(OPERATION_NAMES, counts.tolist())),
+        "position": position,
+        "sorted": all(a <= b for a, b in zip(values, values[1:])),
+    }
+    if args.values:
+        result["values"] = values
+    return result
+
+
+def position(text: str) -> tuple:
+    x, y = text.split(",")
+    return int(x), int(y)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--indent", type=int, help="indent the JSON printed")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    path_parser = commands.add_parser("path", help="pathfinding searches")
+    path_commands = path_parser.add_subparsers(dest="action", required=True)
+    path_run_parser = path_commands.add_parser("run", help="search a grid")
+    path_run_parser.add_argument(
+        "--map", help="a map file, instead of a generated grid"
+    )
+    path_run_parser.add_argument("--size", type=int, default=GRID_SIZE)
+    path_run_parser.add_argument(
+        "--start", type=position, help="x,y of the start, instead of the map's"
+    )
+    path_run_parser.add_argument(
+        "--end", type=position, help="x,y of the end, instead of the map's"
+    )
+    path_run_parser.add_argument(
+        "--paths", action="store_true", help="print the paths found"
+    )
+    path_run_parser.set_defaults(run=path_run)
+    path_bench_parser = path_commands.add_parser(
+        "bench", help="time the searches on generated grids"
+    )
+    path_bench_parser.add_argument("--sizes", nargs="+", type=int, default=BENCH_SIZES)
+    path_bench_parser.add_argument(
+        "--seeds", type=int, default=BENCH_SEEDS, help="grids of each size"
+    )
+    path_bench_parser.add_argument("--repeat", type=int, default=REPEAT)
+    path_bench_parser.set_defaults(run=path_bench)
+    for subparser in (path_run_parser, path_bench_parser):
+        subparser.add_argument(
+            "--algorithms", nargs="+", choices=list(SEARCH_ALGORITHMS)
+        )
+        subparser.add_argument("--density", type=float, default=DENSITY)
+        subparser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+        subparser.add_argument(
+            "--unreachable",
+            action="store_true",
+            help="run the searches even when no end can be reached",
+        )
+
+    sort_parser = commands.add_parser("sort", help="sorting algorithms")
+    sort_commands = sort_parser.add_subparsers(dest="action", required=True)
+    sort_run_parser = sort_commands.add_parser("run", help="sort one input")
+    sort_run_parser.add_argument("--size", type=int, default=10**4)
+    sort_run_parser.add_argument(
+        "--distribution", choices=list(DISTRIBUTIONS), default="random"
+    )
+    sort_run_parser.add_argument(
+        "--trace",
+        nargs="?",
+        const=TRACE_PATH,
+        help="record the run of the algorithm to replay it",
+    )
+    sort_run_parser.set_defaults(run=sort_run)
+    sort_bench_parser = sort_commands.add_parser(
+        "bench", help="time the algorithms over sizes and distributions"
+    )
+    sort_bench_parser.add_argument(
+        "--distributions", nargs="+", choices=list(DISTRIBUTIONS)
+    )
+    sort_bench_parser.add_argument("--sizes", nargs="+", type=int)
+    sort_bench_parser.add_argument(
+        "--quadratic-limit", type=int, default=QUADRATIC_LIMIT
+    )
+    sort_bench_parser.add_argument("--time-limit", type=float, default=TIME_LIMIT)
+    sort_bench_parser.set_defaults(run=sort_bench)
+    for subparser in (sort_run_parser, sort_bench_parser):
+        subparser.add_argument(
+            "--algorithms", nargs="+", choices=list(SORTING_ALGORITHMS)
+        )
+        subparser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+        subparser.add_argument(
+            "--no-memory", action="store_true", help="skip peak memory"
+        )
+
+    replay_parser = commands.add_parser("replay", help="summarize a recorded sort")
+    replay_parser.add_argument("trace", nargs="?", default=TRACE_PATH)
+    replay_parser.add_argument(
+        "--position", type=int, help="the operations replayed, all by default"
+    )
+    replay_parser.add_argument(
+        "--values", action="store_true", help="print the array at the position"
+    )
+    replay_parser.set_defaults(run=replay)
+    args = parser.parse_args(argv)
+
+    if args.command == "sort" and args.action == "run" and args.trace:
+        if not args.algorithms or len(args.algorithms) != 1:
+            sort_run_parser.error("--trace records a single algorithm")
+    try:
+        result = args.run(args)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+    json.dump(result, sys.stdout, indent=args.indent)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import pygame
 
 from src.visualizers import PathfindingVisualizer
 from src.visualizers import SortingVisualizer
+from src.visualizers.base_visualizer import IDLE_TIMEOUT
 
 
 BLACK = (10, 10, 10)
@@ -29,22 +30,37 @@ class HomeWindow:
             pygame.display.set_icon(icon)
 
         self.__init_components()
+        self._hovered = None  # the hovered state of the buttons on the screen
 
         while not self._stop:
             self.__mainloop()
 
     def __mainloop(self) -> None:
 
-        self._screen.fill(BLACK)
-
         mouse = pygame.mouse.get_pos()
+        hovered = (
+            self.__check_mouse_hovered(self._btn1_w, self._btn1_h, mouse),
+            self.__check_mouse_hovered(self._btn2_w, self._btn2_h, mouse),
+            self.__check_mouse_hovered(self._exit_btn_w, self._exit_btn_h, mouse),
+        )
+        # the menu only changes when a button starts or stops being hovered
+        if hovered != self._hovered:
+            self._hovered = hovered
+            self.__draw(hovered)
+
+        self.__event_handling()
+
+    def __draw(self, hovered) -> None:
+
+        self._screen.fill(BLACK)
+        btn1_hovered, btn2_hovered, exit_hovered = hovered
 
         # render the instruction message
         self._screen.blit(self._message, (self._message_w[0], self._message_h[0]))
 
         # if mouse is hovered on a button then change the button color to light gray
 
-        if self.__check_mouse_hovered(self._btn1_w, self._btn1_h, mouse):
+        if btn1_hovered:
             self.__draw_button(
                 self._screen, LIGHT_GRAY, self._btn1_w[0], self._btn1_h[0]
             )
@@ -53,7 +69,7 @@ class HomeWindow:
                 self._screen, DARK_GRAY, self._btn1_w[0], self._btn1_h[0]
             )
 
-        if self.__check_mouse_hovered(self._btn2_w, self._btn2_h, mouse):
+        if btn2_hovered:
             self.__draw_button(
                 self._screen, LIGHT_GRAY, self._btn2_w[0], self._btn2_h[0]
             )
@@ -62,7 +78,7 @@ class HomeWindow:
                 self._screen, DARK_GRAY, self._btn2_w[0], self._btn2_h[0]
             )
 
-        if self.__check_mouse_hovered(self._exit_btn_w, self._exit_btn_h, mouse):
+        if exit_hovered:
             self.__draw_button(
                 self._screen, LIGHT_GRAY, self._exit_btn_w[0], self._exit_btn_h[0]
             )
@@ -81,17 +97,22 @@ class HomeWindow:
         # updates the frames of the game
         pygame.display.update()
 
-        self.__event_handling(mouse)
+    def __event_handling(self) -> None:
 
-    def __event_handling(self, mouse) -> None:
-
-        for ev in pygame.event.get():
+        # sleep until there are events instead of drawing the same menu again
+        events = [pygame.event.wait(IDLE_TIMEOUT)] + pygame.event.get()
+        for ev in events:
 
             if ev.type == pygame.QUIT:
                 sys.exit(0)
 
+            # the window was uncovered -> draw the menu again
+            if ev.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self._hovered = None
+
             # if a mouse is clicked
             if ev.type == pygame.MOUSEBUTTONDOWN:
+                mouse = ev.pos
 
                 # if the mouse is clicked on the
                 # button the game is terminated
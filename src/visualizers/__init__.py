@@ -1,4 +1,20 @@
-from .pathfinding.pathfinding_visualizer import PathfindingVisualizer
-from .sorting.sorting_visualizer import SortingVisualizer
+"""
+The visualizers are imported when they are first used: they import pygame, which
+the headless modules of the package do without.
+"""
+import importlib
 
-__all__ = ["PathfindingVisualizer", "SortingVisualizer"]
+
+# the module of each visualizer, relative to this package
+VISUALIZERS = {
+    "PathfindingVisualizer": ".pathfinding.pathfinding_visualizer",
+    "SortingVisualizer": ".sorting.sorting_visualizer",
+}
+
+__all__ = list(VISUALIZERS)
+
+
+def __getattr__(name: str):
+    if name not in VISUALIZERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(VISUALIZERS[name], __name__), name)
@@ -2,6 +2,11 @@ from os import path
 
 import pygame
 
+from src.visualizers.frame_profiler import FrameProfiler
+
+
+IDLE_TIMEOUT = 500  # milliseconds an idle screen sleeps at most waiting for events
+
 
 class BaseVisualizer:
     """
@@ -17,6 +22,8 @@ class BaseVisualizer:
         self._screen = pygame.display.set_mode((width, height))
         self._screen.fill(color)
         self._clock = pygame.time.Clock()
+        self._profiler = FrameProfiler(self._screen)  # times every frame
+        self._woken = True  # if the idle screen was woken up by events
         pygame.display.set_caption(title)
 
         if icon_path is not None:
@@ -25,5 +32,24 @@ class BaseVisualizer:
                 pygame.display.set_icon(icon)
 
     def draw(self):
-        pygame.display.update()
-        self._clock.tick(60)
+        self._profiler.present()
+        with self._profiler.phase("wait"):
+            self._clock.tick(60)
+
+    def idle(self) -> list:
+        """
+        Display the frame, then sleep until there are events instead of drawing the
+        same frame 60 times a second: an idle screen only changes on an event
+        Returns:
+            list: the events to handle, empty when the timeout passed without any
+        """
+        # nothing was drawn if no event was handled since the last frame
+        if self._woken:
+            self._profiler.present()
+        event = pygame.event.wait(IDLE_TIMEOUT)
+        # the time asleep is not part of the next frame
+        self._profiler.skip()
+        self._woken = event.type != pygame.NOEVENT
+        if not self._woken:
+            return []
+        return [event] + pygame.event.get()
@@ -0,0 +1,88 @@
+"""
+Headless export of visualizer runs to animated GIFs or PNG sequences.
+
+The visualizers are rendered offscreen with the SDL dummy video driver and a frame
+is taken every few operations, with no delay, so clips can be made in batch:
+
+    python -m src.visualizers.export sort merge_sort quick_sort --out clips
+    python -m src.visualizers.export path a_star dijkstra --seed 7 --out clips
+"""
+import argparse
+import os
+import sys
+
+from src.visualizers.frame_exporter import FRAME_DURATION
+from src.visualizers.frame_exporter import FrameExporter
+from src.visualizers.pathfinding import pathfinding_visualizer
+from src.visualizers.pathfinding.pathfinding_algorithms import SEARCH_ALGORITHMS
+from src.visualizers.sorting import sorting_visualizer
+from src.visualizers.sorting.data_generation import DEFAULT_SEED
+from src.visualizers.sorting.data_generation import DISTRIBUTIONS
+from src.visualizers.sorting.sorting_algorithms import SORTING_ALGORITHMS
+
+
+# the number given to each pathfinding algorithm in the visualizer
+PATHFINDING_ALGORITHMS = {name: i for i, name in enumerate(SEARCH_ALGORITHMS, 1)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="visualizer", required=True)
+
+    sort_parser = subparsers.add_parser("sort", help="export sorting runs")
+    sort_parser.add_argument("algorithms", nargs="+", choices=list(SORTING_ALGORITHMS))
+    sort_parser.add_argument("--size", type=int, default=100)
+    sort_parser.add_argument(
+        "--distribution", choices=list(DISTRIBUTIONS), default="random"
+    )
+    sort_parser.add_argument(
+        "--seed", type=int, default=DEFAULT_SEED, help="input seed"
+    )
+
+    path_parser = subparsers.add_parser("path", help="export pathfinding runs")
+    path_parser.add_argument(
+        "algorithms", nargs="+", choices=list(PATHFINDING_ALGORITHMS)
+    )
+    path_parser.add_argument(
+        "--seed", type=int, default=DEFAULT_SEED, help="obstacle seed"
+    )
+
+    for subparser in (sort_parser, path_parser):
+        subparser.add_argument("--out", default=".", help="directory of the clips")
+        subparser.add_argument("--format", choices=["gif", "png"], default="gif")
+        subparser.add_argument("--operations-per-frame", type=int, default=1)
+        subparser.add_argument("--frame-duration", type=int, default=FRAME_DURATION)
+    args = parser.parse_args(argv)
+
+    # render offscreen, this has to be set before pygame opens the display
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    if args.visualizer == "sort":
+        palette = sorting_visualizer.EXPORT_PALETTE
+    else:
+        palette = pathfinding_visualizer.EXPORT_PALETTE
+
+    os.makedirs(args.out, exist_ok=True)
+    for algorithm in args.algorithms:
+        name = f"{args.visualizer}_{algorithm}"
+        path = os.path.join(args.out, name + (".gif" if args.format == "gif" else ""))
+        exporter = FrameExporter(
+            path, args.operations_per_frame, palette, args.frame_duration
+        )
+        if args.visualizer == "sort":
+            sorting_visualizer.SortingVisualizer(
+                args.size,
+                args.seed,
+                distribution=args.distribution,
+                algorithm=list(SORTING_ALGORITHMS).index(algorithm) + 1,
+                exporter=exporter,
+            )
+        else:
+            pathfinding_visualizer.PathfindingVisualizer(
+                PATHFINDING_ALGORITHMS[algorithm], args.seed, exporter
+            )
+        print(f"{exporter.frames} frames written to {path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import os
+
+import numpy as np
+import pygame
+from PIL import GifImagePlugin
+from PIL import Image
+
+
+FRAME_DURATION = 20  # milliseconds each frame is shown, the shortest GIFs allow
+LAST_FRAME_DURATION = 1000  # milliseconds the final state of a run is shown
+
+
+class FrameExporter:
+    """
+    Encodes the frames of a visualizer run, as an animated GIF when the path ends
+    with .gif and as a directory of PNG images otherwise.
+    Consecutive identical frames are merged into one longer frame, every frame is
+    quantized to a palette, and the GIF is written as the frames come with only the
+    area that changed since the previous frame, so any number of frames can be taken.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        operations_per_frame: int = 1,
+        palette=None,
+        frame_duration: int = FRAME_DURATION,
+    ) -> None:
+        """
+        Args:
+            path (str): the GIF file, or the directory of the PNG sequence
+            operations_per_frame (int, optional): take a frame every this many
+                operations of the algorithm
+            palette ([type], optional): the RGB colors the visualizer draws with,
+                every pixel is mapped to the closest one. Defaults to an adaptive
+                palette of 256 colors taken from the first frame
+            frame_duration (int, optional): milliseconds each frame is shown
+        """
+        self.path = path
+        self.operations_per_frame = max(operations_per_frame, 1)
+        self.frame_duration = frame_duration
+        self.frames = 0  # the number of frames written after merging the duplicates
+        self._operations = 0
+        self._gif = path.lower().endswith(".gif")
+        self._palette = None
+        if palette is not None:
+            self._palette = Image.new("P", (1, 1))
+            self._palette.putpalette(
+                [channel for color in palette for channel in color]
+            )
+        self._previous = None  # the pixels of the previous frame
+        self._previous_data = None
+        self._pending = None  # the last frame, written once its duration is known
+        self._file = None
+        if self._gif:
+            self._file = open(path, "wb")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._durations = []
+
+    def tick(self) -> bool:
+        """
+        Count an operation of the algorithm
+        Returns:
+            bool: True when a frame is due
+        """
+        self._operations += 1
+        return self._operations % self.operations_per_frame == 0
+
+    def capture(self, surface, duration: int = None) -> None:
+        """
+        Take a frame of the surface
+        Args:
+            surface ([type]): the surface the visualizer draws on
+            duration (int, optional): milliseconds the frame is shown
+                (defaults to the frame duration)
+        """
+        duration = duration or self.frame_duration
+        width, height = surface.get_size()
+        data = pygame.image.tostring(surface, "RGB")
+        # one row of bytes per row of pixels, reducing a whole row is much faster
+        # than reducing the 3 channels of each pixel
+        pixels = np.frombuffer(data, dtype=np.uint8).reshape(height, width * 3)
+
+        if self._previous is None:
+            bbox = (0, 0, width, height)
+        elif data == self._previous_data:
+            # the same as the previous frame, show that one longer instead
+            self._pending[2] += duration
+            return
+        elif not self._gif:
+            bbox = (0, 0, width, height)
+        else:
+            changed = pixels != self._previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            columns = np.flatnonzero(changed[rows[0] : rows[-1] + 1].any(axis=0))
+            bbox = (columns[0] // 3, rows[0], columns[-1] // 3 + 1, rows[-1] + 1)
+        self._previous, self._previous_data = pixels, data
+
+        image = Image.frombytes("RGB", (width, height), data)
+        if self._palette is None:
+            self._palette = image.quantize(256, dither=Image.Dither.NONE)
+        image = image.crop(bbox).quantize(
+            palette=self._palette, dither=Image.Dither.NONE
+        )
+        self.__flush()
+        self._pending = [image, bbox[:2], duration]
+
+    def close(self) -> int:
+        """
+        Write the last frame and finish the file
+        Returns:
+            int: the number of frames written
+        """
+        self.__flush()
+        if self._gif:
+            if self.frames:
+                self._file.write(b";")  # the GIF trailer
+            self._file.close()
+        else:
+            # the durations in the format of ffmpeg's concat demuxer
+            with open(os.path.join(self.path, "frames.txt"), "w") as file:
+                for i, duration in enumerate(self._durations):
+                    file.write(
+                        f"file 'frame_{i:05d}.png'\nduration {duration / 1000}\n"
+                    )
+        return self.frames
+
+    def __flush(self) -> None:
+        """
+        Write the pending frame
+        """
+        if self._pending is None:
+            return
+        image, offset, duration = self._pending
+        self._pending = None
+        if self._gif:
+            if not self.frames:
+                header, _ = GifImagePlugin.getheader(image, info={"loop": 0})
+                for chunk in header:
+                    self._file.write(chunk)
+            for chunk in GifImagePlugin.getdata(image, offset, duration=duration):
+                self._file.write(chunk)
+        else:
+            image.save(os.path.join(self.path, f"frame_{self.frames:05d}.png"))
+            self._durations.append(duration)
+        self.frames += 1
@@ -0,0 +1,217 @@
+"""
+Timing of every frame of the visualizers, split into the phases of the render
+pipeline, so a slow animation can be traced to its real bottleneck.
+
+F3 shows a graph of the last frames with the p50/p95/p99 frame times and the
+dropped frames, F4 saves the timeline of the frames and their phases in the
+Chrome trace format, to open in chrome://tracing or https://ui.perfetto.dev.
+"""
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pygame
+
+
+# the phases of a frame, the algorithm gets the time not spent in the others
+PHASES = ("algorithm", "input", "draw", "profiler", "display", "wait")
+PHASE_COLORS = {
+    "algorithm": (200, 200, 200),
+    "input": (30, 144, 255),
+    "draw": (10, 225, 20),
+    "profiler": (190, 120, 210),
+    "display": (255, 80, 0),
+    "wait": (70, 70, 70),
+}
+FRAME_BUDGET = 1 / 60  # seconds a frame can take without being dropped
+HISTORY = 600  # frames the percentiles are taken over, 10 seconds at 60 fps
+MAX_TIMELINE_EVENTS = 200_000  # the oldest events are dropped past this many
+TIMELINE_PATH = "frame_timeline.json"  # where the timeline is saved
+GRAPH_SIZE = (300, 120)
+GRAPH_MARGIN = 10  # space between the graph and the bottom right of the screen
+BAR_W = 2  # width of the bar of each frame in the graph
+TEXT_H = 36  # height of the text above the bars in the graph
+
+
+class FrameProfiler:
+    """
+    Times the phases of each frame and keeps the last frames to show them
+    """
+
+    def __init__(self, screen, budget: float = FRAME_BUDGET) -> None:
+        """
+        Args:
+            screen ([type]): the screen the frames are displayed on
+            budget (float, optional): the seconds each frame should take at most
+        """
+        self._screen = screen
+        self._budget = budget
+        width, height = screen.get_size()
+        self._graph_rect = pygame.Rect(
+            width - GRAPH_SIZE[0] - GRAPH_MARGIN,
+            height - GRAPH_SIZE[1] - GRAPH_MARGIN,
+            *GRAPH_SIZE,
+        )
+        self._font = None  # created the first time the graph is shown
+        self._under_graph = None  # what the graph covers, put back when hidden
+        self.visible = False  # whether the graph is shown
+        self.dropped = 0  # the frames that could have been displayed but were not
+        self._frames = deque(maxlen=HISTORY)  # the phases of each frame, in ns
+        # (name, start, duration, phases of a frame or None) in ns
+        self._timeline = deque(maxlen=MAX_TIMELINE_EVENTS)
+        self._phases = dict.fromkeys(PHASES, 0)  # the phases of the current frame
+        self._frame_start = time.perf_counter_ns()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time the code run inside the with statement as a phase of the frame
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            self._phases[name] += duration
+            self._timeline.append((name, start, duration, None))
+
+    def present(self) -> None:
+        """
+        Display the frame, in place of pygame.display.update(), and start the next
+        """
+        if self.visible:
+            with self.phase("profiler"):
+                self.__draw_graph()
+        with self.phase("display"):
+            pygame.display.update()
+        self.end_frame()
+
+    def end_frame(self) -> None:
+        """
+        End the current frame, the time since the last one not spent in a phase
+        is given to the algorithm
+        """
+        now = time.perf_counter_ns()
+        total = now - self._frame_start
+        phases = self._phases
+        phases["algorithm"] += max(0, total - sum(phases.values()))
+        self._frames.append(phases)
+        self._timeline.append(("frame", self._frame_start, total, phases))
+        # a frame taking 2 budgets means 1 frame could not be displayed
+        self.dropped += max(0, round(total / 1e9 / self._budget) - 1)
+        self._phases = dict.fromkeys(PHASES, 0)
+        self._frame_start = now
+
+    def skip(self) -> None:
+        """
+        Start the current frame again, the time since it started is left out of
+        the frames, like the time an idle screen sleeps waiting for events
+        """
+        self._phases = dict.fromkeys(PHASES, 0)
+        self._frame_start = time.perf_counter_ns()
+
+    def percentiles(self) -> tuple:
+        """
+        Get the p50, p95 and p99 of the last frame times
+        Returns:
+            tuple: the 3 percentiles in milliseconds
+        """
+        if not self._frames:
+            return 0.0, 0.0, 0.0
+        totals = np.fromiter(
+            (sum(phases.values()) for phases in self._frames), dtype=np.float64
+        )
+        return tuple(np.percentile(totals / 1e6, (50, 95, 99)).tolist())
+
+    def handle(self, event) -> bool:
+        """
+        Handle the keys of the profiler: F3 shows or hides the graph and F4 saves
+        the timeline
+        Returns:
+            bool: whether the event was one of them
+        """
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_F3:
+            self.toggle()
+        elif event.key == pygame.K_F4:
+            self.save(TIMELINE_PATH)
+        else:
+            return False
+        return True
+
+    def toggle(self) -> None:
+        """
+        Show the graph, or hide it and put back what it covered
+        """
+        self.visible = not self.visible
+        if self.visible:
+            self._under_graph = self._screen.subsurface(self._graph_rect).copy()
+            if self._font is None:
+                self._font = pygame.font.SysFont("consolas", 13, bold=True)
+            self.__draw_graph()
+        else:
+            self._screen.blit(self._under_graph, self._graph_rect)
+        pygame.display.update(self._graph_rect)
+
+    def save(self, path: str) -> None:
+        """
+        Save the timeline in the Chrome trace format
+        """
+        pid = os.getpid()
+        events = []
+        for name, start, duration, phases in self._timeline:
+            event = {
+                "name": name,
+                "cat": "phase" if phases is None else "frame",
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": 0,
+            }
+            if phases is not None:
+                # the milliseconds of each phase, the algorithm is not an event
+                event["args"] = {name: ns / 1e6 for name, ns in phases.items()}
+            events.append(event)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def __draw_graph(self) -> None:
+        """
+        Draw the phases of the last frames as stacked bars, the line being the
+        budget of a frame, with the percentiles and dropped frames above them
+        """
+        screen, rect = self._screen, self._graph_rect
+        screen.fill((0, 0, 0), rect)
+        pygame.draw.rect(screen, (90, 90, 90), rect, 1)
+        p50, p95, p99 = self.percentiles()
+        line = f"p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f} ms  dropped {self.dropped}"
+        text = self._font.render(line, False, (10, 225, 20))
+        screen.blit(text, (rect.x + 4, rect.y + 2))
+        # the legend, each phase in its color
+        x = rect.x + 4
+        for name in PHASES:
+            text = self._font.render(name, False, PHASE_COLORS[name])
+            screen.blit(text, (x, rect.y + 18))
+            x += text.get_width() + 6
+
+        # the bars go up to twice the budget
+        bottom = rect.bottom - 1
+        scale = (rect.height - TEXT_H) / (2 * self._budget * 1e9)
+        frames = list(self._frames)[-(rect.width - 2) // BAR_W :]
+        for i, phases in enumerate(frames):
+            x = rect.x + 1 + i * BAR_W
+            y = bottom
+            for name in PHASES:
+                height = min(int(phases[name] * scale), y - rect.y - TEXT_H)
+                if height > 0:
+                    y -= height
+                    screen.fill(PHASE_COLORS[name], (x, y, BAR_W, height))
+        budget_y = bottom - int(self._budget * 1e9 * scale)
+        pygame.draw.line(
+            screen, (244, 242, 30), (rect.x + 1, budget_y), (rect.right - 2, budget_y)
+        )
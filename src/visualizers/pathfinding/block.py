@@ -1,11 +1,11 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
 from enum import Enum
 
 import pygame
 
 from . import BLOCK_WIDTH
-from . import BLOCKS_EACH_LINE
 from . import HALF_WIDTH
 
 
@@ -28,6 +28,15 @@ class Block:
         VISITED = (255, 205, 102)  # is already visited
         NEXT_TO_VISIT = (195, 255, 105)  # is in the waitlist to be visited
 
+    # when frames are exported, called with the screen after each change
+    # instead of updating the display
+    frame_hook = None
+    # times the frames when set by the visualizer
+    profiler = None
+    # called with the position of a block and whether it is a barrier, when it
+    # becomes or stops being one
+    barrier_hook = None
+
     def __init__(self, screen, x, y, effect=True) -> None:
         """
         Args:
@@ -38,9 +47,7 @@ class Block:
         """
         self._screen = screen  # root screen to dislay the block
         self.x, self.y = x, y  # row and column index where the block is at
-        self.neighbors = []  # the list of neighbors
-        self.parent = None  # the parent of the block
-        self.was_visited = False  # if the block is visited or not
+        # the state of the searches is kept by the grid, the block only shows it
 
         ### The actual position on the map (since each block has a width) ###
         self.pos_x = (x * BLOCK_WIDTH) + HALF_WIDTH
@@ -64,7 +71,7 @@ class Block:
         return self.color == self.ColorStatus.NEXT_TO_VISIT
 
     def is_visited(self) -> bool:
-        return self.color == self.ColorStatus.VISITED or self.was_visited
+        return self.color == self.ColorStatus.VISITED
 
     def is_start_block(self) -> bool:
         return self.color == self.ColorStatus.START
@@ -78,12 +85,6 @@ class Block:
     def get_color(self) -> tuple[int]:
         return self.color
 
-    def get_neighbors(self) -> list[Block]:
-        return self.neighbors
-
-    def get_parent(self) -> Block:
-        return self.parent
-
     def __update_status(self, color_status: ColorStatus, effect=True) -> None:
         """
         Update the color status for the block
@@ -91,16 +92,44 @@ class Block:
             color_status ([type]): the new color of the block
             effect (bool, optional): true to make the expanding effect (defaults to True)
         """
+        if Block.barrier_hook is not None:
+            is_barrier = color_status is self.ColorStatus.BARRIER
+            if is_barrier != self.is_barrier():
+                Block.barrier_hook(self.x, self.y, is_barrier)
         self.color = color_status  # set the color_status
-        pygame.draw.rect(
-            self._screen, color_status.value, self.rect
-        )  # draw block with new color
+        profiler = Block.profiler
+        with profiler.phase("draw") if profiler is not None else nullcontext():
+            pygame.draw.rect(
+                self._screen, color_status.value, self.rect
+            )  # draw block with new color
 
         # make the expanding effect
         if effect:
+            Block.show(self._screen)
+        # the frames are being exported, no need to wait
+        if Block.frame_hook is None and color_status is self.ColorStatus.PATH:
+            # if a block is path, slow the expanding effect down
+            with profiler.phase("wait") if profiler is not None else nullcontext():
+                pygame.time.delay(5)
+
+    @staticmethod
+    def show(screen) -> None:
+        """
+        Display the blocks changed on the screen, or give it to the frame hook
+        when the frames are being exported
+        """
+        if Block.frame_hook is not None:
+            Block.frame_hook(screen)
+        elif Block.profiler is not None:
+            Block.profiler.present()
+        else:
             pygame.display.update()
-        if color_status is self.ColorStatus.PATH:
-            pygame.time.delay(5)  # if a block is path, slow the expanding effect down
+
+    def draw(self) -> None:
+        """
+        Draw the block again with its current status, without any effect
+        """
+        pygame.draw.rect(self._screen, self.color.value, self.rect)
 
     def set_path(self) -> None:
         """
@@ -139,57 +168,24 @@ class Block:
         if self.is_walkable():
             self.__update_status(self.ColorStatus.NEXT_TO_VISIT)
 
-    def set_parent(self, parent) -> None:
-        """
-        Set the parent block for the current block
-        """
-        self.parent = parent
-
-    def set_visited(self) -> None:
+    def set_visited(self, effect=True) -> None:
         """
         Set the status to be visited
+        Args:
+            effect (bool, optional): true to make the expanding effect (defaults to True)
         """
-        self.was_visited = True
-        if self.is_walkable() or self.is_next():
-            self.__update_status(self.ColorStatus.VISITED)
+        # a path can be visited again when a better one is searched
+        if self.is_walkable() or self.is_next() or self.color == self.ColorStatus.PATH:
+            self.__update_status(self.ColorStatus.VISITED, effect)
 
-    def reset(self) -> None:
+    def reset(self, draw: bool = True) -> None:
         """
         Reset the block
-        """
-        self.__update_status(self.ColorStatus.WALKABLE, False)
-        self.was_visited = False
-        self.neighbors = []
-        self.parent = None
-
-    def update_neighbors(self, grid) -> None:
-        """
-        Check the 4 directions (N, E, S, W) around the block and add the neighbor
-        block to this block's list of neighbors if qualified
         Args:
-            grid ([type]): the grid containing all blocks
-        """
-        # make sure the index does not go out of the array's range
-        north_has_block = self.x > 0
-        south_has_block = self.x < BLOCKS_EACH_LINE - 1
-        west_has_block = self.y > 0
-        east_has_block = self.y < BLOCKS_EACH_LINE - 1
-
-        # check the neighbors in clock-wise order
-        # if the block is not a barrier, then add it to the neighbor list
-        # check north
-        if north_has_block:
-            if not grid[self.x - 1][self.y].is_barrier():
-                self.neighbors.append(grid[self.x - 1][self.y])
-        # check east:
-        if east_has_block:
-            if not grid[self.x][self.y + 1].is_barrier():
-                self.neighbors.append(grid[self.x][self.y + 1])
-        # check south
-        if south_has_block:
-            if not grid[self.x + 1][self.y].is_barrier():
-                self.neighbors.append(grid[self.x + 1][self.y])
-        # check west:
-        if west_has_block:
-            if not grid[self.x][self.y - 1].is_barrier():
-                self.neighbors.append(grid[self.x][self.y - 1])
+            draw (bool, optional): false when the whole grid is cleared at once,
+                the block is then neither drawn nor given to the barrier hook
+        """
+        if draw:
+            self.__update_status(self.ColorStatus.WALKABLE, False)
+        else:
+            self.color = self.ColorStatus.WALKABLE
@@ -0,0 +1,199 @@
+"""
+The connected components of a grid, kept up to date as the walls are edited, so
+whether the end can be reached from the start is known without any search.
+"""
+from array import array
+from collections import deque
+
+from .grid import Grid
+
+
+class ComponentIndex:
+    """
+    The label of the component of every free cell of a grid, -1 for the walls.
+    A new wall only relabels the parts it cuts off, and a removed wall joins the
+    smaller components around it to the largest one.
+    """
+
+    def __init__(self, grid: Grid) -> None:
+        """
+        Args:
+            grid (Grid): the grid to index, its walls are changed by the index
+        """
+        self.grid = grid
+        self._labels = array("i", [-1]) * len(grid)
+        self._sizes = {}  # the number of cells of each component, by label
+        self._next_label = 0
+        for cell in range(len(grid)):
+            if not grid.blocked[cell] and self._labels[cell] == -1:
+                label = self.__new_label()
+                self._sizes[label] = self.__relabel(cell, label)
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def label(self, cell: int) -> int:
+        """
+        Get the label of the component of a cell, -1 for a wall
+        """
+        return self._labels[cell]
+
+    def connected(self, cell: int, other: int) -> bool:
+        """
+        Tell in O(1) whether there is a path between 2 cells
+        """
+        label = self._labels[cell]
+        return label != -1 and label == self._labels[other]
+
+    def set_walkable(self, cell: int) -> None:
+        """
+        Remove the wall of a cell, joining the components around it
+        """
+        if not self.grid.blocked[cell]:
+            return
+        self.grid.blocked[cell] = 0
+        self.grid.version += 1
+        neighbors = {}  # a neighbor in each component around the cell
+        for neighbor in self.grid.neighbors(cell):
+            neighbors.setdefault(self._labels[neighbor], neighbor)
+        if not neighbors:
+            label = self.__new_label()
+            self._labels[cell] = label
+            self._sizes[label] = 1
+            return
+
+        # relabel the smaller components only
+        largest = max(neighbors, key=self._sizes.get)
+        self._labels[cell] = largest
+        self._sizes[largest] += 1
+        for label, neighbor in neighbors.items():
+            if label != largest:
+                self._sizes[largest] += self.__relabel(neighbor, largest)
+                del self._sizes[label]
+
+    def set_barrier(self, cell: int) -> None:
+        """
+        Put a wall on a cell, splitting its component if it was the only way
+        between the cells around it
+        """
+        if self.grid.blocked[cell]:
+            return
+        self.grid.blocked[cell] = 1
+        self.grid.version += 1
+        label = self._labels[cell]
+        self._labels[cell] = -1
+        self._sizes[label] -= 1
+        if not self._sizes[label]:
+            del self._sizes[label]
+            return
+        sides = self.__sides(cell)
+        if len(sides) > 1:
+            self.__split(label, sides)
+
+    def __new_label(self) -> int:
+        self._next_label += 1
+        return self._next_label - 1
+
+    def __relabel(self, cell: int, label: int) -> int:
+        """
+        Give a label to the cell and the cells connected to it with its old label
+        Returns:
+            int: the number of cells relabeled
+        """
+        old = self._labels[cell]
+        self._labels[cell] = label
+        stack = [cell]
+        count = 1
+        while stack:
+            for neighbor in self.grid.neighbors(stack.pop()):
+                if self._labels[neighbor] == old:
+                    self._labels[neighbor] = label
+                    stack.append(neighbor)
+                    count += 1
+        return count
+
+    def __sides(self, cell: int) -> list:
+        """
+        Get a neighbor of the wall on each side that is not connected to the others
+        through the 8 cells around the wall
+        """
+        grid = self.grid
+        x, y = grid.position(cell)
+        # the cells around the wall in order, the even ones being its neighbors
+        ring = [
+            (x - 1, y),
+            (x - 1, y + 1),
+            (x, y + 1),
+            (x + 1, y + 1),
+            (x + 1, y),
+            (x + 1, y - 1),
+            (x, y - 1),
+            (x - 1, y - 1),
+        ]
+        free = [
+            0 <= i < grid.width
+            and 0 <= j < grid.height
+            and not grid.blocked[grid.cell((i, j))]
+            for i, j in ring
+        ]
+        if all(free):
+            return [grid.cell(ring[0])]
+
+        # go around from a wall, each run of free cells being connected
+        sides = []
+        first = free.index(False)
+        in_side = False
+        for k in range(first + 1, first + 9):
+            k %= 8
+            if not free[k]:
+                in_side = False
+            elif k % 2 == 0 and not in_side:
+                sides.append(grid.cell(ring[k]))
+                in_side = True
+        return sides
+
+    def __split(self, label: int, sides: list) -> None:
+        """
+        Flood the component from each side in turn: the sides that meet are still
+        connected, and a side that runs out of cells is cut off and gets a new
+        label, so the largest part is never visited whole
+        """
+        root = list(range(len(sides)))  # the side each side was joined to
+
+        def find(side: int) -> int:
+            while root[side] != side:
+                side = root[side]
+            return side
+
+        owner = {cell: side for side, cell in enumerate(sides)}
+        queues = [deque([cell]) for cell in sides]
+        cells = [[cell] for cell in sides]  # the cells reached from each side
+        active = list(range(len(sides)))
+        while len(active) > 1:
+            for side in list(active):
+                if len(active) == 1:
+                    break  # the last side keeps the label
+                if side not in active:
+                    continue  # joined to another side during this turn
+                if not queues[side]:
+                    new_label = self.__new_label()
+                    for cell in cells[side]:
+                        self._labels[cell] = new_label
+                    self._sizes[new_label] = len(cells[side])
+                    self._sizes[label] -= len(cells[side])
+                    active.remove(side)
+                    continue
+                current = queues[side].popleft()
+                for neighbor in self.grid.neighbors(current):
+                    other = owner.get(neighbor)
+                    if other is None:
+                        owner[neighbor] = side
+                        cells[side].append(neighbor)
+                        queues[side].append(neighbor)
+                    elif find(other) != side:
+                        # the sides are still connected, flood on as one
+                        other = find(other)
+                        root[other] = side
+                        queues[side].extend(queues[other])
+                        cells[side].extend(cells[other])
+                        active.remove(other)
@@ -0,0 +1,244 @@
+"""
+A snapshot of the pathfinding grid without pygame, so the searches can run in
+worker processes or without a window.
+
+The cells of a grid are numbered row by row, the cell of the block (x, y) being
+x * height + y, and the neighbors are visited in the same order as the blocks
+do theirs: north, east, south then west.
+
+A grid can have several starts and ends: the searches start from all the starts
+at once and stop at the first end they reach, in a single pass.
+
+The walls are kept apart from the state of the searches, which is reused by the
+next search of the same grid instead of being allocated and cleared again, and
+their version tells the tables made for the walls when they are out of date.
+
+Grids can also be read from map files or generated, to be searched headless.
+"""
+import random
+
+from . import BLOCKS_EACH_LINE
+from . import END_POS
+from . import START_POS
+from .search_state import SearchState
+
+
+# the characters of the walls in a map file, the other ones being free: # in the
+# maps of the project, @, O, T and W in the maps of the Moving AI benchmarks
+WALL_CHARACTERS = "#@OTW"
+
+
+class Grid:
+    """
+    The walls, the start and the end of a pathfinding grid
+    """
+
+    def __init__(
+        self,
+        width: int = BLOCKS_EACH_LINE,
+        height: int = BLOCKS_EACH_LINE,
+        walls=(),
+        start: tuple = START_POS,
+        end: tuple = END_POS,
+        extra_starts=(),
+        extra_ends=(),
+    ) -> None:
+        """
+        Args:
+            width (int, optional): the number of blocks along x
+            height (int, optional): the number of blocks along y
+            walls ([type], optional): the (x, y) positions of the barriers
+            start (tuple, optional): the position of the start block
+            end (tuple, optional): the position of the end block
+            extra_starts ([type], optional): the positions of the other starts
+            extra_ends ([type], optional): the positions of the other ends
+        """
+        self.width = width
+        self.height = height
+        self.blocked = bytearray(width * height)  # 1 for the cells of the walls
+        for position in walls:
+            self.blocked[self.cell(position)] = 1
+        self.version = 0  # changed with the walls by whoever changes them
+        self.landmarks = None  # the LandmarkTables of the ALT searches, of a version
+        self._state = None  # the state of the searches, created by the first one
+        self.set_points(start, end, extra_starts, extra_ends)
+
+    @classmethod
+    def from_blocks(
+        cls, blocks, start: tuple, end: tuple, extra_starts=(), extra_ends=()
+    ) -> "Grid":
+        """
+        Take a snapshot of the blocks of the visualizer
+        Args:
+            blocks ([type]): the grid of blocks, indexed by x then y
+            start (tuple): the position of the start block
+            end (tuple): the position of the end block
+            extra_starts ([type], optional): the positions of the other starts
+            extra_ends ([type], optional): the positions of the other ends
+        """
+        walls = [
+            (x, y)
+            for x, column in enumerate(blocks)
+            for y, block in enumerate(column)
+            if block.is_barrier()
+        ]
+        return cls(
+            len(blocks), len(blocks[0]), walls, start, end, extra_starts, extra_ends
+        )
+
+    @classmethod
+    def load(cls, path: str, start: tuple = None, end: tuple = None) -> "Grid":
+        """
+        Read a map file: a line for each row of blocks, with # for the walls, S for
+        the starts and E for the ends, or a map of the Moving AI benchmarks
+        (https://movingai.com/benchmarks), which has neither starts nor ends
+        Args:
+            path (str): the map file
+            start (tuple, optional): the position of the start, instead of the
+                ones of the map
+            end (tuple, optional): the position of the end, instead of the ones of
+                the map
+        """
+        with open(path) as file:
+            lines = file.read().splitlines()
+        markers = True
+        if lines and lines[0].startswith("type"):
+            # skip the header of a Moving AI map, where S is a swamp and not a start
+            lines = lines[lines.index("map") + 1 :]
+            markers = False
+        while lines and not lines[-1].strip():
+            lines.pop()
+        if not lines:
+            raise ValueError(f"The map {path} is empty")
+        width = max(len(line) for line in lines)
+        walls, starts, ends = [], [], []
+        for y, line in enumerate(lines):
+            for x, char in enumerate(line):
+                if char in WALL_CHARACTERS:
+                    walls.append((x, y))
+                elif markers and char == "S":
+                    starts.append((x, y))
+                elif markers and char == "E":
+                    ends.append((x, y))
+        if start is not None:
+            starts = [start]
+        if end is not None:
+            ends = [end]
+        if not starts or not ends:
+            raise ValueError(f"The map {path} needs a start and an end")
+        return cls(width, len(lines), walls, starts[0], ends[0], starts[1:], ends[1:])
+
+    @classmethod
+    def generate(
+        cls,
+        width: int,
+        height: int,
+        density: float,
+        seed: int,
+        start: tuple = (0, 0),
+        end: tuple = None,
+    ) -> "Grid":
+        """
+        Make a grid with a wall on each block but the start and the end with the
+        probability density
+        Args:
+            width (int): the number of blocks along x
+            height (int): the number of blocks along y
+            density (float): the share of the blocks that are walls
+            seed (int): the seed of the walls
+            start (tuple, optional): the position of the start block
+            end (tuple, optional): the position of the end block, the last block
+                by default
+        """
+        if end is None:
+            end = (width - 1, height - 1)
+        rng = random.Random(seed)
+        walls = [
+            (x, y)
+            for x in range(width)
+            for y in range(height)
+            if rng.random() < density and (x, y) not in (start, end)
+        ]
+        return cls(width, height, walls, start, end)
+
+    def __len__(self) -> int:
+        return len(self.blocked)
+
+    def __getstate__(self) -> dict:
+        # the workers of a race start their own state
+        state = self.__dict__.copy()
+        state["_state"] = None
+        return state
+
+    def set_points(
+        self, start: tuple, end: tuple, extra_starts=(), extra_ends=()
+    ) -> None:
+        """
+        Move the starts and ends, the walls and the state of the searches are kept
+        Args:
+            start (tuple): the position of the start block
+            end (tuple): the position of the end block
+            extra_starts ([type], optional): the positions of the other starts
+            extra_ends ([type], optional): the positions of the other ends
+        """
+        self.start = self.cell(start)
+        self.end = self.cell(end)
+        # every start and end, the first ones first
+        self.starts = [self.start] + [self.cell(p) for p in extra_starts]
+        self.ends = [self.end] + [self.cell(p) for p in extra_ends]
+        self._ends = set(self.ends)
+        self._end_positions = [self.position(cell) for cell in self.ends]
+
+    def search_state(self) -> SearchState:
+        """
+        Start a new search of the grid, in the state of the last one: the cells it
+        reached are forgotten in O(1)
+        """
+        if self._state is None:
+            self._state = SearchState(len(self))
+        self._state.begin()
+        return self._state
+
+    def cell(self, position: tuple) -> int:
+        x, y = position
+        return x * self.height + y
+
+    def position(self, cell: int) -> tuple:
+        return divmod(cell, self.height)
+
+    def neighbors(self, cell: int) -> list:
+        """
+        Get the cells next to a cell that are not walls
+        """
+        x, y = divmod(cell, self.height)
+        neighbors = []
+        if x > 0 and not self.blocked[cell - self.height]:
+            neighbors.append(cell - self.height)
+        if y < self.height - 1 and not self.blocked[cell + 1]:
+            neighbors.append(cell + 1)
+        if x < self.width - 1 and not self.blocked[cell + self.height]:
+            neighbors.append(cell + self.height)
+        if y > 0 and not self.blocked[cell - 1]:
+            neighbors.append(cell - 1)
+        return neighbors
+
+    def is_end(self, cell: int) -> bool:
+        return cell in self._ends
+
+    def to_end(self, cell: int) -> int:
+        """
+        The Manhattan distance from a cell to the closest end
+        """
+        x, y = divmod(cell, self.height)
+        if len(self._end_positions) == 1:
+            end_x, end_y = self._end_positions[0]
+            return abs(x - end_x) + abs(y - end_y)
+        return min(abs(x - i) + abs(y - j) for i, j in self._end_positions)
+
+    def heuristic(self, cell: int, goal: int) -> int:
+        """
+        The Manhattan distance between 2 cells
+        """
+        x1, y1 = divmod(cell, self.height)
+        x2, y2 = divmod(goal, self.height)
+        return abs(x1 - x2) + abs(y1 - y2)
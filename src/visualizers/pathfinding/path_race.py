@@ -0,0 +1,140 @@
+"""
+Pathfinding races: several searches run on a snapshot of the same grid at once,
+each in its own process. The visualizer shows them side by side, and
+find_first_path keeps only the first shortest path found.
+"""
+import time
+from array import array
+
+from .grid import Grid
+from .pathfinding_algorithms import OPTIMAL_ALGORITHMS
+from .pathfinding_algorithms import SEARCH_ALGORITHMS
+from .pathfinding_algorithms import SearchTracker
+from src.visualizers.race import FINISHED
+from src.visualizers.race import OPERATIONS
+from src.visualizers.race import Race
+
+
+BATCH_SIZE = 64  # steps sent to the display at once
+
+
+class RaceTracker(SearchTracker):
+    """
+    Tracker that streams the steps of a search through a pipe in batches
+    """
+
+    def __init__(self, connection, batch_size: int = BATCH_SIZE) -> None:
+        """
+        Args:
+            connection ([type]): the end of the pipe the batches are sent to
+            batch_size (int, optional): the number of steps in each batch
+        """
+        super().__init__()
+        self._connection = connection
+        self._batch_size = batch_size
+        self._expanded = array("q")
+        self._discovered = array("q")
+
+    def expand(self, cell: int) -> None:
+        super().expand(cell)
+        self._expanded.append(cell)
+        self.__count()
+
+    def discover(self, cell: int) -> None:
+        super().discover(cell)
+        self._discovered.append(cell)
+        self.__count()
+
+    def expand_level(self, cells) -> None:
+        super().expand_level(cells)
+        self._expanded.extend(cells.tolist())
+        self.__count()
+
+    def __count(self) -> None:
+        if len(self._expanded) + len(self._discovered) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Send the steps made since the last batch
+        """
+        if not self._expanded and not self._discovered:
+            return
+        self._connection.send(
+            (OPERATIONS, self.expansions, self._expanded, self._discovered)
+        )
+        self._expanded = array("q")
+        self._discovered = array("q")
+
+
+def race_worker(algorithm: str, grid: Grid, stream: bool, connection) -> None:
+    """
+    Search the grid in a worker process and send the path found at the end.
+    The time is the CPU time of the process, so the time spent waiting for the
+    display is left out.
+    Args:
+        stream (bool): whether to send every step of the search as well
+    """
+    tracker = RaceTracker(connection) if stream else SearchTracker()
+    path, error = None, None
+    start = time.process_time()
+    try:
+        path = SEARCH_ALGORITHMS[algorithm](grid, tracker)
+    except Exception as e:
+        error = type(e).__name__
+    seconds = time.process_time() - start
+    if stream:
+        tracker.flush()
+    connection.send((FINISHED, tracker.expansions, seconds, error, path))
+    connection.close()
+
+
+class PathRace(Race):
+    """
+    Runs several searches on the same grid, each in its own worker process
+    """
+
+    def __init__(self, algorithms, grid: Grid, stream: bool = True) -> None:
+        """
+        Args:
+            algorithms ([type]): the names of the algorithms in SEARCH_ALGORITHMS
+            grid (Grid): the grid every algorithm searches
+            stream (bool, optional): whether the workers send every step
+                of their search, or only the path they found
+        """
+        super().__init__(race_worker, algorithms, grid, stream)
+
+
+def find_first_path(grid: Grid, algorithms=None, timeout: float = None) -> tuple:
+    """
+    Race the searches that find shortest paths and keep the first result,
+    the other searches are stopped as soon as it comes.
+    Args:
+        grid (Grid): the grid to search
+        algorithms ([type], optional): the names of the algorithms to race,
+            only the ones in OPTIMAL_ALGORITHMS are used (defaults to all of them)
+        timeout (float, optional): the most seconds to wait for a result
+    Returns:
+        tuple: the name of the algorithm that finished first and the cells of
+            its path (None if there is no path), or (None, None) on timeout
+    """
+    if algorithms is None:
+        algorithms = SEARCH_ALGORITHMS
+    algorithms = [name for name in algorithms if name in OPTIMAL_ALGORITHMS]
+    if not algorithms:
+        raise ValueError("No algorithm that finds shortest paths to race")
+
+    race = PathRace(algorithms, grid, stream=False)
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    try:
+        while race.is_running():
+            remaining = 1.0 if deadline is None else deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            for i, message in race.receive(remaining):
+                if message[3] is None:  # no error
+                    # a search that finishes without a path proves there is none
+                    return race.algorithms[i], message[4]
+    finally:
+        race.stop()
+    return None, None
@@ -1,177 +1,915 @@
-import sys
+"""
+The pathfinding algorithms, on a Grid and without pygame. The visualizer animates
+them with a tracker coloring the blocks, the races run them in worker processes.
+"""
+import copy
+import heapq
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from collections import OrderedDict
+from operator import sub
 
-from .block import Block
-from src.data_structures import PriorityQueue
-from src.data_structures import Queue
-from src.data_structures import Stack
+import numpy as np
 
+from .grid import Grid
+from .search_state import MAX_EPOCH
 
-def depth_first(start_block: Block, input_handling, is_running) -> None:
+
+# how A* orders the cells with the same f cost:
+# lifo: the cell queued last first, like the priority queue of the project
+# high_g: the cell farthest from the start first, the closest to the end
+# cross: the cell closest to the straight line from the start to the end first
+# With steps of 1 and the Manhattan distance, the cell queued last among the ones
+# of the same f cost is also the farthest from the start, so lifo and high_g
+# expand the same cells. On open grids every order expands the cells of a single
+# shortest path, cross only expands fewer cells when there are walls.
+TIE_BREAKING = ("lifo", "high_g", "cross")
+WEIGHT = 2.0  # weighted A* finds a path at most this many times the shortest
+ARA_WEIGHT = 3.0  # the weight of the first search of ARA*
+ARA_STEP = 0.5  # the weight is lowered by this much after each search of ARA*
+ARA_BUDGET = 1.0  # seconds ARA* has to improve its first path
+# the entries of the transposition tables of IDA* and Fringe Search, 20 bytes each,
+# so their memory stays the same whatever the size of the grid (0 for no cap)
+TABLE_SIZE = 1 << 16
+LANDMARKS = 8  # the landmarks of the ALT searches, each with a table of 4 bytes a cell
+# how the landmarks are picked:
+# farthest: each one the farthest from the starts and the landmarks before it
+# avoid: where the heuristic underestimates the distance the most, in the subtree
+#   of a shortest path tree from a random cell that no landmark covers yet
+LANDMARK_STRATEGIES = ("farthest", "avoid")
+
+
+class SearchStopped(Exception):
     """
-    Depth first search algorithm
-    Args:
-        start_block (Block): the start block
+    Raised by a tracker to stop the search
     """
-    found = False
-    stack = Stack()
-    stack.push(start_block)  # initialize the stack with the stack block
 
-    while not stack.is_empty() and is_running():
-        current: Block = stack.pop()
 
-        if current.is_end_block():
-            found = True
-            break
-        for neighbor in current.get_neighbors():
-            if not neighbor.is_visited() and not neighbor.is_next():
-                neighbor.set_next()
-                neighbor.set_parent(current)
-                stack.push(neighbor)
-        current.set_visited()
-        input_handling()
+class TranspositionTable:
+    """
+    The lowest cost each cell was reached with, for the cells seen in a fixed
+    number of entries. The entries go by pairs and a cell can only take one of
+    its pair: the first keeps the cell with the lowest cost, whose subtree is the
+    largest to search again, and the second takes whichever cell comes last.
+    An evicted cell is only searched again, never missed, but once the area
+    searched is much larger than the table the same cells are expanded again
+    through many paths. The costs are kept from one iteration of IDA* to the
+    next, so the paths known to be longer are pruned from the start of each one.
+    """
 
-    if found:
-        __backtrack(current.get_parent(), is_running)  # backtrack to show the path
+    def __init__(self, size: int = TABLE_SIZE) -> None:
+        """
+        Args:
+            size (int, optional): the number of entries, 0 to remember every cell
+        """
+        self.size = size
+        self._pairs = max(1, (size + 1) // 2)
+        self._cells = array("q", [-1]) * (2 * self._pairs)  # -1 for the empty ones
+        self._costs = array("q", [0]) * (2 * self._pairs)
+        self._stamps = array("I", [0]) * (2 * self._pairs)  # the iteration of each
+        self._unbounded = {}  # the cost and iteration of each cell without a cap
+        self._epoch = 1
 
+    def get(self, cell: int) -> int:
+        """
+        Get the lowest cost the cell was reached with, None if it is not in the table
+        """
+        if not self.size:
+            entry = self._unbounded.get(cell)
+            return None if entry is None else entry[0]
+        slot = self.__slot(cell)
+        if self._cells[slot] == cell:
+            return self._costs[slot]
+        if self._cells[slot + 1] == cell:
+            return self._costs[slot + 1]
+        return None
 
-def breadth_first(start_block: Block, input_handling, is_running) -> None:
+    def visit(self, cell: int, cost: int) -> bool:
+        """
+        Remember the cost of a cell unless it was reached with a lower one, or with
+        the same one in this iteration
+        Returns:
+            bool: False if the cell does not have to be searched from this cost
+        """
+        if not self.size:
+            entry = self._unbounded.get(cell)
+            if entry is not None and (entry[0] < cost or entry == (cost, self._epoch)):
+                return False
+            self._unbounded[cell] = (cost, self._epoch)
+            return True
+        slot = self.__slot(cell)
+        if self._cells[slot] != cell and self._cells[slot + 1] == cell:
+            slot += 1
+        if self._cells[slot] == cell:
+            if self._costs[slot] < cost or (
+                self._costs[slot] == cost and self._stamps[slot] == self._epoch
+            ):
+                return False
+        elif self._cells[slot] != -1:
+            if cost < self._costs[slot]:
+                # the cell takes the first entry, the cell there moves to the second
+                self.__store(
+                    slot + 1, self._cells[slot], self._costs[slot], self._stamps[slot]
+                )
+            else:
+                slot += 1
+        self.__store(slot, cell, cost, self._epoch)
+        return True
+
+    def begin(self) -> None:
+        """
+        Start a new iteration in O(1): the costs are kept, but every cell can be
+        searched again from its lowest cost
+        """
+        if self._epoch == MAX_EPOCH:
+            self._stamps = array("I", [0]) * len(self._stamps)
+            self._unbounded = {
+                cell: (cost, 0) for cell, (cost, _) in self._unbounded.items()
+            }
+            self._epoch = 0
+        self._epoch += 1
+
+    def __slot(self, cell: int) -> int:
+        # the cells close to each other are in different pairs, and a table with
+        # as many entries as the grid has cells holds every cell
+        return 2 * (cell % self._pairs)
+
+    def __store(self, slot: int, cell: int, cost: int, stamp: int) -> None:
+        self._cells[slot] = cell
+        self._costs[slot] = cost
+        self._stamps[slot] = stamp
+
+
+class LandmarkTables:
     """
-    Breadth first search algorithm
-    Args:
-        start_block (Block): the start block
+    The distances from a few landmark cells to every cell of a grid, for the ALT
+    heuristic (A*, Landmarks and Triangle inequality). A cell is at least
+    |d(L, end) - d(L, cell)| from the end whatever the landmark L, a bound going
+    around the walls where the Manhattan distance goes through them.
+    The tables are only right for the version of the walls they were made for.
     """
-    found = False
-    queue = Queue()
-    queue.enqueue(start_block)  # initialize the queue with the start block
 
-    while not queue.is_empty() and is_running():
-        current: Block = queue.dequeue()
+    def __init__(
+        self, grid: Grid, count: int = LANDMARKS, strategy: str = "farthest", seed=0
+    ) -> None:
+        """
+        Args:
+            grid (Grid): the grid, the landmarks cover the component of its starts
+            count (int, optional): the number of landmarks
+            strategy (str, optional): how the landmarks are picked, one of
+                LANDMARK_STRATEGIES
+            seed ([type], optional): the seed of the random cells of avoid
+        """
+        if strategy not in LANDMARK_STRATEGIES:
+            raise ValueError(
+                f"Unknown landmark strategy {strategy}, not in {LANDMARK_STRATEGIES}"
+            )
+        self.version = grid.version
+        self.count = count
+        self.strategy = strategy
+        self.landmarks = []
+        # the distance from each landmark (-1 if it cannot be reached), in a row of
+        # int32 for each cell, so the distances of a cell are next to each other
+        self.tables = np.empty((len(grid), 0), dtype=np.int32)
+        reach, _ = distance_map(grid)
+        if strategy == "farthest":
+            self.__pick_farthest(grid, reach)
+        else:
+            self.__pick_avoid(grid, reach, np.random.default_rng(seed))
 
-        if current.is_end_block():
-            found = True
-            break
-        for neighbor in current.get_neighbors():
-            if not neighbor.is_visited() and not neighbor.is_next():
-                neighbor.set_parent(current)
-                neighbor.set_next()
-                queue.enqueue(neighbor)
-        current.set_visited()
-        input_handling()
+    def heuristic(self, grid: Grid):
+        """
+        Get the function giving a lower bound on the distance from a cell to the
+        closest end of the grid, the largest of the Manhattan distance and of the
+        bounds of the landmarks. It is consistent, so A* still finds a shortest path.
+        """
+        count, height = len(self.landmarks), grid.height
+        rows = memoryview(self.tables.ravel())
+        ends = [
+            (divmod(end, height), rows[end * count : end * count + count])
+            for end in grid.ends
+        ]
+
+        def to_end(cell: int) -> int:
+            x, y = divmod(cell, height)
+            row = rows[cell * count : cell * count + count]
+            closest = None
+            for (end_x, end_y), distances in ends:
+                bound = max(
+                    abs(x - end_x) + abs(y - end_y),
+                    max(map(abs, map(sub, row, distances)), default=0),
+                )
+                if closest is None or bound < closest:
+                    closest = bound
+            return closest
+
+        return to_end
 
-    if found:
-        __backtrack(current.get_parent(), input_handling)  # backtrack to show the path
+    def __add(self, grid: Grid, landmark: int) -> np.ndarray:
+        distances, _ = distance_map(grid, sources=[landmark])
+        self.landmarks.append(landmark)
+        self.tables = np.column_stack((self.tables, distances))
+        return distances
 
+    def __pick_farthest(self, grid: Grid, reach: np.ndarray) -> None:
+        # the distance of each cell to the closest landmark, to the starts at first,
+        # -1 out of the component of the starts
+        closest = reach
+        for _ in range(self.count):
+            landmark = int(np.argmax(closest))
+            if closest[landmark] <= 0:
+                return  # every cell is a landmark already
+            closest = np.minimum(closest, self.__add(grid, landmark))
 
-def dijkstra(grid, start_block: Block, input_handling, is_running) -> None:
+    def __pick_avoid(self, grid: Grid, reach: np.ndarray, rng) -> None:
+        cells = np.flatnonzero(reach != -1)
+        height = grid.height
+        for _ in range(self.count):
+            root = int(rng.choice(cells))
+            distances, parents = distance_map(grid, sources=[root])
+            # how much the heuristic underestimates the distance of each cell
+            bounds = np.abs(cells // height - root // height)
+            bounds += np.abs(cells % height - root % height)
+            if self.landmarks:
+                landmarks = np.abs(self.tables[cells] - self.tables[root]).max(axis=1)
+                np.maximum(bounds, landmarks, out=bounds)
+            sizes = np.zeros(len(grid), dtype=np.int64)
+            sizes[cells] = distances[cells] - bounds
+            covered = np.zeros(len(grid), dtype=bool)
+            covered[self.landmarks] = True
+            # add up the subtrees of the shortest path tree, deepest level first
+            order = cells[np.argsort(-distances[cells], kind="stable")]
+            levels = np.flatnonzero(np.diff(distances[order])) + 1
+            for level in np.split(order, levels):
+                if distances[level[0]] == 0:
+                    break
+                np.add.at(sizes, parents[level], sizes[level])
+                np.logical_or.at(covered, parents[level], covered[level])
+            # the subtrees with a landmark are covered already
+            sizes[covered] = 0
+            landmark = int(np.argmax(sizes))
+            if sizes[landmark] <= 0:
+                return  # the heuristic is exact everywhere
+            # go down to a leaf, through the child with the largest subtree
+            children = cells[parents[cells] != -1]
+            children = children[np.lexsort((sizes[children], parents[children]))]
+            last = np.append(parents[children][1:] != parents[children][:-1], True)
+            largest = np.full(len(grid), -1, dtype=np.int64)
+            largest[parents[children][last]] = children[last]
+            while largest[landmark] != -1:
+                landmark = int(largest[landmark])
+            self.__add(grid, landmark)
+
+
+def landmark_tables(
+    grid: Grid, count: int = LANDMARKS, strategy: str = "farthest"
+) -> LandmarkTables:
     """
-    Dijkstra algorithm
+    Get the landmark tables of the current walls of a grid, kept in the grid, and
+    made now if they are out of date
+    """
+    tables = grid.landmarks
+    if (
+        tables is None
+        or tables.version != grid.version
+        or (tables.count, tables.strategy) != (count, strategy)
+    ):
+        tables = LandmarkTables(grid, count, strategy)
+        grid.landmarks = tables
+    return tables
+
+
+def build_landmarks(
+    grid: Grid, count: int = LANDMARKS, strategy: str = "farthest"
+) -> threading.Thread:
+    """
+    Make the landmark tables of the current walls of a grid in a thread, on a copy
+    of the walls so they can be edited meanwhile. The tables are only kept in the
+    grid if the walls did not change before they were done.
+    Returns:
+        threading.Thread: the thread making the tables, already started
+    """
+    snapshot = copy.copy(grid)
+    snapshot.blocked = bytearray(grid.blocked)
+
+    def build() -> None:
+        tables = LandmarkTables(snapshot, count, strategy)
+        if tables.version == grid.version:
+            grid.landmarks = tables
+
+    thread = threading.Thread(target=build, daemon=True)
+    thread.start()
+    return thread
+
+
+class SearchTracker:
+    """
+    Receives every step of a search. This one only counts them, subclasses can
+    display or send them somewhere.
+    """
+
+    def __init__(self) -> None:
+        self.expansions = 0  # the cells taken out of the frontier
+        self.discoveries = 0  # the cells put in the frontier
+
+    def expand(self, cell: int) -> None:
+        self.expansions += 1
+
+    def discover(self, cell: int) -> None:
+        self.discoveries += 1
+
+    def expand_level(self, cells) -> None:
+        """
+        Called by the level-synchronous searches with a whole level at once
+        Args:
+            cells ([type]): the cells of the level, in a NumPy array
+        """
+        self.expansions += len(cells)
+
+    def solution(self, path: list, bound: float) -> None:
+        """
+        Called by the anytime searches with each path they find before the last
+        Args:
+            path (list): the cells of the path from the start to the end
+            bound (float): the path is at most this many times the shortest
+        """
+
+
+def depth_first(grid: Grid, tracker: SearchTracker = None) -> list:
+    """
+    Depth first search
+    Args:
+        grid (Grid): the grid to search
+        tracker (SearchTracker, optional): receives every step of the search
+    Returns:
+        list: the cells of the path from a start to the first end reached, None if
+            there is none
+    """
+    tracker = tracker or SearchTracker()
+    state = grid.search_state()
+    stamps, parents, epoch = state.stamps, state.parents, state.epoch
+    for start in grid.starts:
+        state.reach(start)
+    stack = list(grid.starts)
+    while stack:
+        current = stack.pop()
+        tracker.expand(current)
+        if grid.is_end(current):
+            return state.path(current)
+        for neighbor in grid.neighbors(current):
+            if stamps[neighbor] != epoch:
+                stamps[neighbor] = epoch
+                parents[neighbor] = current
+                tracker.discover(neighbor)
+                stack.append(neighbor)
+    return None
+
+
+def breadth_first(grid: Grid, tracker: SearchTracker = None) -> list:
+    """
+    Breadth first search
     Args:
-        grid ([type]): the grid containing all blocks
-        start_block (Block): the start block
+        grid (Grid): the grid to search
+        tracker (SearchTracker, optional): receives every step of the search
+    Returns:
+        list: the cells of the path from a start to the first end reached, None if
+            there is none
     """
-    found = False
-    prio_queue = PriorityQueue()
-    # initially assign infinity to the distance from each block to start block
-    dis = {block: sys.maxsize for row in grid for block in row}
-    dis[start_block] = 0
+    tracker = tracker or SearchTracker()
+    state = grid.search_state()
+    stamps, parents, epoch = state.stamps, state.parents, state.epoch
+    for start in grid.starts:
+        state.reach(start)
+    queue = deque(grid.starts)
+    while queue:
+        current = queue.popleft()
+        tracker.expand(current)
+        if grid.is_end(current):
+            return state.path(current)
+        for neighbor in grid.neighbors(current):
+            if stamps[neighbor] != epoch:
+                stamps[neighbor] = epoch
+                parents[neighbor] = current
+                tracker.discover(neighbor)
+                queue.append(neighbor)
+    return None
 
-    # initialize the queue with the start block
-    prio_queue.enqueue(start_block, dis[start_block])
 
-    # loop through the queue
-    while not prio_queue.is_empty() and is_running():
-        current: Block = prio_queue.dequeue()
+def level_breadth_first(grid: Grid, tracker: SearchTracker = None) -> list:
+    """
+    Breadth first search on NumPy arrays, expanding a whole level at once
+    Args:
+        grid (Grid): the grid to search
+        tracker (SearchTracker, optional): receives every level of the search
+    Returns:
+        list: the cells of the path from a start to the first end reached, None if
+            there is none
+    """
+    distances, parents = distance_map(grid, tracker, goals=grid.ends)
+    reached = [end for end in grid.ends if distances[end] != -1]
+    if not reached:
+        return None
+    path = [min(reached, key=lambda end: distances[end])]
+    while parents[path[-1]] != -1:
+        path.append(int(parents[path[-1]]))
+    path.reverse()
+    return path
 
-        if current.is_end_block():
-            found = True
+
+def distance_map(
+    grid: Grid, tracker: SearchTracker = None, sources=None, goals=None
+) -> tuple:
+    """
+    Get the distance of every cell from the closest source with a breadth first
+    search on NumPy arrays: the cells of the next level are found for the whole
+    level at once, by moving the indices of the level in the 4 directions and
+    keeping the ones that are free and not reached yet.
+    Args:
+        grid (Grid): the grid to search
+        tracker (SearchTracker, optional): receives every level of the search
+        sources ([type], optional): the cells the distances are from, all at
+            once (defaults to the starts of the grid)
+        goals ([type], optional): the search stops after the level of the first
+            of these cells reached
+    Returns:
+        tuple: the distance of each cell (-1 if it cannot be reached) and the cell
+            it is reached from (-1 for none), in int32 arrays indexed by cell
+    """
+    tracker = tracker or SearchTracker()
+    sources = grid.starts if sources is None else sources
+    height, size = grid.height, len(grid)
+    free = np.frombuffer(grid.blocked, dtype=np.uint8) == 0
+    distances = np.full(size, -1, dtype=np.int32)
+    parents = np.full(size, -1, dtype=np.int32)
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    distances[frontier] = 0
+    if goals is not None:
+        goals = np.asarray(goals, dtype=np.int64)
+    level = 0
+    while frontier.size:
+        tracker.expand_level(frontier)
+        if goals is not None and (distances[goals] != -1).any():
             break
-        for neighbor in current.get_neighbors():
-            if not neighbor.is_visited() and not neighbor.is_next():
-                # temp is the distance from current to start,
-                # plus the distance from the neighbor to current block,
-                # which will be 1 since all blocks are next to each other
-                temp = dis[current] + 1
-                # if temp is better, make it the distance
-                if temp < dis[neighbor]:
-                    dis[neighbor] = temp
-                    neighbor.set_parent(current)
-                    neighbor.set_next()
-                    prio_queue.enqueue(neighbor, dis[neighbor])
-        current.set_visited()
-        input_handling()
-
-    if found:
-        __backtrack(current.get_parent(), is_running)
+        level += 1
+        # the neighbors of the level in the same order as Grid.neighbors
+        y = frontier % height
+        origins = []
+        targets = []
+        for inside, offset in (
+            (frontier >= height, -height),  # north
+            (y < height - 1, 1),  # east
+            (frontier < size - height, height),  # south
+            (y > 0, -1),  # west
+        ):
+            origin = frontier[inside]
+            origins.append(origin)
+            targets.append(origin + offset)
+        origin = np.concatenate(origins)
+        target = np.concatenate(targets)
+        new = free[target] & (distances[target] == -1)
+        origin, target = origin[new], target[new]
+        # a cell reached from several cells of the level keeps the last one
+        parents[target] = origin
+        frontier = target[parents[target] == origin]
+        distances[frontier] = level
+    return distances, parents
+
+
+def dijkstra(grid: Grid, tracker: SearchTracker = None) -> list:
+    """
+    Dijkstra algorithm
+    Args:
+        grid (Grid): the grid to search
+        tracker (SearchTracker, optional): receives every step of the search
+    Returns:
+        list: the cells of the path from a start to the first end reached, None if
+            there is none
+    """
+    return __best_first(grid, tracker, 0, "lifo")
 
 
 def a_star(
-    grid, start_block: Block, end_pos: tuple, input_handling, is_running
-) -> None:
+    grid: Grid,
+    tracker: SearchTracker = None,
+    tie_breaking: str = "high_g",
+    weight: float = 1.0,
+) -> list:
     """
-    A* algorithm
+    A* algorithm, with the Manhattan distance to the closest end as heuristic
     Args:
-        grid ([type]): the grid containing all blocks
-        start_block (Block): the starting block
-        end_pos (tuple): the position of the end block
-    """
-    found = False
-
-    # for each block on the grid
-    # g cost = distance to the starting block
-    # h cost (heuristic) = distance to the end block
-    # f cost (which is our priority) = g cost + h cost
-    g_cost = {block: sys.maxsize for row in grid for block in row}
-    g_cost[start_block] = 0
-    h_cost = {block: __get_heuristic(block, end_pos) for row in grid for block in row}
-    f_cost = {block: (g_cost[block] + h_cost[block]) for row in grid for block in row}
-
-    p_queue = PriorityQueue()
-    p_queue.enqueue(
-        start_block, f_cost[start_block]
-    )  # initalize the queue with the start block
-
-    while not p_queue.is_empty() and is_running():
-        current: Block = p_queue.dequeue()
-
-        if current.is_end_block():
-            found = True
-            break
-        for neighbor in current.get_neighbors():
-            if not neighbor.is_visited() and not neighbor.is_next():
-                # since each block is next to each other,
-                # the g cost of neighbor is simply 1 more than that of current
+        grid (Grid): the grid to search
+        tracker (SearchTracker, optional): receives every step of the search
+        tie_breaking (str, optional): how the cells with the same f cost are
+            ordered, one of TIE_BREAKING
+        weight (float, optional): the heuristic is multiplied by it, the path found
+            is then at most this many times the shortest
+    Returns:
+        list: the cells of the path from a start to the first end reached, None if
+            there is none
+    """
+    return __best_first(grid, tracker, weight, tie_breaking)
+
+
+def weighted_a_star(
+    grid: Grid,
+    tracker: SearchTracker = None,
+    weight: float = WEIGHT,
+    tie_breaking: str = "high_g",
+) -> list:
+    """
+    A* with a weighted heuristic: far fewer cells are expanded on open maps, for
+    a path at most weight times the shortest
+    """
+    return __best_first(grid, tracker, weight, tie_breaking)
+
+
+def alt_star(
+    grid: Grid,
+    tracker: SearchTracker = None,
+    tie_breaking: str = "high_g",
+    count: int = LANDMARKS,
+    strategy: str = "farthest",
+) -> list:
+    """
+    A* with the ALT heuristic: the distances from a few landmarks bound the
+    distance to the end around the walls, so far fewer cells are expanded on
+    mazes than with the Manhattan distance, for a path as short
+    Args:
+        grid (Grid): the grid to search
+        tracker (SearchTracker, optional): receives every step of the search
+        tie_breaking (str, optional): one of TIE_BREAKING
+        count (int, optional): the number of landmarks
+        strategy (str, optional): one of LANDMARK_STRATEGIES
+    Returns:
+        list: the cells of the path from a start to the first end reached, None if
+            there is none
+    """
+    heuristic = landmark_tables(grid, count, strategy).heuristic(grid)
+    return __best_first(grid, tracker, 1.0, tie_breaking, heuristic)
+
+
+def ara_star(
+    grid: Grid,
+    tracker: SearchTracker = None,
+    weight: float = ARA_WEIGHT,
+    step: float = ARA_STEP,
+    budget: float = ARA_BUDGET,
+    tie_breaking: str = "high_g",
+) -> list:
+    """
+    Anytime Repairing A*: a path at most weight times the shortest is found
+    quickly, then the weight is lowered by step and the path improved while there
+    is time left, each search reusing the costs of the previous ones.
+    The first path is always found, the budget only stops the improvements.
+    Args:
+        grid (Grid): the grid to search
+        tracker (SearchTracker, optional): receives every step of the search, and
+            every path found before the last one
+        weight (float, optional): the weight of the heuristic in the first search
+        step (float, optional): how much the weight is lowered after each search
+        budget (float, optional): the seconds to improve the path in, no limit
+            when None
+        tie_breaking (str, optional): one of TIE_BREAKING
+    Returns:
+        list: the cells of the best path found, None if there is none
+    """
+    tracker = tracker or SearchTracker()
+    tie = __tie_breaker(grid, tie_breaking)
+    deadline = None if budget is None else time.perf_counter() + budget
+    state = grid.search_state()
+    stamps, epoch = state.stamps, state.epoch
+    parents, g_cost = state.parents, state.costs
+    for start in grid.starts:
+        state.reach(start)
+    closed = set()  # emptied for each search, unlike the costs
+    inconsistent = set()  # the closed cells whose cost lowered during a search
+    frontier = set(grid.starts)  # the cells in the queue
+    p_queue = []
+    pushed = 0  # the number of cells put in the queue, to break the ties
+    path = None
+    end, end_cost = None, math.inf  # the end reached at the lowest cost
+    for start in grid.starts:
+        if grid.is_end(start):
+            end, end_cost = start, 0
+
+    while True:
+        # (re)build the queue with the weight of this search
+        for cell in frontier:
+            pushed += 1
+            f_cost = g_cost[cell] + weight * grid.to_end(cell)
+            p_queue.append((f_cost, tie(cell, g_cost[cell]), -pushed, cell))
+        heapq.heapify(p_queue)
+
+        # expand until no cell in the queue can lead to a better path
+        while p_queue and end_cost > p_queue[0][0]:
+            if path is not None and deadline is not None:
+                if time.perf_counter() > deadline:
+                    return path  # out of time, keep the last path
+            _, _, _, current = heapq.heappop(p_queue)
+            if current not in frontier:
+                continue  # queued again with a lower cost since then
+            frontier.remove(current)
+            closed.add(current)
+            tracker.expand(current)
+            for neighbor in grid.neighbors(current):
                 g_temp = g_cost[current] + 1
-                # since h cost is constant
-                # f cost only varies based on g cost
-                if g_temp < g_cost[neighbor]:
+                if stamps[neighbor] != epoch or g_temp < g_cost[neighbor]:
+                    if stamps[neighbor] != epoch:
+                        stamps[neighbor] = epoch
+                        tracker.discover(neighbor)
                     g_cost[neighbor] = g_temp
-                    f_cost[neighbor] = g_temp + h_cost[neighbor]
-                    neighbor.set_parent(current)
-                    neighbor.set_next()
-                    p_queue.enqueue(neighbor, f_cost[neighbor])
-        current.set_visited()
-        input_handling()
+                    parents[neighbor] = current
+                    if g_temp < end_cost and grid.is_end(neighbor):
+                        end, end_cost = neighbor, g_temp
+                    if neighbor in closed:
+                        inconsistent.add(neighbor)
+                    else:
+                        frontier.add(neighbor)
+                        pushed += 1
+                        f_cost = g_temp + weight * grid.to_end(neighbor)
+                        heapq.heappush(
+                            p_queue, (f_cost, tie(neighbor, g_temp), -pushed, neighbor)
+                        )
+
+        if end is None:
+            return None  # no end can be reached whatever the weight
+        path = state.path(end)
+        if weight <= 1 or (deadline is not None and time.perf_counter() > deadline):
+            return path
+        tracker.solution(path, weight)
+
+        # the next search starts from the cells left and the inconsistent ones
+        weight = max(1.0, weight - step)
+        frontier |= inconsistent
+        inconsistent.clear()
+        closed.clear()
+        p_queue = []
 
-    if found:
-        __backtrack(current.get_parent(), is_running)
+
+def ida_star(
+    grid: Grid, tracker: SearchTracker = None, table_size: int = TABLE_SIZE
+) -> list:
+    """
+    Iterative deepening A*: depth first searches bounded by the f cost, the bound
+    raised to the lowest f cost over it after each one. Only the current path is
+    kept, plus a transposition table of a fixed size pruning the cells reached
+    again at a higher cost, so the memory does not grow with the grid.
+    The iterations stop when no cell was left out by the bound, so proving there
+    is no path takes as many searches of the area that can be reached as there
+    are bounds up to the farthest f cost in it. With an area much larger than the
+    table, each of these searches expands the same cells again many times.
+    Args:
+        grid (Grid): the grid to search
+        tracker (SearchTracker, optional): receives every step of the search
+        table_size (int, optional): the entries of the transposition table, 0 to
+            remember every cell
+    Returns:
+        list: the cells of the path from a start to the first end reached, None if
+            there is none
+    """
+    tracker = tracker or SearchTracker()
+    table = TranspositionTable(min(table_size, len(grid)))
+    bound = min(grid.to_end(start) for start in grid.starts)
+    while True:
+        table.begin()
+        for start in grid.starts:
+            table.visit(start, 0)
+        next_bound = math.inf
+        for start in grid.starts:
+            path, over = __bounded_search(grid, tracker, table, start, bound)
+            if path is not None:
+                return path
+            next_bound = min(next_bound, over)
+        if next_bound == math.inf:
+            return None  # no cell was left out, every cell was searched
+        bound = next_bound
 
 
-def __get_heuristic(block: Block, end_pos: tuple) -> float:
+def __bounded_search(
+    grid: Grid, tracker: SearchTracker, table: TranspositionTable, start: int, bound
+) -> tuple:
     """
-    Calculate the heuristic distance for a block
+    Depth first search from a start of the cells with an f cost up to the bound
+    Returns:
+        tuple: the path to the first end reached (None if none was) and the lowest
+            f cost over the bound of the cells left out, infinite if none was
     """
-    block_pos = block.get_position()
-    x = abs(block_pos[0] - end_pos[0])
-    y = abs(block_pos[1] - end_pos[1])
-    return x + y
+    if grid.to_end(start) > bound:
+        return None, grid.to_end(start)
+    tracker.expand(start)
+    if grid.is_end(start):
+        return [start], math.inf
+    next_bound = math.inf
+    path = [start]
+    on_path = {start}
+    # the neighbors left to search at each depth, the closest to an end first
+    stack = [iter(__by_heuristic(grid, start))]
+    while stack:
+        neighbor = next(stack[-1], None)
+        if neighbor is None:
+            stack.pop()
+            on_path.remove(path.pop())
+            continue
+        g_cost = len(path)
+        if neighbor in on_path:
+            continue
+        f_cost = g_cost + grid.to_end(neighbor)
+        if f_cost > bound:
+            best = table.get(neighbor)
+            if best is None or best > g_cost:
+                # only left out if it was not searched already from a shorter path
+                next_bound = min(next_bound, f_cost)
+            continue
+        if not table.visit(neighbor, g_cost):
+            continue  # searched already from a shorter or as short path
+        tracker.expand(neighbor)
+        path.append(neighbor)
+        if grid.is_end(neighbor):
+            return path, math.inf
+        on_path.add(neighbor)
+        stack.append(iter(__by_heuristic(grid, neighbor)))
+    return None, next_bound
 
 
-def __backtrack(root: Block, is_running) -> None:
+def fringe_search(
+    grid: Grid, tracker: SearchTracker = None, table_size: int = TABLE_SIZE
+) -> list:
     """
-    Backtrack to highlight the shortest path
+    Fringe Search: like IDA*, the cells are searched in passes bounded by the f
+    cost, but the fringe is kept between the passes so no pass starts over.
+    There is no priority queue: the cells under the bound are searched depth first
+    and the others wait for the next pass. The cells are linked to their parent,
+    so only the branches leading to the fringe stay in memory, and the costs are
+    kept in a transposition table of a fixed size instead of a dictionary.
+    A cell evicted from the table can be reached again around a loop, so the
+    branches are cut at the length of the longest path without loops, the number
+    of free cells, for the search to end when there is no path.
     Args:
-        root (Block): the previous block visitted
+        grid (Grid): the grid to search
+        tracker (SearchTracker, optional): receives every step of the search
+        table_size (int, optional): the entries of the transposition table, 0 to
+            remember every cell
+    Returns:
+        list: the cells of the path from a start to the first end reached, None if
+            there is none
+    """
+    tracker = tracker or SearchTracker()
+    table = TranspositionTable(min(table_size, len(grid)))
+    longest = len(grid) - grid.blocked.count(1)
+    # each node is (cell, g cost, parent node)
+    later = []
+    for start in grid.starts:
+        if table.visit(start, 0):
+            later.append((start, 0, None))
+    bound = min(grid.to_end(start) for start in grid.starts)
+    while later:
+        now, later = later[::-1], []
+        next_bound = math.inf
+        while now:
+            node = now.pop()
+            cell, g_cost, _ = node
+            best = table.get(cell)
+            if best is not None and best < g_cost:
+                continue  # reached again with a lower cost since then
+            f_cost = g_cost + grid.to_end(cell)
+            if f_cost > bound:
+                next_bound = min(next_bound, f_cost)
+                later.append(node)
+                continue
+            tracker.expand(cell)
+            if grid.is_end(cell):
+                path = []
+                while node is not None:
+                    path.append(node[0])
+                    node = node[2]
+                path.reverse()
+                return path
+            # searched right after the cell, the closest to the end first
+            if g_cost + 1 >= longest:
+                continue
+            for neighbor in reversed(__by_heuristic(grid, cell)):
+                if table.visit(neighbor, g_cost + 1):
+                    tracker.discover(neighbor)
+                    now.append((neighbor, g_cost + 1, node))
+        bound = next_bound
+    return None
+
+
+def __best_first(
+    grid: Grid,
+    tracker: SearchTracker,
+    weight: float,
+    tie_breaking: str,
+    heuristic=None,
+) -> list:
+    """
+    Expand the cells by their distance to the closest start plus their weighted
+    heuristic, Dijkstra when the weight is 0. The heuristic is the Manhattan
+    distance to the closest end unless another function of the cell is given.
+    """
+    tracker = tracker or SearchTracker()
+    to_end = heuristic or grid.to_end
+    tie = __tie_breaker(grid, tie_breaking)
+    state = grid.search_state()
+    stamps, closed, epoch = state.stamps, state.closed, state.epoch
+    parents, g_cost = state.parents, state.costs
+    for start in grid.starts:
+        state.reach(start)
+    p_queue = [(weight * to_end(start), 0, 0, start) for start in grid.starts]
+    heapq.heapify(p_queue)
+    pushed = 0  # the number of cells put in the queue, to break the ties
+    while p_queue:
+        _, _, _, current = heapq.heappop(p_queue)
+        if closed[current] == epoch:
+            continue  # a better path to the cell was found after it was queued
+        closed[current] = epoch
+        tracker.expand(current)
+        if grid.is_end(current):
+            return state.path(current)
+        for neighbor in grid.neighbors(current):
+            if closed[neighbor] == epoch:
+                continue
+            g_temp = g_cost[current] + 1
+            if stamps[neighbor] != epoch:
+                stamps[neighbor] = epoch
+                tracker.discover(neighbor)
+            elif g_temp >= g_cost[neighbor]:
+                continue
+            g_cost[neighbor] = g_temp
+            parents[neighbor] = current
+            pushed += 1
+            f_cost = g_temp + weight * to_end(neighbor)
+            heapq.heappush(p_queue, (f_cost, tie(neighbor, g_temp), -pushed, neighbor))
+    return None
+
+
+def __by_heuristic(grid: Grid, cell: int) -> list:
+    """
+    Get the neighbors of a cell, the closest to an end first
+    """
+    return sorted(grid.neighbors(cell), key=grid.to_end)
+
+
+def __tie_breaker(grid: Grid, tie_breaking: str):
     """
-    while not root.is_start_block() and is_running:
-        root.set_path()  # set the block to be part of the path
-        root = root.get_parent()  # keep backtracking
+    Get the function giving the second key of a cell in the queue, from its cell
+    and its distance to the start, the lowest coming out first.
+    With several starts or ends, "cross" measures the distance to the line from
+    the end closest to the cell, the one its heuristic is taken from, to the
+    start closest to that end.
+    """
+    if tie_breaking == "lifo":
+        return lambda cell, g: 0
+    if tie_breaking == "high_g":
+        return lambda cell, g: -g
+    if tie_breaking == "cross":
+        # each end with the vector from it to its closest start
+        segments = []
+        for end in grid.ends:
+            start = min(grid.starts, key=lambda start: grid.heuristic(start, end))
+            end_x, end_y = grid.position(end)
+            start_x, start_y = grid.position(start)
+            segments.append((end_x, end_y, start_x - end_x, start_y - end_y))
+
+        def cross(cell: int, g: int) -> int:
+            # the cross product of the vectors from the end to the cell and to the start
+            x, y = grid.position(cell)
+            if len(segments) == 1:
+                end_x, end_y, dx, dy = segments[0]
+            else:
+                end_x, end_y, dx, dy = min(
+                    segments, key=lambda s: abs(x - s[0]) + abs(y - s[1])
+                )
+            return abs((x - end_x) * dy - (y - end_y) * dx)
+
+        return cross
+    raise ValueError(f"Unknown tie-breaking {tie_breaking}, not in {TIE_BREAKING}")
+
+
+# the searches by name, in the order of the visualizer
+SEARCH_ALGORITHMS = OrderedDict(
+    a_star=a_star,
+    dijkstra=dijkstra,
+    breadth_first=breadth_first,
+    depth_first=depth_first,
+    weighted_a_star=weighted_a_star,
+    ara_star=ara_star,
+    ida_star=ida_star,
+    fringe_search=fringe_search,
+    level_breadth_first=level_breadth_first,
+    alt_star=alt_star,
+)
+
+# the searches that always find a shortest path
+OPTIMAL_ALGORITHMS = {
+    "a_star",
+    "dijkstra",
+    "breadth_first",
+    "level_breadth_first",
+    "ida_star",
+    "fringe_search",
+    "alt_star",
+}
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import math
 import random
 from os import getcwd
 
 import pygame
+from pygame.constants import K_0
 from pygame.constants import K_1
 from pygame.constants import K_2
 from pygame.constants import K_3
 from pygame.constants import K_4
+from pygame.constants import K_5
+from pygame.constants import K_6
+from pygame.constants import K_7
+from pygame.constants import K_8
+from pygame.constants import K_9
 
 from . import BLOCK_WIDTH
 from . import BLOCKS_EACH_LINE
@@ -17,17 +24,57 @@ from . import START_POS
 from . import WIN_H
 from . import WIN_W
 from .block import Block
-from .pathfinding_algorithms import a_star
-from .pathfinding_algorithms import breadth_first
-from .pathfinding_algorithms import depth_first
-from .pathfinding_algorithms import dijkstra
+from .components import ComponentIndex
+from .grid import Grid
+from .path_race import PathRace
+from .pathfinding_algorithms import build_landmarks
+from .pathfinding_algorithms import SEARCH_ALGORITHMS
+from .pathfinding_algorithms import SearchStopped
+from .pathfinding_algorithms import SearchTracker
 from src.visualizers.base_visualizer import BaseVisualizer
+from src.visualizers.frame_exporter import FrameExporter
+from src.visualizers.frame_exporter import LAST_FRAME_DURATION
+from src.visualizers.race import OPERATIONS
 
 
 # colors
 BLACK = (0, 0, 0)
 YELLOW = (244, 242, 140)
 GREEN = (10, 225, 20)
+RED = (215, 17, 27)
+# every color drawn on the screen, exported frames are quantized to them
+EXPORT_PALETTE = [BLACK, YELLOW, GREEN] + [status.value for status in Block.ColorStatus]
+
+# the name displayed in the menu for each algorithm
+ALGORITHM_TITLES = {
+    "a_star": "A* algorithm",
+    "dijkstra": "Dijkstra algorithm",
+    "breadth_first": "Breadth First Search",
+    "depth_first": "Depth First Search",
+    "weighted_a_star": "Weighted A*",
+    "ara_star": "Anytime A* (ARA*)",
+    "ida_star": "Iterative Deepening A*",
+    "fringe_search": "Fringe Search",
+    "level_breadth_first": "BFS by levels (NumPy)",
+    "alt_star": "A* with landmarks (ALT)",
+}
+# the shorter name displayed above the pane of each algorithm in a race
+RACE_TITLES = {
+    "a_star": "A*",
+    "dijkstra": "Dijkstra",
+    "breadth_first": "BFS",
+    "depth_first": "DFS",
+    "weighted_a_star": "Weighted A*",
+    "ara_star": "ARA*",
+    "ida_star": "IDA*",
+    "fringe_search": "Fringe",
+    "level_breadth_first": "BFS levels",
+    "alt_star": "ALT",
+}
+FRAME_TIME = 1 / 60  # seconds between the frames of a race
+RACE_TITLE_H = 32  # height of the name and results above each pane of a race
+RACE_GAP = 4  # space between the panes of a race
+NO_PATH_Y = 270  # where walled off ends are shown, below the instructions
 
 
 class PathfindingVisualizer(BaseVisualizer):
@@ -35,40 +82,92 @@ class PathfindingVisualizer(BaseVisualizer):
     The GUI to visualize the pathfinding process for different pathfinding algorithms
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self, algorithm: int = 1, seed: int = None, exporter: FrameExporter = None
+    ) -> None:
+        """
+        Args:
+            algorithm (int, optional): the number of the algorithm chosen at first
+            seed (int, optional): the seed the obstacles are generated with
+            exporter (FrameExporter, optional): find a path through random obstacles
+                offscreen at once and give the frames to the exporter, instead of
+                waiting for the user
+        """
         ##### initialize variables #####
         self._grid = []  # the grid containing all the blocks
         self._cleared = True  # if the grid is cleared (all walkable)
         self._looping = True  # keep the mainloop running
         self._generated = False  # if random barriers are already generated
+        self._random = random.Random(seed)  # generates the obstacles
+        self._exporter = exporter  # takes the frames when exporting
+        self._components = None  # the connected components of the blocks
+        self._reachable = True  # if the end can be reached from the start
+        self._landmarks = None  # the thread making the landmark tables of ALT
 
         ##### initialize the screen display #####
         icon_path = getcwd() + "/images/path_icon.ico"
         super().__init__(WIN_W, WIN_H, "Pathfinding Visualizer", BLACK, icon_path)
+        Block.profiler = self._profiler
         self.__show_instruction_text()  # show the instruction text
         self.__create_blocks()  # create the blocks for the grid
-        self.__mainloop()
+        self.__pick_algo(algorithm)
+        if exporter is None:
+            self.__mainloop()
+        else:
+            self.__export()
 
     def __mainloop(self):
         while self._looping:
-            super().draw()
-            self.__input_handling()
-
-    def __input_handling(self) -> None:
+            # the grid only changes on input, the mouse moving or a key being pressed
+            events = super().idle()
+            with self._profiler.phase("input"):
+                self.__input_handling(events)
+            self.__show_reachable()
+            if not events:
+                self.__build_landmarks()
+
+    def __export(self) -> None:
+        """
+        Find a path through random obstacles offscreen and give the frames
+        to the exporter
+        """
+        self.__generate_obstacles()
+
+        def frame_hook(screen) -> None:
+            if self._exporter.tick():
+                self._exporter.capture(screen)
+
+        self._exporter.capture(self._screen)
+        Block.frame_hook = frame_hook
+        try:
+            self.__start_finding()
+        finally:
+            Block.frame_hook = None
+        self._exporter.capture(self._screen, LAST_FRAME_DURATION)
+        self._exporter.close()
+
+    def __input_handling(self, events) -> None:
         """
         Handle mouse and keyboard input from user
+        Args:
+            events ([type]): the events that woke the screen up
         """
+        # with Ctrl or Shift held a click sets a start or end point instead
+        drawing = not pygame.key.get_mods() & (pygame.KMOD_CTRL | pygame.KMOD_SHIFT)
         # if the left mouse is pressed -> draw barrier
-        if pygame.mouse.get_pressed() == (1, 0, 0):
+        if drawing and pygame.mouse.get_pressed() == (1, 0, 0):
             pos = pygame.mouse.get_pos()
             self.__update_block_clicked(pos, "barrier")
             self._cleared = False
         # if the right mouse is pressed -> delete
-        elif pygame.mouse.get_pressed() == (0, 0, 1):
+        elif drawing and pygame.mouse.get_pressed() == (0, 0, 1):
             pos = pygame.mouse.get_pos()
             self.__update_block_clicked(pos, "walkable")
 
-        for event in pygame.event.get():
+        for event in events:
+            # F3/F4 -> show the frame profiler/save its timeline
+            if self._profiler.handle(event):
+                continue
             # click exit -> quit and return to menu
             if event.type == pygame.QUIT:
                 quit()
@@ -95,15 +194,26 @@ class PathfindingVisualizer(BaseVisualizer):
                 # Return Key -> Start
                 elif event.key == pygame.K_RETURN:
                     self._generated = True
-                    # Update the neighbors before running the algorithm
-                    for row in self._grid:
-                        for block in row:
-                            block.update_neighbors(self._grid)
                     self.__start_finding()
 
+                # V -> race all the algorithms
+                elif event.key == pygame.K_v:
+                    self.__race()
+
                 # number -> choose the corresponding algorithm
                 else:
-                    switch = {K_1: 1, K_2: 2, K_3: 3, K_4: 4}
+                    switch = {
+                        K_1: 1,
+                        K_2: 2,
+                        K_3: 3,
+                        K_4: 4,
+                        K_5: 5,
+                        K_6: 6,
+                        K_7: 7,
+                        K_8: 8,
+                        K_9: 9,
+                        K_0: 10,
+                    }
                     chosen = switch.get(event.key, -1)
                     self.__pick_algo(chosen)
 
@@ -116,11 +226,18 @@ class PathfindingVisualizer(BaseVisualizer):
                     # Ctrl + left click -> set end point
                     else:
                         self.__update_block_clicked(pos, "end")
+                elif pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                    # Shift + left/right click -> add or remove a start/end point
+                    if event.button == 1:
+                        self.__update_block_clicked(pos, "extra start")
+                    else:
+                        self.__update_block_clicked(pos, "extra end")
 
     def __create_blocks(self) -> None:
         """
         create and add the blocks on the grid
         """
+        Block.barrier_hook = None
         # add new blocks
         for i in range(BLOCKS_EACH_LINE):
             self._grid.append([])
@@ -133,6 +250,63 @@ class PathfindingVisualizer(BaseVisualizer):
                 self._grid[i].append(new_block)
         # iniitalize the start and end blocks
         self.__init_start_end_points()
+        self.__index_components()
+
+    def __index_components(self) -> None:
+        """
+        Index the components of the blocks and keep them up to date with the
+        barriers from now on, their grid is the one searched
+        """
+        grid = Grid.from_blocks(self._grid, self.start_point, self.end_point)
+        self._components = ComponentIndex(grid)
+        Block.barrier_hook = self.__barrier_changed
+
+    def __barrier_changed(self, x: int, y: int, is_barrier: bool) -> None:
+        cell = self._components.grid.cell((x, y))
+        if is_barrier:
+            self._components.set_barrier(cell)
+        else:
+            self._components.set_walkable(cell)
+
+    def __is_reachable(self) -> bool:
+        """
+        Check in O(1) whether an end can be reached from a start
+        """
+        grid = self._components.grid
+        starts = [self.start_point] + self.extra_starts
+        ends = [grid.cell(end) for end in [self.end_point] + self.extra_ends]
+        return any(
+            self._components.connected(grid.cell(start), end)
+            for start in starts
+            for end in ends
+        )
+
+    def __build_landmarks(self) -> None:
+        """
+        Make the landmark tables of the barriers in the background once they stop
+        changing, so they are ready when the search starts. Only ALT uses them, so
+        they are not made while another algorithm is picked.
+        """
+        if list(SEARCH_ALGORITHMS)[self.algo_picked - 1] != "alt_star":
+            return
+        if self._landmarks is not None and self._landmarks.is_alive():
+            return
+        grid = self._components.grid
+        if grid.landmarks is None or grid.landmarks.version != grid.version:
+            self._landmarks = build_landmarks(grid)
+
+    def __show_reachable(self) -> None:
+        """
+        Tell the user when every end is walled off, as soon as it happens
+        """
+        reachable = self.__is_reachable()
+        if reachable == self._reachable:
+            return
+        self._reachable = reachable
+        self._screen.fill(BLACK, (SIZE + 10, NO_PATH_Y, WIN_W - SIZE - 10, 25))
+        if not reachable:
+            text = self.font.render("No path: the end is walled off", False, RED)
+            self._screen.blit(text, (SIZE + 10, NO_PATH_Y))
 
     def __show_instruction_text(self) -> None:
         """
@@ -145,11 +319,13 @@ class PathfindingVisualizer(BaseVisualizer):
         instruction_list = [
             "Left Click: Draw Barrier",
             "Right Click: Remove Barrier",
-            "Ctrl + Left Click: Set Start Point",
-            "Ctrl + Right Click: Set End Point",
+            "Ctrl + Left/Right Click: Set Start/End",
+            "Shift + Left/Right Click: Add Start/End",
             "R: Generate Random Obstacle",
             "C: reset",
             "<Enter>: Start Finding Path",
+            "V: Race All Algorithms",
+            "F3/F4: Frame Profiler/Timeline",
             "ESC: Exit visualizer",
             "",
             "",
@@ -167,10 +343,8 @@ class PathfindingVisualizer(BaseVisualizer):
 
         # list of algorithms' names
         self.algo_names = [
-            "   1: A* algorithm",
-            "   2: Dijkstra algorithm",
-            "   3: Breadth First Search",
-            "   4: Depth First Search",
+            f"   {i % 10}: {ALGORITHM_TITLES[name]}"
+            for i, name in enumerate(SEARCH_ALGORITHMS, 1)
         ]
 
         self.algo_text = []  # rendered text for the algorithms names
@@ -226,7 +400,14 @@ class PathfindingVisualizer(BaseVisualizer):
             x = x // BLOCK_WIDTH
             y = y // BLOCK_WIDTH
 
-            if (x, y) != self.start_point and (x, y) != self.end_point:
+            block = self._grid[x][y]
+            if status == "extra start" and (x, y) in self.extra_starts:
+                self.extra_starts.remove((x, y))
+                block.set_walkable()
+            elif status == "extra end" and (x, y) in self.extra_ends:
+                self.extra_ends.remove((x, y))
+                block.set_walkable()
+            elif not block.is_start_block() and not block.is_end_block():
                 if status == "walkable":
                     self._grid[x][y].set_walkable()
                 elif status == "barrier":
@@ -237,23 +418,32 @@ class PathfindingVisualizer(BaseVisualizer):
                         self._grid[i][j].set_walkable()
                     self.start_point = (x, y)
                     self._grid[x][y].set_start()
-                else:
+                elif status == "end":
                     if self.end_point != None:
                         i, j = self.end_point
                         self._grid[i][j].set_walkable()
                     self.end_point = (x, y)
                     self._grid[x][y].set_end()
+                elif status == "extra start":
+                    self.extra_starts.append((x, y))
+                    block.set_start()
+                else:
+                    self.extra_ends.append((x, y))
+                    block.set_end()
 
     def __clear(self) -> None:
         """
         Reset the grids to its initial state
         """
-        # reset all the blocks on the screen
-        for i in range(BLOCKS_EACH_LINE):
-            for j in range(BLOCKS_EACH_LINE):
-                self._grid[i][j].reset()
+        # reset all the blocks at once: the grid is filled in one go and the
+        # components indexed again, instead of removing the barriers one by one
+        for column in self._grid:
+            for block in column:
+                block.reset(draw=False)
+        self._screen.fill(Block.ColorStatus.WALKABLE.value, (0, 0, SIZE, SIZE))
         # put the start and end blocks to default locations
         self.__init_start_end_points()
+        self.__index_components()
 
     def __generate_obstacles(self) -> None:
         """
@@ -261,8 +451,8 @@ class PathfindingVisualizer(BaseVisualizer):
         """
         # generate the obstacles randomly
         for _ in range(SIZE * 4 // 3):
-            rand_x = random.randint(0, BLOCKS_EACH_LINE - 1)
-            rand_y = random.randint(0, BLOCKS_EACH_LINE - 1)
+            rand_x = self._random.randint(0, BLOCKS_EACH_LINE - 1)
+            rand_y = self._random.randint(0, BLOCKS_EACH_LINE - 1)
             if self._grid[rand_x][rand_y].is_walkable():
                 self._grid[rand_x][rand_y].set_barrier()
         sx, sy = self.start_point
@@ -289,21 +479,58 @@ class PathfindingVisualizer(BaseVisualizer):
         """
         self.start_point = START_POS
         self.end_point = END_POS
+        self.extra_starts = []  # the other start points, searched from at once
+        self.extra_ends = []  # the other end points, the closest one is reached
         self._grid[START_POS[0]][START_POS[1]].set_start()
         self._grid[END_POS[0]][END_POS[1]].set_end()
 
+    def __search_grid(self) -> Grid:
+        """
+        Get the grid of the components with every start and end point: its walls
+        are up to date already, and each search reuses the state of the last one
+        """
+        grid = self._components.grid
+        if self._landmarks is not None:
+            self._landmarks.join()  # wait for the landmark tables being made
+        grid.set_points(
+            self.start_point, self.end_point, self.extra_starts, self.extra_ends
+        )
+        return grid
+
     def __start_finding(self) -> None:
         """
         Start the pathfinind process
         """
         self._cleared = False
-        start_block = self._grid[self.start_point[0]][self.start_point[1]]
-
-        def input_handling() -> None:
-            """
-            Handle mouse and keyboard input when the pathfininding process is running
-            """
+        if not 1 <= self.algo_picked <= len(SEARCH_ALGORITHMS):
+            raise Exception("Invalid Algorithm Choice!")
+        if not self.__is_reachable():
+            return  # no search can find a path
+        name = list(SEARCH_ALGORITHMS)[self.algo_picked - 1]
+        grid = self.__search_grid()
+        display = _SearchDisplay(
+            self._screen,
+            self._grid,
+            grid,
+            self.__running_input_handling,
+            lambda: self._looping,
+        )
+        try:
+            path = SEARCH_ALGORITHMS[name](grid, display)
+        except SearchStopped:
+            return
+        if path is not None:
+            display.show_path(path)
+
+    def __running_input_handling(self) -> None:
+        """
+        Handle mouse and keyboard input when the pathfininding process is running
+        """
+        with self._profiler.phase("input"):
             for event in pygame.event.get():
+                # F3/F4 -> show the frame profiler/save its timeline
+                if self._profiler.handle(event):
+                    continue
                 if event.type == pygame.QUIT:
                     quit()
                 elif event.type == pygame.KEYDOWN:
@@ -312,19 +539,253 @@ class PathfindingVisualizer(BaseVisualizer):
                         self._looping = False
                         pygame.display.quit()
 
-        if self.algo_picked == 1:
-            a_star(
-                self._grid,
-                start_block,
-                self.end_point,
-                input_handling,
-                lambda: self._looping,
+    def __race(self) -> None:
+        """
+        Search a snapshot of the grid with every algorithm at once, each in its own
+        process, and show them side by side until a key is pressed
+        """
+        if not self.__is_reachable():
+            return  # no search can find a path
+        grid = self.__search_grid()
+        names = list(SEARCH_ALGORITHMS)
+
+        # tile the panes over the grid
+        columns = math.ceil(math.sqrt(len(names)))
+        pane_size = SIZE // columns
+        font = pygame.font.SysFont("consolas", 13, bold=True)
+        panes = []
+        for i, name in enumerate(names):
+            row, column = divmod(i, columns)
+            rect = (
+                column * pane_size,
+                row * pane_size,
+                pane_size - RACE_GAP,
+                pane_size - RACE_GAP,
             )
-        elif self.algo_picked == 2:
-            dijkstra(self._grid, start_block, input_handling, lambda: self._looping)
-        elif self.algo_picked == 3:
-            breadth_first(start_block, input_handling, lambda: self._looping)
-        elif self.algo_picked == 4:
-            depth_first(start_block, input_handling, lambda: self._looping)
-        else:
-            raise Exception("Invalid Algorithm Choice!")
+            panes.append(_RacePane(self._screen, rect, RACE_TITLES[name], grid, font))
+        self._screen.fill(BLACK, (0, 0, SIZE, SIZE))
+        for pane in panes:
+            pane.draw()
+
+        race = PathRace(names, grid)
+        try:
+            while self._looping and race.is_running():
+                # receive the steps until the next frame instead of sleeping
+                with self._profiler.phase("wait"):
+                    messages = race.receive(FRAME_TIME)
+                with self._profiler.phase("draw"):
+                    for i, message in messages:
+                        panes[i].receive(message)
+                        panes[i].draw_title()
+                self._profiler.present()
+                self.__running_input_handling()
+        finally:
+            race.stop()
+        if not self._looping:
+            return
+
+        # rank the algorithms that found a path by the CPU time they took
+        found = [pane for pane in panes if pane.path is not None]
+        for rank, pane in enumerate(sorted(found, key=lambda pane: pane.seconds), 1):
+            pane.rank = rank
+        for pane in panes:
+            pane.draw_title()
+        text = self.font.render("Press any key to go back", False, YELLOW)
+        self._screen.blit(text, (SIZE + 10, WIN_H - 30))
+
+        # leave the panes on the screen until a key is pressed
+        waiting = True
+        while waiting:
+            for event in super().idle():
+                if self._profiler.handle(event):
+                    continue
+                if event.type == pygame.QUIT:
+                    quit()
+                elif event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+                    waiting = False
+        self._screen.fill(BLACK, (SIZE + 10, WIN_H - 30, text.get_width(), 25))
+        for row in self._grid:
+            for block in row:
+                block.draw()
+
+
+class _RacePane:
+    """
+    The grid of one algorithm of a race, smaller, with its name above it
+    """
+
+    def __init__(self, screen, rect: tuple, title: str, grid: Grid, font) -> None:
+        """
+        Args:
+            screen ([type]): the screen to draw on
+            rect (tuple): the (x, y, width, height) of the pane
+            title (str): the name of the algorithm
+            grid (Grid): the grid searched by the algorithm
+            font ([type]): the font of the name
+        """
+        x, y, width, height = rect
+        self._screen = screen
+        self._title_rect = (x, y, width, RACE_TITLE_H)
+        self._cell_w = max(
+            1, min(width // grid.width, (height - RACE_TITLE_H) // grid.height)
+        )
+        self._origin = (x, y + RACE_TITLE_H)
+        self._grid = grid
+        self._title = title
+        self._font = font
+        self.expansions = 0
+        self.seconds = None  # the CPU time of the search, once finished
+        self.error = None  # the error raised by the search, if any
+        self.path = None  # the cells of the path found, if any
+        self.finished = False
+        self.rank = None  # the place of the algorithm, once every one finished
+
+    def receive(self, message) -> None:
+        """
+        Draw the steps sent by the worker of the algorithm, or the path it found
+        """
+        if message[0] == OPERATIONS:
+            _, self.expansions, expanded, discovered = message
+            for cell in discovered:
+                self.__draw_cell(cell, Block.ColorStatus.NEXT_TO_VISIT)
+            for cell in expanded:
+                self.__draw_cell(cell, Block.ColorStatus.VISITED)
+            self.__draw_ends()
+            return
+
+        _, expansions, self.seconds, self.error, *path = message
+        self.finished = True
+        if expansions is not None:  # None when the worker died
+            self.expansions = expansions
+        if path and path[0] is not None:
+            self.path = path[0]
+            for cell in self.path:
+                self.__draw_cell(cell, Block.ColorStatus.PATH)
+        self.__draw_ends()
+
+    def result(self) -> str:
+        """
+        Get the expansions and the time of the algorithm as text
+        """
+        text = f"{self.expansions} exp"
+        if self.error is not None:
+            return f"{text}, {self.error}"
+        if self.finished and self.path is None:
+            return f"{text}, no path"
+        if self.finished:
+            return f"{text}, {self.seconds * 1000:.1f} ms"
+        return text
+
+    def draw_title(self) -> None:
+        """
+        Draw the name of the algorithm, its rank and its results
+        """
+        self._screen.fill(BLACK, self._title_rect)
+        title = self._title if self.rank is None else f"{self._title}  #{self.rank}"
+        color = YELLOW if self.rank else GREEN
+        x, y, _, _ = self._title_rect
+        self._screen.blit(self._font.render(title, False, color), (x + 2, y + 2))
+        self._screen.blit(
+            self._font.render(self.result(), False, GREEN), (x + 2, y + 16)
+        )
+
+    def draw(self) -> None:
+        """
+        Draw the title and the whole grid
+        """
+        self.draw_title()
+        x, y = self._origin
+        width = self._cell_w * self._grid.width
+        height = self._cell_w * self._grid.height
+        self._screen.fill(Block.ColorStatus.WALKABLE.value, (x, y, width, height))
+        for cell, blocked in enumerate(self._grid.blocked):
+            if blocked:
+                self.__draw_cell(cell, Block.ColorStatus.BARRIER)
+        self.__draw_ends()
+
+    def __draw_ends(self) -> None:
+        for start in self._grid.starts:
+            self.__draw_cell(start, Block.ColorStatus.START)
+        for end in self._grid.ends:
+            self.__draw_cell(end, Block.ColorStatus.END)
+
+    def __draw_cell(self, cell: int, status: Block.ColorStatus) -> None:
+        x, y = self._grid.position(cell)
+        pygame.draw.rect(
+            self._screen,
+            status.value,
+            (
+                self._origin[0] + x * self._cell_w,
+                self._origin[1] + y * self._cell_w,
+                self._cell_w,
+                self._cell_w,
+            ),
+        )
+
+
+class _SearchDisplay(SearchTracker):
+    """
+    Tracker that colors the blocks of the visualizer as the search goes
+    """
+
+    def __init__(self, screen, blocks, grid: Grid, input_handling, is_running) -> None:
+        """
+        Args:
+            screen ([type]): the screen the blocks are drawn on
+            blocks ([type]): the blocks of the visualizer, indexed by x then y
+            grid (Grid): the snapshot of the blocks being searched
+            input_handling ([type]): handles the input after each expansion
+            is_running ([type]): tells whether the search should go on
+        """
+        super().__init__()
+        self._screen = screen
+        self._blocks = blocks
+        self._grid = grid
+        self._input_handling = input_handling
+        self._is_running = is_running
+        self._path = None  # the cells of the path displayed
+
+    def discover(self, cell: int) -> None:
+        super().discover(cell)
+        self.__block(cell).set_next()
+
+    def expand(self, cell: int) -> None:
+        super().expand(cell)
+        self.__block(cell).set_visited()
+        self._input_handling()
+        if not self._is_running():
+            raise SearchStopped()
+
+    def expand_level(self, cells) -> None:
+        super().expand_level(cells)
+        # the whole level is displayed at once
+        for cell in cells.tolist():
+            self.__block(cell).set_visited(effect=False)
+        Block.show(self._screen)
+        self._input_handling()
+        if not self._is_running():
+            raise SearchStopped()
+
+    def solution(self, path: list, bound: float) -> None:
+        # an anytime search found a path it will try to improve
+        self.show_path(path)
+
+    def show_path(self, path: list) -> None:
+        """
+        Highlight the path, from the end back to the start like the backtracking,
+        instead of the one displayed before
+        """
+        if path == self._path:
+            return
+        if self._path is not None:
+            for cell in self._path[1:-1]:
+                self.__block(cell).set_visited()
+        self._path = path
+        for cell in reversed(path[1:-1]):
+            if not self._is_running():
+                break
+            self.__block(cell).set_path()
+
+    def __block(self, cell: int) -> Block:
+        x, y = self._grid.position(cell)
+        return self._blocks[x][y]
@@ -0,0 +1,71 @@
+"""
+The state of the searches on a grid, kept from one search to the next. Every
+cell is stamped with the search it was last reached in, so a new search only
+takes a new stamp: the entries of the previous searches are ignored instead of
+being cleared, and back to back searches cost nothing more on huge grids.
+"""
+from array import array
+
+
+MAX_EPOCH = (1 << 32) - 1  # the last stamp, the stamps are cleared after it
+
+
+class SearchState:
+    """
+    The parent and cost of the cells reached by the current search of a grid,
+    and whether they were expanded, in arrays indexed by cell.
+    A cell is reached in the current search if its stamp is the epoch, and closed
+    if its closed stamp is: the searches read the arrays directly in their loops.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Args:
+            size (int): the number of cells of the grid
+        """
+        self.epoch = 0  # the stamp of the current search
+        self.stamps = array("I", [0]) * size  # the search each cell was reached in
+        self.closed = array("I", [0]) * size  # the search each cell was expanded in
+        self.parents = array("q", [-1]) * size  # -1 for a start
+        self.costs = array("q", [0]) * size
+
+    def __len__(self) -> int:
+        return len(self.stamps)
+
+    def begin(self) -> int:
+        """
+        Start a new search, every cell is forgotten in O(1)
+        Returns:
+            int: the epoch of the new search
+        """
+        if self.epoch == MAX_EPOCH:
+            # the stamps would wrap around, clear them once every 4 billion searches
+            self.stamps = array("I", [0]) * len(self)
+            self.closed = array("I", [0]) * len(self)
+            self.epoch = 0
+        self.epoch += 1
+        return self.epoch
+
+    def reached(self, cell: int) -> bool:
+        return self.stamps[cell] == self.epoch
+
+    def reach(self, cell: int, parent: int = -1, cost: int = 0) -> None:
+        """
+        Reach a cell in the current search, or reach it again with a better cost
+        """
+        self.stamps[cell] = self.epoch
+        self.parents[cell] = parent
+        self.costs[cell] = cost
+
+    def path(self, cell: int) -> list:
+        """
+        Follow the parents from a cell back to a start
+        Returns:
+            list: the cells of the path from the start to the cell
+        """
+        path = []
+        while cell != -1:
+            path.append(cell)
+            cell = self.parents[cell]
+        path.reverse()
+        return path
@@ -0,0 +1,83 @@
+"""
+Races between algorithms: each one runs in its own worker process and sends what
+it does through a pipe to the process displaying them.
+"""
+import time
+from multiprocessing import Pipe
+from multiprocessing import Process
+from multiprocessing.connection import wait
+
+
+# the kinds of messages sent by the workers
+OPERATIONS, FINISHED = range(2)
+
+
+class Race:
+    """
+    Runs several algorithms at once, each in its own worker process.
+    The worker is called with the name of its algorithm, the arguments of the race
+    and the end of the pipe to send its messages to, the last one being FINISHED.
+    """
+
+    def __init__(self, worker, algorithms, *args) -> None:
+        """
+        Args:
+            worker ([type]): the function run by every worker process
+            algorithms ([type]): the names of the algorithms racing
+            args ([type]): the arguments every worker is given
+        """
+        self.algorithms = list(algorithms)
+        self._connections = {}  # the pipe of each worker still running, to its index
+        self._workers = []
+        for i, name in enumerate(self.algorithms):
+            receiver, sender = Pipe(duplex=False)
+            process = Process(target=worker, args=(name, *args, sender), daemon=True)
+            process.start()
+            sender.close()  # only the worker sends
+            self._connections[receiver] = i
+            self._workers.append(process)
+
+    def is_running(self) -> bool:
+        return bool(self._connections)
+
+    def receive(self, timeout: float) -> list:
+        """
+        Receive what the workers send for the given time.
+        A worker waits for its message to be received before it goes on when the
+        pipe is full, so the workers run at full speed while this waits.
+        Args:
+            timeout (float): the time to receive for, in seconds
+        Returns:
+            list: the (index of the algorithm, message) pairs received
+        """
+        messages = []
+        deadline = time.perf_counter() + timeout
+        while self._connections:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            for connection in wait(list(self._connections), remaining):
+                i = self._connections[connection]
+                try:
+                    message = connection.recv()
+                except EOFError:
+                    # the worker exited without saying it finished
+                    message = (FINISHED, None, None, "WorkerDied")
+                messages.append((i, message))
+                if message[0] == FINISHED:
+                    del self._connections[connection]
+                    connection.close()
+        return messages
+
+    def stop(self) -> None:
+        """
+        Stop the workers that are still running
+        """
+        for process in self._workers:
+            if process.is_alive():
+                process.terminate()
+        for process in self._workers:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+        self._connections.clear()
@@ -1,3 +1,19 @@
-from .sorting_visualizer import SortingVisualizer
+"""
+The visualizer is imported when it is first used: it imports pygame, which the
+sorting algorithms, traces and races do without.
+"""
+import importlib
 
-__all__ = ["SortingVisualizer"]
+
+# the module of the visualizer, relative to this package
+VISUALIZERS = {
+    "SortingVisualizer": ".sorting_visualizer",
+}
+
+__all__ = list(VISUALIZERS)
+
+
+def __getattr__(name: str):
+    if name not in VISUALIZERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(VISUALIZERS[name], __name__), name)
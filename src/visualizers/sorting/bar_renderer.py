@@ -0,0 +1,113 @@
+import numpy as np
+import pygame
+
+
+BLACK = (0, 0, 0)
+GRAY = (90, 90, 90)
+
+
+class BarRenderer:
+    """
+    Draws an array of values as bars inside a rectangle of the screen.
+    The array can have any size: when there are more values than pixel columns,
+    the values falling in each column are reduced to their min, max and mean, and
+    the column is drawn as a bar up to the mean with the min-max range above it.
+    """
+
+    def __init__(self, screen, rect) -> None:
+        """
+        Args:
+            screen ([type]): the screen to draw on
+            rect ([type]): the area of the screen the bars are drawn in
+        """
+        self._screen = screen
+        self._rect = pygame.Rect(rect)
+        self.set_values([])
+
+    def set_values(self, values) -> None:
+        """
+        Copy the values to draw, the copy is then kept up to date with
+        update() and swap() so it never has to be copied again while sorting
+        """
+        self._values = np.array(values, dtype=np.float64)
+        size = len(self._values)
+        self._columns = min(size, self._rect.width)
+        # the x of the edges of the columns, spread the same way as the values so
+        # the columns fill the whole width of the area
+        edges = self._rect.x + np.arange(self._columns + 1) * self._rect.width // max(
+            self._columns, 1
+        )
+        self._lefts = edges[:-1].tolist()
+        self._widths = np.diff(edges).tolist()
+        # the index of the first value falling in each column
+        self._starts = np.arange(self._columns) * size // max(self._columns, 1)
+        self._counts = np.diff(np.append(self._starts, size))
+        # the bars are scaled so the biggest value fills the height of the area
+        if size:
+            self._floor = min(self._values.min(), 0)
+            span = max(self._values.max() - self._floor, 1)
+        else:
+            self._floor, span = 0, 1
+        self._scale = self._rect.height / span
+
+    def update(self, idx: int, value) -> None:
+        """
+        Change the value at idx, idx and value can also be arrays to change
+        many values at once
+        """
+        self._values[idx] = value
+
+    def swap(self, idx1: int, idx2: int) -> None:
+        values = self._values
+        values[idx1], values[idx2] = values[idx2], values[idx1]
+
+    def column_of(self, idx: int) -> int:
+        """
+        Get the column a value is drawn in
+        """
+        return idx * self._columns // len(self._values)
+
+    def draw(self, colors, highlights=()) -> None:
+        """
+        Draw the bars
+        Args:
+            colors ([type]): the color of each value, each column takes the color
+                of the first value falling in it
+            highlights ([type], optional): (index, color) pairs to draw over the
+                columns the indices fall in
+        """
+        self._screen.fill(BLACK, self._rect)
+        if not self._columns:
+            return
+
+        values = self._values
+        # reduce every column at once instead of looping over the values
+        lows = np.minimum.reduceat(values, self._starts)
+        highs = np.maximum.reduceat(values, self._starts)
+        means = np.add.reduceat(values, self._starts) / self._counts
+        low_h = ((lows - self._floor) * self._scale).astype(int).tolist()
+        high_h = ((highs - self._floor) * self._scale).astype(int).tolist()
+        mean_h = ((means - self._floor) * self._scale).astype(int).tolist()
+
+        column_colors = [colors[start] for start in self._starts.tolist()]
+        for idx, color in highlights:
+            column_colors[self.column_of(idx)] = color
+
+        bottom = self._rect.bottom
+        for column in range(self._columns):
+            x, width = self._lefts[column], self._widths[column]
+            # the range of the values in the column, empty when it has only 1 value
+            if high_h[column] > low_h[column]:
+                self._screen.fill(
+                    GRAY,
+                    (
+                        x,
+                        bottom - high_h[column],
+                        width,
+                        high_h[column] - low_h[column],
+                    ),
+                )
+            self._screen.fill(
+                column_colors[column],
+                (x, bottom - mean_h[column], width, mean_h[column]),
+            )
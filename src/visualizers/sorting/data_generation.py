@@ -0,0 +1,110 @@
+import numpy as np
+
+
+DEFAULT_SEED = 2021
+
+
+def random_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    A uniformly random permutation of 1..size.
+    Generator.permutation is a Fisher-Yates shuffle done in C.
+    """
+    return rng.permutation(size) + 1
+
+
+def sorted_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    return np.arange(1, size + 1)
+
+
+def reversed_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    return np.arange(size, 0, -1)
+
+
+def nearly_sorted_values(
+    size: int, rng: np.random.Generator, inversions: int = None
+) -> np.ndarray:
+    """
+    1..size with exactly k inversions, made by swapping k disjoint pairs of
+    neighbors (k defaults to 1% of the size)
+    """
+    values = np.arange(1, size + 1)
+    if inversions is None:
+        inversions = max(1, size // 100)
+    inversions = min(inversions, size // 2)
+    # the pairs start at distinct even indices so that no 2 pairs overlap
+    left = rng.choice(size // 2, size=inversions, replace=False) * 2
+    values[left], values[left + 1] = values[left + 1], values[left].copy()
+    return values
+
+
+def sawtooth_values(size: int, rng: np.random.Generator, teeth: int = 5) -> np.ndarray:
+    """
+    A number of ascending runs that each climb from the bottom to the top
+    """
+    tooth_size = -(-size // max(teeth, 1))
+    return np.arange(size) % tooth_size * size // tooth_size + 1
+
+
+def organ_pipe_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Ascending up to the middle, then descending
+    """
+    half = size // 2
+    return np.concatenate((np.arange(1, size - half + 1), np.arange(half, 0, -1)))
+
+
+def few_unique_values(
+    size: int, rng: np.random.Generator, unique: int = 10
+) -> np.ndarray:
+    """
+    Random values picked among a few distinct values spread over 1..size
+    """
+    levels = np.maximum(np.arange(1, unique + 1) * size // unique, 1)
+    return rng.choice(levels, size=size)
+
+
+def gaussian_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Normally distributed values around size/2, clipped to 1..size
+    """
+    values = rng.normal(size / 2, size / 6, size=size).round()
+    return np.clip(values, 1, max(size, 1)).astype(np.int64)
+
+
+def zipf_values(size: int, rng: np.random.Generator, a: float = 1.5) -> np.ndarray:
+    """
+    Zipf-like values, most of them are tiny and a few are huge, clipped to 1..size.
+    They are drawn by inverting the CDF of a Pareto distribution with the same tail,
+    which unlike Generator.zipf takes no rejection loop.
+    """
+    values = np.floor((1 - rng.random(size)) ** (-1 / (a - 1)))
+    return np.minimum(values, max(size, 1)).astype(np.int64)
+
+
+# every input distribution by name, each takes a size and a seeded random generator
+DISTRIBUTIONS = {
+    "random": random_values,
+    "sorted": sorted_values,
+    "reversed": reversed_values,
+    "nearly_sorted": nearly_sorted_values,
+    "sawtooth": sawtooth_values,
+    "organ_pipe": organ_pipe_values,
+    "few_unique": few_unique_values,
+    "gaussian": gaussian_values,
+    "zipf": zipf_values,
+}
+
+
+def generate(distribution: str, size: int, seed: int = DEFAULT_SEED) -> list:
+    """
+    Generate an input to sort, the same distribution, size and seed always
+    give the same input
+    Args:
+        distribution (str): the name of the distribution in DISTRIBUTIONS
+        size (int): the number of values
+        seed (int, optional): the seed of the random generator
+    Returns:
+        list: the values
+    """
+    rng = np.random.default_rng([seed, size])
+    return DISTRIBUTIONS[distribution](size, rng).tolist()
@@ -0,0 +1,148 @@
+"""
+Sorting races: several algorithms sort the same input at once, each in its own
+process, and stream what they do to the process displaying them.
+"""
+import time
+from array import array
+from collections import deque
+
+from .sort_trace import COMPARE
+from .sort_trace import READ
+from .sort_trace import SWAP
+from .sort_trace import WRITE
+from .sorting_algorithms import SORTING_ALGORITHMS
+from .sorting_algorithms import SortTracker
+from src.visualizers.race import FINISHED
+from src.visualizers.race import OPERATIONS
+from src.visualizers.race import Race
+
+
+BATCH_SIZE = 8192  # operations sent to the display at once
+HIGHLIGHTS_PER_BATCH = 32  # number of the latest operations sent with each batch
+
+
+class RaceTracker(SortTracker):
+    """
+    Tracker that streams the operations of a sorting algorithm through a pipe in
+    batches.
+    A batch is sent as its net effect rather than operation by operation: the
+    indices written or swapped with their values at the end of the batch, the
+    latest operations to highlight and the counters, so the display can apply
+    it at once whatever the number of operations.
+    """
+
+    needs_operations = True
+
+    def __init__(self, values, connection, batch_size: int = BATCH_SIZE) -> None:
+        """
+        Args:
+            values ([type]): the array before it is sorted
+            connection ([type]): the end of the pipe the batches are sent to
+            batch_size (int, optional): the number of operations in each batch
+        """
+        super().__init__()
+        self._connection = connection
+        self._batch_size = batch_size
+        self._values = list(values)  # follows the array being sorted
+        self._changed = set()  # the indices written or swapped in the batch
+        self._highlights = deque(maxlen=HIGHLIGHTS_PER_BATCH)
+        self._operations = 0
+
+    def compare(self, idx1: int, idx2: int = None) -> None:
+        super().compare(idx1, idx2)
+        self._highlights.append((COMPARE, idx1))
+        if idx2 is not None:
+            self._highlights.append((COMPARE, idx2))
+        self.__count()
+
+    def read(self, idx: int) -> None:
+        super().read(idx)
+        self._highlights.append((READ, idx))
+        self.__count()
+
+    def swap(self, idx1: int, idx2: int) -> None:
+        super().swap(idx1, idx2)
+        self._values[idx1], self._values[idx2] = self._values[idx2], self._values[idx1]
+        self._changed.add(idx1)
+        self._changed.add(idx2)
+        self._highlights.append((SWAP, idx1))
+        self._highlights.append((SWAP, idx2))
+        self.__count()
+
+    def write(self, idx: int, value) -> None:
+        super().write(idx, value)
+        self._values[idx] = value
+        self._changed.add(idx)
+        self._highlights.append((WRITE, idx))
+        self.__count()
+
+    def compare_exchange(self, low, high, swapped) -> None:
+        super().compare_exchange(low, high, swapped)
+        values = self._values
+        for idx1, idx2 in zip(low[swapped].tolist(), high[swapped].tolist()):
+            values[idx1], values[idx2] = values[idx2], values[idx1]
+            self._changed.add(idx1)
+            self._changed.add(idx2)
+        # the last pairs of the stage are highlighted, it is counted as a whole
+        for idx1, idx2 in zip(
+            low[-HIGHLIGHTS_PER_BATCH:].tolist(), high[-HIGHLIGHTS_PER_BATCH:].tolist()
+        ):
+            self._highlights.append((COMPARE, idx1))
+            self._highlights.append((COMPARE, idx2))
+        self.__count(len(low))
+
+    def __count(self, operations: int = 1) -> None:
+        self._operations += operations
+        if self._operations >= self._batch_size:
+            self.flush()
+
+    def counters(self) -> tuple:
+        return self.comparisons, self.swaps, self.writes, self.reads
+
+    def flush(self) -> None:
+        """
+        Send the batch of operations made since the last one
+        """
+        if not self._operations:
+            return
+        indices = array("q", self._changed)
+        values = array("q", [self._values[idx] for idx in indices])
+        self._connection.send(
+            (OPERATIONS, self.counters(), indices, values, list(self._highlights))
+        )
+        self._changed.clear()
+        self._highlights.clear()
+        self._operations = 0
+
+
+def race_worker(algorithm: str, values, connection) -> None:
+    """
+    Sort the values in a worker process, streaming the operations through the pipe.
+    The time is the CPU time of the process, so the time spent waiting for the
+    display is left out.
+    """
+    tracker = RaceTracker(values, connection)
+    error = None
+    start = time.process_time()
+    try:
+        SORTING_ALGORITHMS[algorithm](values, tracker)
+    except Exception as e:
+        error = type(e).__name__
+    seconds = time.process_time() - start
+    tracker.flush()
+    connection.send((FINISHED, tracker.counters(), seconds, error))
+    connection.close()
+
+
+class SortRace(Race):
+    """
+    Runs several sorting algorithms on the same input, each in its own worker process
+    """
+
+    def __init__(self, algorithms, values) -> None:
+        """
+        Args:
+            algorithms ([type]): the names of the algorithms in SORTING_ALGORITHMS
+            values ([type]): the input every algorithm sorts
+        """
+        super().__init__(race_worker, algorithms, list(values))
@@ -0,0 +1,304 @@
+"""
+Recording of the operations of a sorting run, so it can be saved and replayed.
+
+A costly run can be recorded once without displaying anything, then loaded
+in the sorting visualizer (L key) to be reviewed without being sorted again:
+
+    python -m src.visualizers.sorting.sort_trace quick_sort --size 100000
+"""
+import argparse
+import sys
+from array import array
+
+import numpy as np
+
+from .data_generation import DEFAULT_SEED
+from .data_generation import DISTRIBUTIONS
+from .data_generation import generate
+from .sorting_algorithms import SORTING_ALGORITHMS
+from .sorting_algorithms import SortTracker
+
+
+# the code of each operation in a trace
+COMPARE, READ, SWAP, WRITE = range(4)
+
+TRACE_PATH = "sort_trace.npz"  # where traces are saved by default
+
+# a snapshot of the array is taken at least every this many operations
+MIN_SNAPSHOT_INTERVAL = 1024
+
+
+class SortTrace:
+    """
+    Every operation of a sorting run stored in typed arrays, along with snapshots
+    of the array taken at regular intervals so any point of the run can be reached
+    without replaying it from the start.
+    Each operation i is (ops[i], first[i], second[i], old[i]):
+        COMPARE: the 2 compared indices, second is -1 for a value held outside
+        READ: the index read
+        SWAP: the 2 swapped indices
+        WRITE: the index, the value written and the value it overwrote
+    """
+
+    def __init__(
+        self, algorithm, initial, ops, first, second, old, snapshots, interval
+    ) -> None:
+        self.algorithm = str(algorithm)
+        self.initial = np.asarray(initial, dtype=np.int64)
+        self.ops = np.asarray(ops, dtype=np.int8)
+        self.first = np.asarray(first, dtype=np.int64)
+        self.second = np.asarray(second, dtype=np.int64)
+        self.old = np.asarray(old, dtype=np.int64)
+        self.snapshots = np.asarray(snapshots, dtype=np.int64)
+        self.snapshot_interval = int(interval)
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def save(self, path: str) -> None:
+        # through a file, so NumPy does not add .npz to the path
+        with open(path, "wb") as file:
+            np.savez_compressed(
+                file,
+                algorithm=np.array(self.algorithm),
+                initial=self.initial,
+                ops=self.ops,
+                first=self.first,
+                second=self.second,
+                old=self.old,
+                snapshots=self.snapshots,
+                interval=np.array(self.snapshot_interval),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "SortTrace":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["algorithm"],
+                data["initial"],
+                data["ops"],
+                data["first"],
+                data["second"],
+                data["old"],
+                data["snapshots"],
+                data["interval"],
+            )
+
+    def state_at(self, position: int) -> list:
+        """
+        Get the array as it was after the first position operations
+        """
+        start = position // self.snapshot_interval * self.snapshot_interval
+        values = self.snapshots[position // self.snapshot_interval].tolist()
+        for i in range(start, position):
+            self.apply(values, i)
+        return values
+
+    def apply(self, values, i: int) -> None:
+        """
+        Apply the operation i to the values
+        """
+        op = self.ops[i]
+        if op == SWAP:
+            idx1, idx2 = int(self.first[i]), int(self.second[i])
+            values[idx1], values[idx2] = values[idx2], values[idx1]
+        elif op == WRITE:
+            values[int(self.first[i])] = int(self.second[i])
+
+    def undo(self, values, i: int) -> None:
+        """
+        Undo the operation i on the values
+        """
+        op = self.ops[i]
+        if op == SWAP:
+            idx1, idx2 = int(self.first[i]), int(self.second[i])
+            values[idx1], values[idx2] = values[idx2], values[idx1]
+        elif op == WRITE:
+            values[int(self.first[i])] = int(self.old[i])
+
+
+class TraceRecorder(SortTracker):
+    """
+    Tracker that records every operation of a sorting run into a SortTrace.
+    The calls can also be passed on to another tracker, so a run can be
+    recorded while it is animated.
+    """
+
+    needs_operations = True
+
+    def __init__(
+        self,
+        values,
+        tracker: SortTracker = None,
+        algorithm: str = "",
+        max_operations: int = None,
+    ) -> None:
+        """
+        Args:
+            values ([type]): the array before it is sorted
+            tracker (SortTracker, optional): the tracker to pass every call on to
+            algorithm (str, optional): the name of the algorithm being recorded
+            max_operations (int, optional): stop recording after this many
+                operations, the calls are still passed on to the tracker
+        """
+        super().__init__()
+        self._tracker = tracker
+        self._algorithm = algorithm
+        self._max_operations = max_operations
+        self.truncated = False  # whether some operations were left out
+        self._initial = array("q", values)
+        # follow the array being sorted, to know the values that are overwritten
+        self._values = array("q", values)
+        self._ops = array("b")
+        self._first = array("q")
+        self._second = array("q")
+        self._old = array("q")
+        # the snapshots take about as much memory as the operations in between
+        self._interval = max(MIN_SNAPSHOT_INTERVAL, len(values))
+        self._snapshots = [array("q", values)]
+
+    def compare(self, idx1: int, idx2: int = None) -> None:
+        super().compare(idx1, idx2)
+        self.__record(COMPARE, idx1, -1 if idx2 is None else idx2, 0)
+        if self._tracker is not None:
+            self._tracker.compare(idx1, idx2)
+
+    def read(self, idx: int) -> None:
+        super().read(idx)
+        self.__record(READ, idx, -1, 0)
+        if self._tracker is not None:
+            self._tracker.read(idx)
+
+    def swap(self, idx1: int, idx2: int) -> None:
+        super().swap(idx1, idx2)
+        self._values[idx1], self._values[idx2] = self._values[idx2], self._values[idx1]
+        self.__record(SWAP, idx1, idx2, 0)
+        if self._tracker is not None:
+            self._tracker.swap(idx1, idx2)
+
+    def write(self, idx: int, value) -> None:
+        super().write(idx, value)
+        old = self._values[idx]
+        self._values[idx] = value
+        self.__record(WRITE, idx, value, old)
+        if self._tracker is not None:
+            self._tracker.write(idx, value)
+
+    def compare_exchange(self, low, high, swapped) -> None:
+        super().compare_exchange(low, high, swapped)
+        # recorded as a comparison of each pair, followed by a swap if there was one
+        values = self._values
+        for idx1, idx2, exchanged in zip(low.tolist(), high.tolist(), swapped.tolist()):
+            self.__record(COMPARE, idx1, idx2, 0)
+            if exchanged:
+                values[idx1], values[idx2] = values[idx2], values[idx1]
+                self.__record(SWAP, idx1, idx2, 0)
+        if self._tracker is not None:
+            self._tracker.compare_exchange(low, high, swapped)
+
+    def assign(self, begin: int, end: int, worker: int) -> None:
+        if self._tracker is not None:
+            self._tracker.assign(begin, end, worker)
+
+    def __record(self, op: int, first: int, second: int, old: int) -> None:
+        if self._max_operations is not None and len(self._ops) >= self._max_operations:
+            self.truncated = True
+            return
+        self._ops.append(op)
+        self._first.append(first)
+        self._second.append(second)
+        self._old.append(old)
+        if len(self._ops) % self._interval == 0:
+            self._snapshots.append(array("q", self._values))
+
+    def trace(self) -> SortTrace:
+        """
+        Get a copy of everything recorded so far
+        """
+        return SortTrace(
+            self._algorithm,
+            np.array(self._initial, dtype=np.int64),
+            np.array(self._ops, dtype=np.int8),
+            np.array(self._first, dtype=np.int64),
+            np.array(self._second, dtype=np.int64),
+            np.array(self._old, dtype=np.int64),
+            self._snapshots,
+            self._interval,
+        )
+
+
+class TracePlayer:
+    """
+    Plays a trace forward or backward one operation at a time,
+    or jumps to any position in it
+    """
+
+    def __init__(self, trace: SortTrace) -> None:
+        self.trace = trace
+        self.values = trace.state_at(0)
+        self.position = 0  # the number of operations applied to the values
+
+    def forward(self) -> tuple:
+        """
+        Apply the next operation
+        Returns:
+            tuple: the (op, first, second) applied, or None at the end of the trace
+        """
+        if self.position == len(self.trace):
+            return None
+        self.trace.apply(self.values, self.position)
+        self.position += 1
+        return self.__operation(self.position - 1)
+
+    def backward(self) -> tuple:
+        """
+        Undo the last operation applied
+        Returns:
+            tuple: the (op, first, second) undone, or None at the start of the trace
+        """
+        if self.position == 0:
+            return None
+        self.position -= 1
+        self.trace.undo(self.values, self.position)
+        return self.__operation(self.position)
+
+    def seek(self, position: int) -> None:
+        self.position = min(max(position, 0), len(self.trace))
+        self.values = self.trace.state_at(self.position)
+
+    def __operation(self, i: int) -> tuple:
+        return (
+            int(self.trace.ops[i]),
+            int(self.trace.first[i]),
+            int(self.trace.second[i]),
+        )
+
+
+def record(algorithm: str, values) -> SortTrace:
+    """
+    Sort a copy of the values without displaying anything and record the trace
+    Args:
+        algorithm (str): the name of the algorithm in SORTING_ALGORITHMS
+        values ([type]): the values to sort
+    """
+    recorder = TraceRecorder(values, algorithm=algorithm)
+    SORTING_ALGORITHMS[algorithm](list(values), recorder)
+    return recorder.trace()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("algorithm", choices=list(SORTING_ALGORITHMS))
+    parser.add_argument("--size", type=int, default=10**4)
+    parser.add_argument("--distribution", choices=list(DISTRIBUTIONS), default="random")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--out", default=TRACE_PATH, help="where to save the trace")
+    args = parser.parse_args(argv)
+
+    trace = record(args.algorithm, generate(args.distribution, args.size, args.seed))
+    trace.save(args.out)
+    print(f"{len(trace)} operations saved to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1827 @@
+import math
+import os
+from array import array
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from random import Random
+
+import numpy as np
+
+from src.data_structures import Stack
+
+
+class SortingStopped(Exception):
+    """
+    Raised by a tracker to abort a sorting algorithm that is still running
+    """
+
+
+class SortTracker:
+    """
+    Observes the operations that a sorting algorithm performs on its array.
+    The base tracker only counts the operations, subclasses can hook into them
+    to animate or record the sorting process.
+    """
+
+    # whether the tracker has to be called for every single operation,
+    # algorithms that hand work off to other processes can only report totals
+    needs_operations = False
+
+    def __init__(self) -> None:
+        self.comparisons = 0  # number of comparisons between 2 values
+        self.swaps = 0  # number of swaps between 2 indices
+        self.writes = 0  # number of values written into the array
+        self.reads = 0  # number of values read out without being compared
+
+    def compare(self, idx1: int, idx2: int = None) -> None:
+        """
+        Called right before the values at 2 indices are compared
+        Args:
+            idx1 (int): the index of the 1st value
+            idx2 (int, optional): the index of the 2nd value, None when the
+                1st value is compared against a value held outside of the array
+        """
+        self.comparisons += 1
+
+    def read(self, idx: int) -> None:
+        """
+        Called when a value is read to be counted or moved without a comparison,
+        such as by the non-comparison sorts
+        """
+        self.reads += 1
+
+    def assign(self, begin: int, end: int, worker: int) -> None:
+        """
+        Called when a worker of a parallel algorithm starts on arr[begin..end],
+        or when an adaptive algorithm finds or merges a run there
+        """
+
+    def swap(self, idx1: int, idx2: int) -> None:
+        """
+        Called right after the values at 2 indices are swapped
+        """
+        self.swaps += 1
+
+    def write(self, idx: int, value) -> None:
+        """
+        Called right after a value is written into the array
+        """
+        self.writes += 1
+
+    def compare_exchange(self, low, high, swapped) -> None:
+        """
+        Called right after a stage of a sorting network, where the values at every
+        pair of indices were compared at once and swapped when out of order.
+        The arrays are flat for the trackers that need every operation.
+        Args:
+            low ([type]): the lower index of each pair, in a NumPy array
+            high ([type]): the higher index of each pair, in a NumPy array
+            swapped ([type]): whether each pair was swapped, in a NumPy array
+        """
+        self.comparisons += low.size
+        self.swaps += int(np.count_nonzero(swapped))
+
+
+def swap_bars(arr, idx1, idx2) -> None:
+    """
+    swap 2 bars
+    Args:
+        arr ([type]): the array
+        idx1 ([type]): the index of the 1st bar
+        idx2 ([type]): the index of the 2nd bar
+    """
+    arr[idx1], arr[idx2] = arr[idx2], arr[idx1]
+
+
+#######################################################################################
+######################### S O R T I N G   A L G O R I T H M S #########################
+#######################################################################################
+
+
+def selection_sort(arr, tracker: SortTracker = None) -> None:
+    tracker = tracker or SortTracker()
+    for i in range(0, len(arr)):
+        for j in range(i + 1, len(arr)):
+            tracker.compare(j, i)
+            # if a new minimum is found then swap the old min and the new value
+            if arr[j] < arr[i]:
+                swap_bars(arr, i, j)
+                tracker.swap(i, j)
+
+
+def bubble_sort(arr, tracker: SortTracker = None) -> None:
+    tracker = tracker or SortTracker()
+    for i in range(0, len(arr)):
+        for j in range(0, len(arr) - i - 1):
+            # compare the elements by pair
+            tracker.compare(j, j + 1)
+            if arr[j] > arr[j + 1]:
+                # swap to correct the order
+                swap_bars(arr, j, j + 1)
+                tracker.swap(j, j + 1)
+
+
+def insertion_sort(arr, tracker: SortTracker = None) -> None:
+    tracker = tracker or SortTracker()
+    # Traverse through 1 to len(arr)
+    for i in range(1, len(arr)):
+        key = arr[i]
+        # Move elements of arr[0..i-1], that are
+        # greater than key, to one position ahead
+        # of their current position
+        j = i - 1
+        while j >= 0:
+            tracker.compare(j)
+            if not key < arr[j]:
+                break
+            arr[j + 1] = arr[j]
+            tracker.write(j + 1, arr[j])
+            j -= 1
+        if j + 1 != i:
+            arr[j + 1] = key
+            tracker.write(j + 1, key)
+
+
+def merge_sort(arr, tracker: SortTracker = None) -> None:
+    """
+    Bottom-up merge sort, merges the runs of width 1, 2, 4... in a loop instead of
+    recursing and reuses a single auxiliary buffer for every merge
+    """
+    __merge_sort(arr, tracker or SortTracker(), [None] * len(arr), 0, len(arr) - 1)
+
+
+def __merge_sort(arr, tracker, aux, begin, end) -> None:
+    width = 1
+    while width < end - begin + 1:
+        for left in range(begin, end + 1 - width, 2 * width):
+            mid = left + width - 1
+            right = min(left + 2 * width - 1, end)
+            __merge(arr, tracker, aux, left, mid, right)
+        width *= 2
+
+
+def __merge(arr, tracker, aux, begin, mid, end) -> None:
+    """
+    Merge the sorted arr[begin..mid] and arr[mid+1..end] into arr[begin..end]
+    through the auxiliary buffer
+    """
+    # if the halves are already in order there is nothing to merge
+    tracker.compare(mid + 1, mid)
+    if not arr[mid + 1] < arr[mid]:
+        return
+
+    aux[begin : end + 1] = arr[begin : end + 1]
+    l = begin
+    r = mid + 1
+    for i in range(begin, end + 1):
+        # take from the left half on ties to keep the sort stable
+        if l > mid:
+            arr[i] = aux[r]
+            r += 1
+        elif r > end:
+            arr[i] = aux[l]
+            l += 1
+        else:
+            tracker.compare(r, l)
+            if aux[r] < aux[l]:
+                arr[i] = aux[r]
+                r += 1
+            else:
+                arr[i] = aux[l]
+                l += 1
+        tracker.write(i, arr[i])
+
+
+MIN_MERGE = 64  # arrays shorter than this are only sorted by binary insertion
+MIN_GALLOP = 7  # values taken from the same run in a row before galloping
+
+
+def tim_sort(arr, tracker: SortTracker = None) -> None:
+    """
+    Timsort: the array is cut into the runs already in order, the descending ones
+    reversed and the short ones extended by binary insertion, then the runs are
+    merged on a stack keeping their lengths balanced. A merge gallops through
+    a run when it keeps winning, so the sort is O(n) on sorted or reversed
+    arrays and much faster than merge_sort on nearly sorted ones.
+    """
+    _TimSort(arr, tracker or SortTracker()).sort()
+
+
+class _TimSort:
+    """
+    The state of a Timsort: the runs waiting to be merged and how many wins in a
+    row start galloping, lowered while galloping pays off
+    """
+
+    def __init__(self, arr, tracker: SortTracker) -> None:
+        self.arr = arr
+        self.tracker = tracker
+        self.runs = []  # the (base, length, color) of the runs, the last one on top
+        self.min_gallop = MIN_GALLOP
+        self.found = 0  # the number of runs found, to tint each one differently
+
+    def sort(self) -> None:
+        size = len(self.arr)
+        min_run = self.__min_run(size)
+        lo = 0
+        while lo < size:
+            length = self.__count_run(lo)
+            if length < min_run:
+                forced = min(min_run, size - lo)
+                self.__binary_insertion_sort(lo, lo + forced, lo + length)
+                length = forced
+            self.tracker.assign(lo, lo + length - 1, self.found)
+            self.runs.append((lo, length, self.found))
+            self.found += 1
+            self.__merge_collapse()
+            lo += length
+        # merge what is left on the stack, the top runs first
+        while len(self.runs) > 1:
+            n = len(self.runs) - 2
+            if n > 0 and self.runs[n - 1][1] < self.runs[n + 1][1]:
+                n -= 1
+            self.__merge_at(n)
+
+    @staticmethod
+    def __min_run(size: int) -> int:
+        """
+        Get the shortest length of the runs: the size is split in a power of 2
+        runs, or a bit fewer, between MIN_MERGE / 2 and MIN_MERGE long
+        """
+        remainder = 0
+        while size >= MIN_MERGE:
+            remainder |= size & 1
+            size >>= 1
+        return size + remainder
+
+    def __count_run(self, lo: int) -> int:
+        """
+        Find the length of the run starting at lo, reversing it if descending
+        """
+        arr, tracker = self.arr, self.tracker
+        hi = lo + 1
+        if hi == len(arr):
+            return 1
+        tracker.compare(hi, lo)
+        descending = arr[hi] < arr[lo]
+        hi += 1
+        while hi < len(arr):
+            tracker.compare(hi, hi - 1)
+            # strictly descending, so reversing it keeps the sort stable
+            if (arr[hi] < arr[hi - 1]) != descending:
+                break
+            hi += 1
+        if descending:
+            i, j = lo, hi - 1
+            while i < j:
+                swap_bars(arr, i, j)
+                tracker.swap(i, j)
+                i += 1
+                j -= 1
+        return hi - lo
+
+    def __binary_insertion_sort(self, lo: int, hi: int, start: int) -> None:
+        """
+        Sort arr[lo:hi] whose arr[lo:start] is sorted, finding where each value
+        goes by binary search
+        """
+        arr, tracker = self.arr, self.tracker
+        for i in range(start, hi):
+            pivot = arr[i]
+            left, right = lo, i
+            while left < right:
+                mid = (left + right) // 2
+                tracker.compare(mid)
+                # after the equal values, to keep the sort stable
+                if pivot < arr[mid]:
+                    right = mid
+                else:
+                    left = mid + 1
+            for j in range(i, left, -1):
+                arr[j] = arr[j - 1]
+                tracker.write(j, arr[j])
+            if left != i:
+                arr[left] = pivot
+                tracker.write(left, pivot)
+
+    def __merge_collapse(self) -> None:
+        """
+        Merge the runs on top of the stack until each run is longer than the next
+        2 together and each one longer than the next, so there are O(log n) runs
+        and the merges are balanced
+        """
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or (
+                n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]
+            ):
+                if runs[n - 1][1] < runs[n + 1][1]:
+                    n -= 1
+            elif runs[n][1] > runs[n + 1][1]:
+                return
+            self.__merge_at(n)
+
+    def __merge_at(self, i: int) -> None:
+        """
+        Merge the runs i and i + 1 of the stack
+        """
+        arr = self.arr
+        base1, len1, color = self.runs[i]
+        base2, len2, _ = self.runs[i + 1]
+        self.runs[i] = (base1, len1 + len2, color)
+        del self.runs[i + 1]
+        self.tracker.assign(base1, base2 + len2 - 1, color)
+
+        # the start of run 1 up to the first value of run 2 is in place already
+        k = self.__gallop_right(arr[base2], base2, arr, base1, len1, 0)
+        base1 += k
+        len1 -= k
+        if len1 == 0:
+            return
+        # and so is the end of run 2 from the last value of run 1
+        last = base1 + len1 - 1
+        len2 = self.__gallop_left(arr[last], last, arr, base2, len2, len2 - 1)
+        if len2 == 0:
+            return
+        if len1 <= len2:
+            self.__merge_lo(base1, len1, base2, len2)
+        else:
+            self.__merge_hi(base1, len1, base2, len2)
+
+    def __merge_lo(self, base1: int, len1: int, base2: int, len2: int) -> None:
+        """
+        Merge the runs from their start, run 1 being the shorter one and copied
+        to a buffer
+        """
+        arr, tracker = self.arr, self.tracker
+        tmp = arr[base1 : base1 + len1]
+        cursor1, cursor2, dest = 0, base2, base1
+        self.__put(dest, arr[cursor2])
+        dest += 1
+        cursor2 += 1
+        len2 -= 1
+        if len2 == 0:
+            self.__copy(tmp, cursor1, dest, len1)
+            return
+        if len1 == 1:
+            self.__copy(arr, cursor2, dest, len2)
+            self.__put(dest + len2, tmp[cursor1])
+            return
+
+        min_gallop = self.min_gallop
+        done = False
+        while not done:
+            count1 = count2 = 0  # the values taken from each run in a row
+            # one value at a time until a run keeps winning
+            while True:
+                tracker.compare(cursor2)
+                if arr[cursor2] < tmp[cursor1]:
+                    self.__put(dest, arr[cursor2])
+                    dest += 1
+                    cursor2 += 1
+                    count2 += 1
+                    count1 = 0
+                    len2 -= 1
+                    if len2 == 0:
+                        done = True
+                        break
+                else:
+                    self.__put(dest, tmp[cursor1])
+                    dest += 1
+                    cursor1 += 1
+                    count1 += 1
+                    count2 = 0
+                    len1 -= 1
+                    if len1 == 1:
+                        done = True
+                        break
+                if (count1 | count2) >= min_gallop:
+                    break
+            if done:
+                break
+            # gallop to the end of the winning streaks until they get short
+            while True:
+                count1 = self.__gallop_right(
+                    arr[cursor2], cursor2, tmp, cursor1, len1, 0
+                )
+                if count1:
+                    self.__copy(tmp, cursor1, dest, count1)
+                    dest += count1
+                    cursor1 += count1
+                    len1 -= count1
+                    if len1 <= 1:
+                        done = True
+                        break
+                self.__put(dest, arr[cursor2])
+                dest += 1
+                cursor2 += 1
+                len2 -= 1
+                if len2 == 0:
+                    done = True
+                    break
+                count2 = self.__gallop_left(tmp[cursor1], None, arr, cursor2, len2, 0)
+                if count2:
+                    self.__copy(arr, cursor2, dest, count2)
+                    dest += count2
+                    cursor2 += count2
+                    len2 -= count2
+                    if len2 == 0:
+                        done = True
+                        break
+                self.__put(dest, tmp[cursor1])
+                dest += 1
+                cursor1 += 1
+                len1 -= 1
+                if len1 == 1:
+                    done = True
+                    break
+                min_gallop -= 1
+                if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                    break
+            if done:
+                break
+            # galloping did not pay off, it starts later next time
+            min_gallop = max(min_gallop, 0) + 2
+        self.min_gallop = max(min_gallop, 1)
+
+        if len1 == 1:
+            self.__copy(arr, cursor2, dest, len2)
+            self.__put(dest + len2, tmp[cursor1])
+        else:
+            self.__copy(tmp, cursor1, dest, len1)
+
+    def __merge_hi(self, base1: int, len1: int, base2: int, len2: int) -> None:
+        """
+        Merge the runs from their end, run 2 being the shorter one and copied
+        to a buffer
+        """
+        arr, tracker = self.arr, self.tracker
+        tmp = arr[base2 : base2 + len2]
+        cursor1, cursor2, dest = base1 + len1 - 1, len2 - 1, base2 + len2 - 1
+        self.__put(dest, arr[cursor1])
+        dest -= 1
+        cursor1 -= 1
+        len1 -= 1
+        if len1 == 0:
+            self.__copy(tmp, 0, dest - len2 + 1, len2)
+            return
+        if len2 == 1:
+            dest -= len1
+            cursor1 -= len1
+            self.__copy(arr, cursor1 + 1, dest + 1, len1)
+            self.__put(dest, tmp[cursor2])
+            return
+
+        min_gallop = self.min_gallop
+        done = False
+        while not done:
+            count1 = count2 = 0  # the values taken from each run in a row
+            # one value at a time until a run keeps winning
+            while True:
+                tracker.compare(cursor1)
+                if tmp[cursor2] < arr[cursor1]:
+                    self.__put(dest, arr[cursor1])
+                    dest -= 1
+                    cursor1 -= 1
+                    count1 += 1
+                    count2 = 0
+                    len1 -= 1
+                    if len1 == 0:
+                        done = True
+                        break
+                else:
+                    self.__put(dest, tmp[cursor2])
+                    dest -= 1
+                    cursor2 -= 1
+                    count2 += 1
+                    count1 = 0
+                    len2 -= 1
+                    if len2 == 1:
+                        done = True
+                        break
+                if (count1 | count2) >= min_gallop:
+                    break
+            if done:
+                break
+            # gallop to the start of the winning streaks until they get short
+            while True:
+                count1 = len1 - self.__gallop_right(
+                    tmp[cursor2], None, arr, base1, len1, len1 - 1
+                )
+                if count1:
+                    dest -= count1
+                    cursor1 -= count1
+                    len1 -= count1
+                    self.__copy(arr, cursor1 + 1, dest + 1, count1)
+                    if len1 == 0:
+                        done = True
+                        break
+                self.__put(dest, tmp[cursor2])
+                dest -= 1
+                cursor2 -= 1
+                len2 -= 1
+                if len2 == 1:
+                    done = True
+                    break
+                count2 = len2 - self.__gallop_left(
+                    arr[cursor1], cursor1, tmp, 0, len2, len2 - 1
+                )
+                if count2:
+                    dest -= count2
+                    cursor2 -= count2
+                    len2 -= count2
+                    self.__copy(tmp, cursor2 + 1, dest + 1, count2)
+                    if len2 <= 1:
+                        done = True
+                        break
+                self.__put(dest, arr[cursor1])
+                dest -= 1
+                cursor1 -= 1
+                len1 -= 1
+                if len1 == 0:
+                    done = True
+                    break
+                min_gallop -= 1
+                if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                    break
+            if done:
+                break
+            # galloping did not pay off, it starts later next time
+            min_gallop = max(min_gallop, 0) + 2
+        self.min_gallop = max(min_gallop, 1)
+
+        if len2 == 1:
+            dest -= len1
+            cursor1 -= len1
+            self.__copy(arr, cursor1 + 1, dest + 1, len1)
+            self.__put(dest, tmp[cursor2])
+        else:
+            self.__copy(tmp, 0, dest - len2 + 1, len2)
+
+    def __gallop_left(self, key, key_idx, values, base, length, hint) -> int:
+        """
+        Find where the key goes in the sorted values[base:base+length], before the
+        values equal to it, searching from the hint by steps of 1, 3, 7, 15...
+        then by binary search between the last 2 steps
+        Args:
+            key ([type]): the value to place
+            key_idx ([type]): the index of the key in the array, None if it is held
+                in a buffer
+            values ([type]): the array or the buffer of a merge
+            base (int): the start of the values searched
+            length (int): the number of values searched
+            hint (int): the offset from base to start searching at
+        Returns:
+            int: k such that values[base+k-1] < key <= values[base+k]
+        """
+        last, offset = 0, 1
+        if self.__less(values, base + hint, key, key_idx):
+            # gallop right until values[base+hint+last] < key <= values[base+hint+offset]
+            max_offset = length - hint
+            while offset < max_offset and self.__less(
+                values, base + hint + offset, key, key_idx
+            ):
+                last, offset = offset, (offset << 1) + 1
+            offset = min(offset, max_offset)
+            last, offset = last + hint, offset + hint
+        else:
+            # gallop left until values[base+hint-offset] < key <= values[base+hint-last]
+            max_offset = hint + 1
+            while offset < max_offset and not self.__less(
+                values, base + hint - offset, key, key_idx
+            ):
+                last, offset = offset, (offset << 1) + 1
+            offset = min(offset, max_offset)
+            last, offset = hint - offset, hint - last
+        last += 1
+        while last < offset:
+            mid = last + (offset - last) // 2
+            if self.__less(values, base + mid, key, key_idx):
+                last = mid + 1
+            else:
+                offset = mid
+        return offset
+
+    def __gallop_right(self, key, key_idx, values, base, length, hint) -> int:
+        """
+        Like __gallop_left, but the key goes after the values equal to it
+        Returns:
+            int: k such that values[base+k-1] <= key < values[base+k]
+        """
+        last, offset = 0, 1
+        if self.__greater(values, base + hint, key, key_idx):
+            # gallop left until values[base+hint-offset] <= key < values[base+hint-last]
+            max_offset = hint + 1
+            while offset < max_offset and self.__greater(
+                values, base + hint - offset, key, key_idx
+            ):
+                last, offset = offset, (offset << 1) + 1
+            offset = min(offset, max_offset)
+            last, offset = hint - offset, hint - last
+        else:
+            # gallop right until values[base+hint+last] <= key < values[base+hint+offset]
+            max_offset = length - hint
+            while offset < max_offset and not self.__greater(
+                values, base + hint + offset, key, key_idx
+            ):
+                last, offset = offset, (offset << 1) + 1
+            offset = min(offset, max_offset)
+            last, offset = last + hint, offset + hint
+        last += 1
+        while last < offset:
+            mid = last + (offset - last) // 2
+            if self.__greater(values, base + mid, key, key_idx):
+                offset = mid
+            else:
+                last = mid + 1
+        return offset
+
+    def __less(self, values, idx: int, key, key_idx) -> bool:
+        """
+        Compare values[idx] < key, one of them being in the array
+        """
+        self.__track(values, idx, key_idx)
+        return values[idx] < key
+
+    def __greater(self, values, idx: int, key, key_idx) -> bool:
+        """
+        Compare key < values[idx], one of them being in the array
+        """
+        self.__track(values, idx, key_idx)
+        return key < values[idx]
+
+    def __track(self, values, idx: int, key_idx) -> None:
+        if values is self.arr:
+            self.tracker.compare(idx, key_idx)
+        else:
+            self.tracker.compare(key_idx)
+
+    def __put(self, dest: int, value) -> None:
+        self.arr[dest] = value
+        self.tracker.write(dest, value)
+
+    def __copy(self, values, src: int, dest: int, count: int) -> None:
+        """
+        Copy values[src:src+count] to arr[dest:dest+count], they can overlap
+        """
+        arr = self.arr
+        arr[dest : dest + count] = values[src : src + count]
+        for i in range(dest, dest + count):
+            self.tracker.write(i, arr[i])
+
+
+BLOCK_RUN = 16  # length of the runs sorted by insertion before block_merge_sort merges
+BLOCK_CACHE = 512  # values held by the fixed buffer of block_merge_sort, 0 for none
+
+
+def block_merge_sort(
+    arr, tracker: SortTracker = None, cache_size: int = BLOCK_CACHE
+) -> None:
+    """
+    Block merge sort (WikiSort), a stable merge sort in O(n log n) time and O(1)
+    memory: each merge pulls about 2√n unique values out of its runs as internal
+    buffers, tags the √n sized blocks of the first run with the first buffer and
+    rolls them through the second run, merging each block with the values that
+    follow it through the second buffer. The buffers are then sorted back in.
+    The runs short enough for the fixed cache are merged through it, cache_size
+    of 0 sorts strictly in place.
+    """
+    tracker = tracker or SortTracker()
+    size = len(arr)
+    cache = [None] * min(cache_size, size)
+    for begin in range(0, size, BLOCK_RUN):
+        __insertion_sort_range(arr, tracker, begin, min(begin + BLOCK_RUN, size) - 1)
+    width = BLOCK_RUN
+    level = 0
+    while width < size:
+        for begin in range(0, size - width, 2 * width):
+            mid = begin + width
+            end = min(mid + width, size)
+            tracker.assign(begin, end - 1, level)
+            __block_merge(arr, tracker, cache, begin, mid, end, level)
+        width *= 2
+        level += 1
+
+
+def __block_merge(arr, tracker, cache, begin, mid, end, color) -> None:
+    """
+    Merge the sorted arr[begin:mid] and arr[mid:end] into arr[begin:end]
+    """
+    # if the runs are already in order there is nothing to merge
+    tracker.compare(mid, mid - 1)
+    if not arr[mid] < arr[mid - 1]:
+        return
+    # if the whole second run goes first, a rotation is enough
+    tracker.compare(end - 1, begin)
+    if arr[end - 1] < arr[begin]:
+        __rotate(arr, tracker, begin, mid, end)
+        return
+    if mid - begin <= len(cache):
+        __merge_external(arr, tracker, cache, begin, mid, end)
+        return
+
+    length = mid - begin
+    block_size = math.isqrt(length)
+    buffer_size = length // block_size + 1
+    # the buffers are the first copies of unique values of A, or else the last ones
+    # of B, so they can be sorted back in without breaking the stability
+    count = __count_unique(arr, tracker, begin, mid, 2 * buffer_size, True)
+    from_a = count == 2 * buffer_size
+    if not from_a:
+        count_b = __count_unique(arr, tracker, mid, end, 2 * buffer_size, False)
+        from_a = count >= count_b
+        count = max(count, count_b)
+    if from_a:
+        __pull_left(arr, tracker, begin, mid, count)
+        buffer, a_begin, b_end = begin, begin + count, end
+    else:
+        __pull_right(arr, tracker, mid, end, count)
+        buffer, a_begin, b_end = end - count, begin, end - count
+    tracker.assign(buffer, buffer + count - 1, color + 1)
+
+    if count == 2 * buffer_size:
+        merge_buffer = buffer + buffer_size
+    else:
+        # too few unique values for both buffers: the A blocks are made few enough
+        # to be tagged, and merged in place
+        merge_buffer = None
+        block_size = length // count + 1
+    if mid < b_end:
+        __merge_blocks(
+            arr, tracker, a_begin, mid, b_end, block_size, buffer, merge_buffer
+        )
+
+    if merge_buffer is not None:
+        # merging shuffled the second buffer, the first one is back in order
+        __insertion_sort_range(
+            arr, tracker, merge_buffer, merge_buffer + buffer_size - 1
+        )
+    if from_a:
+        __redistribute_left(arr, tracker, begin, begin + count, end)
+    else:
+        __redistribute_right(arr, tracker, begin, end - count, end)
+    tracker.assign(begin, end - 1, color)
+
+
+def __merge_blocks(arr, tracker, begin, mid, end, block_size, tags, merge_buffer):
+    """
+    Merge arr[begin:mid] and arr[mid:end] by blocks: the A blocks are tagged with
+    the values at tags then rolled through the B blocks, and each A block is
+    dropped behind the B block its first value goes into, where it is merged
+    with the B values that follow it through the merge buffer, or in place
+    without one
+    """
+    first_a = (mid - begin) % block_size  # the first A block is uneven
+    # tag the A blocks by swapping their first value with a tag, the order of the
+    # tags is their order, even once they are rolled out of it
+    tag = tags
+    for block in range(begin + first_a, mid, block_size):
+        swap_bars(arr, tag, block)
+        tracker.swap(tag, block)
+        tag += 1
+    tag = tags  # where the first value of the smallest A block left is
+
+    last_a, last_a_end = begin, begin + first_a  # the A block to merge next
+    last_b, last_b_end = last_a_end, last_a_end  # the B values before the A blocks
+    a_begin, a_end = last_a_end, mid  # the A blocks left, in any order
+    b_begin, b_end = mid, min(mid + block_size, end)  # the next B block
+    if merge_buffer is not None:
+        __block_swap(arr, tracker, last_a, merge_buffer, first_a)
+
+    while a_begin < a_end:
+        drop = b_begin == b_end
+        if not drop and last_b < last_b_end:
+            tracker.compare(last_b_end - 1, tag)
+            drop = not arr[last_b_end - 1] < arr[tag]
+        if drop:
+            # the smallest A block goes where its first value splits the B values
+            # before it, the previous A block can be merged with those up to there
+            split = __bisect_left(arr, tracker, tag, last_b, last_b_end)
+            remaining = last_b_end - split
+            smallest = a_begin
+            for block in range(a_begin + block_size, a_end, block_size):
+                tracker.compare(block, smallest)
+                if arr[block] < arr[smallest]:
+                    smallest = block
+            __block_swap(arr, tracker, a_begin, smallest, block_size)
+            swap_bars(arr, a_begin, tag)
+            tracker.swap(a_begin, tag)
+            tag += 1
+
+            __merge_last_a(arr, tracker, last_a, last_a_end, split, merge_buffer)
+            if merge_buffer is not None:
+                # the A block waits in the merge buffer, so the B values after the
+                # split only have to be swapped with the buffer values
+                __block_swap(arr, tracker, a_begin, merge_buffer, block_size)
+                __block_swap(
+                    arr, tracker, split, a_begin + block_size - remaining, remaining
+                )
+            else:
+                __rotate(arr, tracker, split, a_begin, a_begin + block_size)
+            last_a, last_a_end = a_begin - remaining, a_begin - remaining + block_size
+            last_b, last_b_end = last_a_end, last_a_end + remaining
+            a_begin += block_size
+        elif b_end - b_begin < block_size:
+            # the last B block is uneven, it goes before the A blocks left
+            __rotate(arr, tracker, a_begin, b_begin, b_end)
+            last_b, last_b_end = a_begin, a_begin + b_end - b_begin
+            a_begin += b_end - b_begin
+            a_end += b_end - b_begin
+            b_end = b_begin
+        else:
+            # roll the first A block behind the next B block
+            __block_swap(arr, tracker, a_begin, b_begin, block_size)
+            last_b, last_b_end = a_begin, a_begin + block_size
+            a_begin += block_size
+            a_end += block_size
+            b_begin += block_size
+            b_end = min(b_end + block_size, end)
+
+    __merge_last_a(arr, tracker, last_a, last_a_end, end, merge_buffer)
+
+
+def __merge_last_a(arr, tracker, begin, mid, end, merge_buffer) -> None:
+    if merge_buffer is not None:
+        __merge_internal(arr, tracker, begin, mid, end, merge_buffer)
+    else:
+        __merge_in_place(arr, tracker, begin, mid, end)
+
+
+def __merge_external(arr, tracker, cache, begin, mid, end) -> None:
+    """
+    Merge arr[begin:mid] and arr[mid:end] with the first one copied to the cache
+    """
+    count = mid - begin
+    cache[:count] = arr[begin:mid]
+    a, b = 0, mid
+    for i in range(begin, end):
+        # what is left of B is in place already
+        if a == count:
+            return
+        elif b == end:
+            arr[i] = cache[a]
+            a += 1
+        else:
+            # take from the first run on ties to keep the sort stable
+            tracker.compare(b)
+            if arr[b] < cache[a]:
+                arr[i] = arr[b]
+                b += 1
+            else:
+                arr[i] = cache[a]
+                a += 1
+        tracker.write(i, arr[i])
+
+
+def __merge_internal(arr, tracker, begin, mid, end, buffer) -> None:
+    """
+    Merge arr[begin:mid] and arr[mid:end] with the values of the first one in the
+    buffer, swapping them with the buffer values in arr[begin:mid]
+    """
+    a, a_end, b = buffer, buffer + mid - begin, mid
+    i = begin
+    while a < a_end and b < end:
+        tracker.compare(b, a)
+        if arr[b] < arr[a]:
+            swap_bars(arr, i, b)
+            tracker.swap(i, b)
+            b += 1
+        else:
+            swap_bars(arr, i, a)
+            tracker.swap(i, a)
+            a += 1
+        i += 1
+    # what is left of B is in place already
+    __block_swap(arr, tracker, a, i, a_end - a)
+
+
+def __merge_in_place(arr, tracker, begin, mid, end) -> None:
+    """
+    Merge arr[begin:mid] and arr[mid:end] with rotations, in O(n) when the first
+    one has few unique values
+    """
+    while begin < mid < end:
+        # the A values up to the first B value are in place
+        begin = __bisect_right(arr, tracker, mid, begin, mid)
+        if begin == mid:
+            return
+        # the B values smaller than the next A value go before it
+        split = __bisect_left(arr, tracker, begin, mid, end)
+        __rotate(arr, tracker, begin, mid, split)
+        begin += split - mid
+        mid = split
+
+
+def __count_unique(arr, tracker, begin, end, limit, first) -> int:
+    """
+    Count the unique values of the sorted arr[begin:end] up to limit, from its
+    start or else from its end
+    """
+    count = 1
+    i = begin if first else end - 1
+    while count < limit:
+        if first:
+            i = __bisect_right(arr, tracker, i, i + 1, end)
+            if i == end:
+                break
+        else:
+            i = __bisect_left(arr, tracker, i, begin, i) - 1
+            if i < begin:
+                break
+        count += 1
+    return count
+
+
+def __pull_left(arr, tracker, begin, end, count) -> None:
+    """
+    Gather the first copies of the count smallest values of the sorted
+    arr[begin:end] at its start
+    """
+    group, found = begin, begin + 1  # the values gathered are in arr[group:found]
+    for _ in range(count - 1):
+        i = __bisect_right(arr, tracker, found - 1, found, end)
+        # the copies of the values gathered go before them
+        __rotate(arr, tracker, group, found, i)
+        group += i - found
+        found = i + 1
+    __rotate(arr, tracker, begin, group, found)
+
+
+def __pull_right(arr, tracker, begin, end, count) -> None:
+    """
+    Gather the last copies of the count largest values of the sorted
+    arr[begin:end] at its end
+    """
+    found, group = end - 1, end  # the values gathered are in arr[found:group]
+    for _ in range(count - 1):
+        i = __bisect_left(arr, tracker, found, begin, found)
+        # the copies of the values gathered go after them
+        __rotate(arr, tracker, i, found, group)
+        group = i + group - found
+        found = i - 1
+    __rotate(arr, tracker, found, group, end)
+
+
+def __redistribute_left(arr, tracker, begin, end, stop) -> None:
+    """
+    Insert the sorted arr[begin:end] into the sorted arr[end:stop], each value
+    before its copies
+    """
+    while begin < end:
+        split = __bisect_left(arr, tracker, begin, end, stop)
+        __rotate(arr, tracker, begin, end, split)
+        begin += split - end + 1
+        end = split
+
+
+def __redistribute_right(arr, tracker, start, begin, end) -> None:
+    """
+    Insert the sorted arr[begin:end] into the sorted arr[start:begin], each value
+    after its copies
+    """
+    while begin < end:
+        split = __bisect_right(arr, tracker, end - 1, start, begin)
+        __rotate(arr, tracker, split, begin, end)
+        end = split + end - begin - 1
+        begin = split
+
+
+def __bisect_left(arr, tracker, key, begin, end) -> int:
+    """
+    Get the first index of arr[begin:end] whose value is not less than arr[key]
+    """
+    while begin < end:
+        mid = (begin + end) // 2
+        tracker.compare(mid, key)
+        if arr[mid] < arr[key]:
+            begin = mid + 1
+        else:
+            end = mid
+    return begin
+
+
+def __bisect_right(arr, tracker, key, begin, end) -> int:
+    """
+    Get the first index of arr[begin:end] whose value is greater than arr[key]
+    """
+    while begin < end:
+        mid = (begin + end) // 2
+        tracker.compare(mid, key)
+        if arr[key] < arr[mid]:
+            end = mid
+        else:
+            begin = mid + 1
+    return begin
+
+
+def __block_swap(arr, tracker, idx1, idx2, count) -> None:
+    for i in range(count):
+        swap_bars(arr, idx1 + i, idx2 + i)
+        tracker.swap(idx1 + i, idx2 + i)
+
+
+def __rotate(arr, tracker, begin, mid, end) -> None:
+    """
+    Move arr[mid:end] before arr[begin:mid] by reversing both, then the whole range
+    """
+    for low, high in ((begin, mid), (mid, end), (begin, end)):
+        high -= 1
+        while low < high:
+            swap_bars(arr, low, high)
+            tracker.swap(low, high)
+            low += 1
+            high -= 1
+
+
+QUICK_SORT_SEED = 2021  # seed of the pivot choices of quick_sort
+
+
+def quick_sort(arr, tracker: SortTracker = None) -> None:
+    """
+    Quick sort with a random pivot and a three-way partition, so sorted,
+    reversed and organ pipe inputs as well as inputs with few distinct values
+    all take O(n log n) expected time. The pivot generator is seeded, so every
+    run on the same input performs the same operations. The partitions are
+    kept on an explicit stack instead of recursing: the smaller partition is
+    always sorted first, so the stack never holds more than log(n) partitions.
+    """
+    tracker = tracker or SortTracker()
+    rng = Random(QUICK_SORT_SEED)
+    partitions = Stack()
+    begin, end = 0, len(arr) - 1
+    while True:
+        if begin < end:
+            less, great = __three_way_partition(
+                arr, tracker, begin, end, rng.randint(begin, end)
+            )
+            if less - begin < end - great:
+                partitions.push((great + 1, end))
+                end = less - 1
+            else:
+                partitions.push((begin, less - 1))
+                begin = great + 1
+        elif partitions.is_empty():
+            break
+        else:
+            begin, end = partitions.pop()
+
+
+def __three_way_partition(arr, tracker, begin, end, pivot_index) -> tuple:
+    """
+    Partition arr[begin..end] into the values less than, equal to and greater
+    than the value at pivot_index
+    Returns:
+        tuple: the first and last index of the values equal to the pivot
+    """
+    swap_bars(arr, begin, pivot_index)
+    tracker.swap(begin, pivot_index)
+    pivot = arr[begin]
+    # arr[begin..less-1] < pivot, arr[less..i-1] == pivot, arr[great+1..end] > pivot
+    less, i, great = begin, begin + 1, end
+
+    while i <= great:
+        # arr[less] always holds a value equal to the pivot
+        tracker.compare(i, less)
+        if arr[i] < pivot:
+            swap_bars(arr, less, i)
+            tracker.swap(less, i)
+            less += 1
+            i += 1
+        elif pivot < arr[i]:
+            swap_bars(arr, i, great)
+            tracker.swap(i, great)
+            great -= 1
+        else:
+            i += 1
+    return less, great
+
+
+def heap_sort(arr, tracker: SortTracker = None) -> None:
+    __heap_sort_range(arr, tracker or SortTracker(), 0, len(arr) - 1)
+
+
+# partitions up to this size are finished with insertion sort
+INSERTION_SORT_THRESHOLD = 16
+# partitions bigger than this pick the pivot with Tukey's ninther
+NINTHER_THRESHOLD = 40
+
+
+def intro_sort(arr, tracker: SortTracker = None) -> None:
+    """
+    Quick sort with median-of-three (or ninther) pivots that falls back to heap sort
+    when the recursion gets deeper than 2*log(n), so it is O(n*log(n)) in the worst
+    case. Small partitions are finished with insertion sort.
+    """
+    depth_limit = 2 * max(len(arr), 1).bit_length()
+    __intro_sort(arr, tracker or SortTracker(), 0, len(arr) - 1, depth_limit, False)
+
+
+def dual_pivot_intro_sort(arr, tracker: SortTracker = None) -> None:
+    """
+    Introsort that uses Yaroslavskiy's dual-pivot partition instead of a single pivot
+    """
+    depth_limit = 2 * max(len(arr), 1).bit_length()
+    __intro_sort(arr, tracker or SortTracker(), 0, len(arr) - 1, depth_limit, True)
+
+
+def __intro_sort(arr, tracker, begin, end, depth_limit, dual_pivot) -> None:
+    # keep looping on the last partition instead of recursing into it
+    while end - begin + 1 > INSERTION_SORT_THRESHOLD:
+        if depth_limit == 0:
+            __heap_sort_range(arr, tracker, begin, end)
+            return
+        depth_limit -= 1
+
+        if dual_pivot:
+            left, right = __dual_pivot_partition(arr, tracker, begin, end)
+            __intro_sort(arr, tracker, begin, left - 1, depth_limit, dual_pivot)
+            # the middle partition is all equal when both pivots are equal
+            tracker.compare(left, right)
+            if arr[left] < arr[right]:
+                __intro_sort(arr, tracker, left + 1, right - 1, depth_limit, dual_pivot)
+            begin = right + 1
+        else:
+            pivot_index = __partition(arr, tracker, begin, end)
+            __intro_sort(arr, tracker, begin, pivot_index - 1, depth_limit, dual_pivot)
+            begin = pivot_index + 1
+
+    __insertion_sort_range(arr, tracker, begin, end)
+
+
+def __partition(arr, tracker, begin, end) -> int:
+    """
+    Partition arr[begin..end] around a median-of-three or ninther pivot.
+    Values equal to the pivot are spread over both sides, so inputs with
+    a few unique values are still split in halves.
+    Returns:
+        int: the final index of the pivot
+    """
+    size = end - begin + 1
+    mid = begin + size // 2
+    if size > NINTHER_THRESHOLD:
+        step = size // 8
+        pivot_index = __median_of_three(
+            arr,
+            tracker,
+            __median_of_three(arr, tracker, begin, begin + step, begin + 2 * step),
+            __median_of_three(arr, tracker, mid - step, mid, mid + step),
+            __median_of_three(arr, tracker, end - 2 * step, end - step, end),
+        )
+    else:
+        pivot_index = __median_of_three(arr, tracker, begin, mid, end)
+
+    # keep the pivot at the beginning while partitioning the rest
+    swap_bars(arr, begin, pivot_index)
+    tracker.swap(begin, pivot_index)
+    pivot = arr[begin]
+    i, j = begin + 1, end
+    while True:
+        while i <= j:
+            tracker.compare(i, begin)
+            if not arr[i] < pivot:
+                break
+            i += 1
+        while i <= j:
+            tracker.compare(j, begin)
+            if not pivot < arr[j]:
+                break
+            j -= 1
+        if i >= j:
+            break
+        swap_bars(arr, i, j)
+        tracker.swap(i, j)
+        i += 1
+        j -= 1
+
+    swap_bars(arr, begin, j)
+    tracker.swap(begin, j)
+    return j
+
+
+def __dual_pivot_partition(arr, tracker, begin, end) -> tuple:
+    """
+    Yaroslavskiy's partition of arr[begin..end] into the values less than the
+    1st pivot, the values between both pivots and the values greater than the
+    2nd pivot. The pivots are taken from the tertiles of the partition.
+    Returns:
+        tuple: the final indices of the 2 pivots
+    """
+    third = (end - begin + 1) // 3
+    swap_bars(arr, begin, begin + third)
+    tracker.swap(begin, begin + third)
+    swap_bars(arr, end, end - third)
+    tracker.swap(end, end - third)
+    tracker.compare(end, begin)
+    if arr[end] < arr[begin]:
+        swap_bars(arr, begin, end)
+        tracker.swap(begin, end)
+
+    low_pivot, high_pivot = arr[begin], arr[end]
+    less = begin + 1  # arr[begin+1..less-1] < low pivot
+    great = end - 1  # arr[great+1..end-1] > high pivot
+    k = less
+    while k <= great:
+        tracker.compare(k, begin)
+        if arr[k] < low_pivot:
+            swap_bars(arr, k, less)
+            tracker.swap(k, less)
+            less += 1
+        else:
+            tracker.compare(k, end)
+            if not arr[k] < high_pivot:
+                while k < great:
+                    tracker.compare(great, end)
+                    if not high_pivot < arr[great]:
+                        break
+                    great -= 1
+                swap_bars(arr, k, great)
+                tracker.swap(k, great)
+                great -= 1
+                tracker.compare(k, begin)
+                if arr[k] < low_pivot:
+                    swap_bars(arr, k, less)
+                    tracker.swap(k, less)
+                    less += 1
+        k += 1
+
+    # move the pivots into their final positions
+    less -= 1
+    great += 1
+    swap_bars(arr, begin, less)
+    tracker.swap(begin, less)
+    swap_bars(arr, end, great)
+    tracker.swap(end, great)
+    return less, great
+
+
+def __median_of_three(arr, tracker, a, b, c) -> int:
+    """
+    Get the index of the median among the values at 3 indices
+    """
+    tracker.compare(a, b)
+    if arr[a] < arr[b]:
+        tracker.compare(b, c)
+        if arr[b] < arr[c]:
+            return b
+        tracker.compare(a, c)
+        return c if arr[a] < arr[c] else a
+    tracker.compare(a, c)
+    if arr[a] < arr[c]:
+        return a
+    tracker.compare(b, c)
+    return c if arr[b] < arr[c] else b
+
+
+def __insertion_sort_range(arr, tracker, begin, end) -> None:
+    """
+    Insertion sort on arr[begin..end]
+    """
+    for i in range(begin + 1, end + 1):
+        key = arr[i]
+        j = i - 1
+        while j >= begin:
+            tracker.compare(j)
+            if not key < arr[j]:
+                break
+            arr[j + 1] = arr[j]
+            tracker.write(j + 1, arr[j])
+            j -= 1
+        if j + 1 != i:
+            arr[j + 1] = key
+            tracker.write(j + 1, key)
+
+
+def __heap_sort_range(arr, tracker, begin, end) -> None:
+    """
+    Heap sort on arr[begin..end], sifting down in a loop instead of recursing
+    """
+    size = end - begin + 1
+
+    def sift_down(idx: int, limit: int) -> None:
+        # move the value at idx down the max heap until both children are smaller
+        while True:
+            max_idx = idx
+            lidx = idx * 2 + 1
+            ridx = lidx + 1
+            if lidx < limit:
+                tracker.compare(begin + lidx, begin + max_idx)
+                if arr[begin + lidx] > arr[begin + max_idx]:
+                    max_idx = lidx
+            if ridx < limit:
+                tracker.compare(begin + ridx, begin + max_idx)
+                if arr[begin + ridx] > arr[begin + max_idx]:
+                    max_idx = ridx
+            if max_idx == idx:
+                return
+            swap_bars(arr, begin + idx, begin + max_idx)
+            tracker.swap(begin + idx, begin + max_idx)
+            idx = max_idx
+
+    for i in range(size // 2 - 1, -1, -1):
+        sift_down(i, size)
+    for i in range(size - 1, 0, -1):
+        swap_bars(arr, begin, begin + i)
+        tracker.swap(begin, begin + i)
+        sift_down(0, i)
+
+
+def counting_sort(arr, tracker: SortTracker = None) -> None:
+    """
+    Count how many times each integer occurs, then write them back in order.
+    Takes O(n + k) time and memory for k possible values.
+    """
+    tracker = tracker or SortTracker()
+    if len(arr) < 2:
+        return
+    low, high = __value_range(arr, tracker)
+    counts = array("q", [0]) * (high - low + 1)
+    for i in range(len(arr)):
+        tracker.read(i)
+        counts[arr[i] - low] += 1
+
+    # gather the counted values back into the array
+    idx = 0
+    for offset, count in enumerate(counts):
+        value = low + offset
+        for _ in range(count):
+            arr[idx] = value
+            tracker.write(idx, value)
+            idx += 1
+
+
+def lsd_radix_sort(arr, tracker: SortTracker = None, radix: int = 256) -> None:
+    """
+    Least significant digit radix sort on integers, each pass is a stable counting
+    sort on one digit in the given radix
+    """
+    if radix < 2:
+        raise ValueError("The radix must be at least 2!")
+    tracker = tracker or SortTracker()
+    if len(arr) < 2:
+        return
+    low, high = __value_range(arr, tracker)
+    aux = [0] * len(arr)  # a single buffer reused by every pass
+    exp = 1
+    while (high - low) // exp > 0:
+        counts = __count_digits(arr, tracker, aux, 0, len(arr) - 1, low, exp, radix)
+        __scatter(arr, tracker, aux, 0, len(arr) - 1, low, exp, radix, counts)
+        exp *= radix
+
+
+def msd_radix_sort(arr, tracker: SortTracker = None, radix: int = 256) -> None:
+    """
+    Most significant digit radix sort on integers, each bucket of the current digit
+    is sorted recursively on the next digit. Small buckets use insertion sort.
+    """
+    if radix < 2:
+        raise ValueError("The radix must be at least 2!")
+    tracker = tracker or SortTracker()
+    if len(arr) < 2:
+        return
+    low, high = __value_range(arr, tracker)
+    exp = 1
+    while (high - low) // exp >= radix:
+        exp *= radix
+    __msd_radix_sort(arr, tracker, [0] * len(arr), 0, len(arr) - 1, low, exp, radix)
+
+
+def __msd_radix_sort(arr, tracker, aux, begin, end, low, exp, radix) -> None:
+    if end - begin + 1 <= INSERTION_SORT_THRESHOLD:
+        __insertion_sort_range(arr, tracker, begin, end)
+        return
+    counts = __count_digits(arr, tracker, aux, begin, end, low, exp, radix)
+    starts = __scatter(arr, tracker, aux, begin, end, low, exp, radix, counts)
+    if exp > 1:
+        # each bucket is everything from its start to the start of the next one
+        for digit in range(radix):
+            bucket_end = starts[digit + 1] - 1 if digit + 1 < radix else end
+            if starts[digit] < bucket_end:
+                __msd_radix_sort(
+                    arr,
+                    tracker,
+                    aux,
+                    starts[digit],
+                    bucket_end,
+                    low,
+                    exp // radix,
+                    radix,
+                )
+
+
+def bucket_sort(arr, tracker: SortTracker = None) -> None:
+    """
+    Scatter the values into n equal-width buckets by value, then insertion sort
+    each bucket. Takes O(n) time on average for evenly spread values.
+    """
+    tracker = tracker or SortTracker()
+    size = len(arr)
+    if size < 2:
+        return
+    low, high = __value_range(arr, tracker)
+    if low == high:
+        return
+
+    def bucket_of(value) -> int:
+        return int((value - low) * (size - 1) // (high - low))
+
+    # count the size of each bucket while copying the values out of the array
+    aux = [0] * size
+    counts = array("q", [0]) * size
+    for i in range(size):
+        tracker.read(i)
+        aux[i] = arr[i]
+        counts[bucket_of(arr[i])] += 1
+
+    # turn the sizes into the start of each bucket, then scatter the values
+    starts = array("q", [0]) * size
+    total = 0
+    for bucket in range(size):
+        starts[bucket] = total
+        total += counts[bucket]
+    ends = array("q", starts)
+    for value in aux:
+        bucket = bucket_of(value)
+        arr[ends[bucket]] = value
+        tracker.write(ends[bucket], value)
+        ends[bucket] += 1
+
+    for bucket in range(size):
+        if counts[bucket] > 1:
+            __insertion_sort_range(arr, tracker, starts[bucket], ends[bucket] - 1)
+
+
+def __value_range(arr, tracker) -> tuple:
+    """
+    Read every value to find the smallest and the biggest one
+    """
+    low = high = arr[0]
+    for i in range(len(arr)):
+        tracker.read(i)
+        if arr[i] < low:
+            low = arr[i]
+        elif arr[i] > high:
+            high = arr[i]
+    return low, high
+
+
+def __count_digits(arr, tracker, aux, begin, end, low, exp, radix) -> array:
+    """
+    Count how many values in arr[begin..end] have each digit at the place exp,
+    while copying them into the auxiliary buffer
+    """
+    counts = array("q", [0]) * radix
+    for i in range(begin, end + 1):
+        tracker.read(i)
+        aux[i] = arr[i]
+        counts[(arr[i] - low) // exp % radix] += 1
+    return counts
+
+
+def __scatter(arr, tracker, aux, begin, end, low, exp, radix, counts) -> array:
+    """
+    Stably write the values of aux[begin..end] back into the array, grouped by
+    their digit at the place exp
+    Returns:
+        array: the index where the group of each digit starts
+    """
+    starts = array("q", [0]) * radix
+    total = begin
+    for digit in range(radix):
+        starts[digit] = total
+        total += counts[digit]
+    next_idx = array("q", starts)
+    for i in range(begin, end + 1):
+        value = aux[i]
+        digit = (value - low) // exp % radix
+        arr[next_idx[digit]] = value
+        tracker.write(next_idx[digit], value)
+        next_idx[digit] += 1
+    return starts
+
+
+def bitonic_sort(arr, tracker: SortTracker = None) -> None:
+    """
+    Bitonic sorting network: log(n)*(log(n)+1)/2 stages of independent
+    compare-exchanges, each stage applied at once on a NumPy array. The network
+    is the one where every comparator puts the smaller value first: each merge
+    compares the 2 halves of a block in mirror instead of sorting one of them
+    downward.
+    """
+    __sorting_network(arr, tracker or SortTracker(), __bitonic_stages)
+
+
+def odd_even_merge_sort(arr, tracker: SortTracker = None) -> None:
+    """
+    Batcher's odd-even merge sort network: as many stages as the bitonic network
+    but fewer comparators, each stage applied at once on a NumPy array
+    """
+    __sorting_network(arr, tracker or SortTracker(), __odd_even_merge_stages)
+
+
+def __sorting_network(arr, tracker, stages) -> None:
+    """
+    Apply the stages of a sorting network to a NumPy copy of the array, the
+    array gets the values back even if the tracker stops the sort.
+    The network is built for the next power of 2, the copy being padded with its
+    biggest value: every comparator puts the smaller value first, so the ones
+    reaching into the padding never swap and are not given to the tracker.
+    Args:
+        stages ([type]): generates the (view, args) of each stage for a size,
+            view(x, *args) giving the 2 sides of its comparators as views of x
+    """
+    size = len(arr)
+    if size < 2:
+        return
+    total = 1 << (size - 1).bit_length()
+    values = np.array(arr)
+    padding = np.full(total - size, values.max(), dtype=values.dtype)
+    values = np.concatenate((values, padding))
+    indices = np.arange(total)
+    try:
+        for view, args in stages(total):
+            first, second = view(values, *args)
+            swapped = second < first
+            # both sides are views, so the values are exchanged in place
+            highs = np.maximum(first, second)
+            np.minimum(first, second, out=first)
+            second[...] = highs
+            low, high = view(indices, *args)
+            if total > size:
+                real = high < size
+                low, high, swapped = low[real], high[real], swapped[real]
+            elif tracker.needs_operations:
+                low, high, swapped = low.ravel(), high.ravel(), swapped.ravel()
+            tracker.compare_exchange(low, high, swapped)
+    finally:
+        arr[:] = values[:size].tolist()
+
+
+def __bitonic_stages(total: int):
+    """
+    Generate the stages of a bitonic network for a power of 2
+    """
+    block = 2
+    while block <= total:
+        # compare the halves of each block in mirror, then half-clean them
+        yield __mirror, (block,)
+        distance = block // 4
+        while distance:
+            yield __half_clean, (distance,)
+            distance //= 2
+        block *= 2
+
+
+def __odd_even_merge_stages(total: int):
+    """
+    Generate the stages of an odd-even merge sort network for a power of 2
+    """
+    width = 1  # the sorted runs merged by pairs
+    while width < total:
+        yield __half_clean, (width,)
+        distance = width // 2
+        while distance:
+            yield __odd_even_merge_step, (distance, width)
+            distance //= 2
+        width *= 2
+
+
+def __mirror(x, block: int) -> tuple:
+    """
+    Pair the values of the 1st half of each block with the 2nd half in reverse
+    """
+    blocks = x.reshape(-1, block)
+    return blocks[:, : block // 2], blocks[:, : block // 2 - 1 : -1]
+
+
+def __half_clean(x, distance: int) -> tuple:
+    """
+    Pair the values of the 1st half of each block of 2*distance with the 2nd half
+    """
+    pairs = x.reshape(-1, 2, distance)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def __odd_even_merge_step(x, distance: int, width: int) -> tuple:
+    """
+    Pair the values distance apart inside each merge of 2 runs of width, leaving
+    out the first and last distance values of the merge
+    """
+    merges = x.reshape(-1, 2 * width)[:, distance : 2 * width - distance]
+    pairs = merges.reshape(len(merges), -1, 2, distance)
+    return pairs[:, :, 0], pairs[:, :, 1]
+
+
+# arrays shorter than this are not worth starting worker processes for
+PARALLEL_THRESHOLD = 50_000
+
+
+def parallel_merge_sort(arr, tracker: SortTracker = None, workers: int = None) -> None:
+    """
+    Merge sort that sorts one chunk of the array per worker process, then merges the
+    sorted chunks in pairs until a single run is left. The array is kept in shared
+    memory so the workers only ever receive indices, and each merge is split between
+    the workers so every level of the merge tree runs in parallel.
+    When the tracker needs every operation, or the array is small, the same chunks
+    and merges run one after another in this process.
+    Args:
+        workers (int, optional): number of worker processes (defaults to CPU count)
+    """
+    tracker = tracker or SortTracker()
+    workers = workers or os.cpu_count() or 1
+    size = len(arr)
+    bounds = [size * worker // workers for worker in range(workers + 1)]
+    runs = [
+        (bounds[worker], bounds[worker + 1] - 1)
+        for worker in range(workers)
+        if bounds[worker] < bounds[worker + 1]
+    ]
+
+    if not tracker.needs_operations and workers > 1 and size >= PARALLEL_THRESHOLD:
+        try:
+            values = array("q", arr)
+        except (TypeError, OverflowError):
+            pass  # only 64-bit integers fit in the shared buffers
+        else:
+            __parallel_merge_runs(arr, tracker, values, runs, workers)
+            return
+
+    aux = [None] * size
+    for worker, (begin, end) in enumerate(runs):
+        tracker.assign(begin, end, worker)
+        __merge_sort(arr, tracker, aux, begin, end)
+    while len(runs) > 1:
+        merged = []
+        for k in range(0, len(runs) - 1, 2):
+            (begin, mid), (_, end) = runs[k], runs[k + 1]
+            tracker.assign(begin, end, k // 2)
+            __merge(arr, tracker, aux, begin, mid, end)
+            merged.append((begin, end))
+        if len(runs) % 2 == 1:
+            merged.append(runs[-1])
+        runs = merged
+
+
+def __parallel_merge_runs(arr, tracker, values, runs, workers) -> None:
+    """
+    Sort each run in its own process, then merge the runs level by level,
+    going back and forth between 2 shared buffers
+    """
+    size = len(values)
+    buffers = [SharedMemory(create=True, size=values.itemsize * size) for _ in range(2)]
+    names = [buffer.name for buffer in buffers]
+    try:
+        view = buffers[0].buf.cast("q")
+        view[:] = values
+        view.release()
+        del values
+
+        with Pool(workers) as pool:
+            counts = pool.starmap(
+                _sort_shared_run, [(names[0], begin, end) for begin, end in runs]
+            )
+            src, dst = 0, 1
+            while len(runs) > 1:
+                tasks = []
+                merged = []
+                view = buffers[src].buf.cast("q")
+                for k in range(0, len(runs), 2):
+                    left = runs[k]
+                    # the odd run out is merged with an empty run, which copies it
+                    right = runs[k + 1] if k + 1 < len(runs) else (left[1] + 1, left[1])
+                    tasks += __split_merge(view, left, right, size // workers or 1)
+                    merged.append((left[0], right[1]))
+                view.release()
+                counts += pool.starmap(
+                    _merge_shared_runs, [(names[src], names[dst]) + t for t in tasks]
+                )
+                runs = merged
+                src, dst = dst, src
+
+        view = buffers[src].buf.cast("q")
+        arr[:] = view.tolist()
+        view.release()
+        for comparisons, writes in counts:
+            tracker.comparisons += comparisons
+            tracker.writes += writes
+        tracker.writes += size
+    finally:
+        for buffer in buffers:
+            buffer.close()
+            buffer.unlink()
+
+
+def __split_merge(view, left, right, piece_size) -> list:
+    """
+    Split the merge of 2 sorted runs into pieces of about the same size that can be
+    merged independently. Each piece starts at the output index where the merge
+    would have taken exactly i values from the left run and k-i from the right one.
+    Returns:
+        list: (left begin, left end, right begin, right end, output index) of each
+            piece, where the ends are exclusive
+    """
+    left_size = left[1] - left[0] + 1
+    right_size = right[1] - right[0] + 1
+    total = left_size + right_size
+    cuts = [(0, 0)]
+    for k in range(piece_size, total, piece_size):
+        # binary search for how many values the first k outputs take from the left
+        low, high = max(0, k - right_size), min(k, left_size)
+        while low < high:
+            i = (low + high) // 2
+            if view[left[0] + i] <= view[right[0] + k - i - 1]:
+                low = i + 1
+            else:
+                high = i
+        cuts.append((low, k - low))
+    cuts.append((left_size, right_size))
+
+    return [
+        (
+            left[0] + i1,
+            left[0] + i2,
+            right[0] + j1,
+            right[0] + j2,
+            left[0] + i1 + j1,
+        )
+        for (i1, j1), (i2, j2) in zip(cuts, cuts[1:])
+    ]
+
+
+def _sort_shared_run(name, begin, end) -> tuple:
+    """
+    Worker task that merge sorts the run buf[begin..end] of a shared buffer
+    Returns:
+        tuple: the number of comparisons and writes made
+    """
+    buffer = SharedMemory(name=name)
+    try:
+        view = buffer.buf.cast("q")
+        run = view[begin : end + 1].tolist()
+        tracker = SortTracker()
+        merge_sort(run, tracker)
+        view[begin : end + 1] = array("q", run)
+        view.release()
+    finally:
+        buffer.close()
+    return tracker.comparisons, tracker.writes
+
+
+def _merge_shared_runs(
+    src_name, dst_name, left_begin, left_end, right_begin, right_end, out
+) -> tuple:
+    """
+    Worker task that merges src[left_begin:left_end] and src[right_begin:right_end]
+    into dst starting at the index out
+    Returns:
+        tuple: the number of comparisons and writes made
+    """
+    src, dst = SharedMemory(name=src_name), SharedMemory(name=dst_name)
+    try:
+        view = src.buf.cast("q")
+        left = view[left_begin:left_end].tolist()
+        right = view[right_begin:right_end].tolist()
+        view.release()
+
+        merged = []
+        l = r = comparisons = 0
+        while l < len(left) and r < len(right):
+            comparisons += 1
+            if right[r] < left[l]:
+                merged.append(right[r])
+                r += 1
+            else:
+                merged.append(left[l])
+                l += 1
+        merged += left[l:]
+        merged += right[r:]
+
+        view = dst.buf.cast("q")
+        view[out : out + len(merged)] = array("q", merged)
+        view.release()
+    finally:
+        src.close()
+        dst.close()
+    return comparisons, len(merged)
+
+
+# every sorting algorithm by name, in the order they are listed in the visualizer
+SORTING_ALGORITHMS = {
+    "merge_sort": merge_sort,
+    "quick_sort": quick_sort,
+    "heap_sort": heap_sort,
+    "insertion_sort": insertion_sort,
+    "selection_sort": selection_sort,
+    "bubble_sort": bubble_sort,
+    "intro_sort": intro_sort,
+    "dual_pivot_intro_sort": dual_pivot_intro_sort,
+    "lsd_radix_sort": lsd_radix_sort,
+    "msd_radix_sort": msd_radix_sort,
+    "counting_sort": counting_sort,
+    "bucket_sort": bucket_sort,
+    "parallel_merge_sort": parallel_merge_sort,
+    "bitonic_sort": bitonic_sort,
+    "odd_even_merge_sort": odd_even_merge_sort,
+    "tim_sort": tim_sort,
+    "block_merge_sort": block_merge_sort,
+}
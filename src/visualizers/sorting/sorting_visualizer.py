@@ -1,36 +1,114 @@
+import math
+import time
+from collections import deque
 from os import getcwd
-from random import randint
+from os import path
 
+import numpy as np
 import pygame
+from pygame.constants import K_0
 from pygame.constants import K_1
 from pygame.constants import K_2
 from pygame.constants import K_3
 from pygame.constants import K_4
 from pygame.constants import K_5
 from pygame.constants import K_6
+from pygame.constants import K_7
+from pygame.constants import K_8
+from pygame.constants import K_9
 from pygame.font import SysFont
 
+from .bar_renderer import BarRenderer
+from .bar_renderer import GRAY
+from .data_generation import DEFAULT_SEED
+from .data_generation import DISTRIBUTIONS
+from .data_generation import generate
+from .sort_race import OPERATIONS
+from .sort_race import SortRace
+from .sort_trace import COMPARE
+from .sort_trace import READ
+from .sort_trace import SortTrace
+from .sort_trace import SWAP
+from .sort_trace import TRACE_PATH
+from .sort_trace import TracePlayer
+from .sort_trace import TraceRecorder
+from .sort_trace import WRITE
+from .sorting_algorithms import SORTING_ALGORITHMS
+from .sorting_algorithms import SortingStopped
+from .sorting_algorithms import SortTracker
 from src.visualizers.base_visualizer import BaseVisualizer
+from src.visualizers.frame_exporter import FrameExporter
+from src.visualizers.frame_exporter import LAST_FRAME_DURATION
+from src.visualizers.frame_profiler import FrameProfiler
 
 
-BAR_WIDTH = 2
-NUM_OF_BARS = 500
+NUM_OF_BARS = 500  # default number of bars to sort
+MIN_BARS = 10
+MAX_BARS = 1_000_000
 SCREEN_BORDER = 10
-SCREEN_W = BAR_WIDTH * NUM_OF_BARS
-SCREEN_H = NUM_OF_BARS
+SCREEN_W = 1000
+SCREEN_H = 500
 SHIFT_DOWN = 150
-NUM_OG_ALGOS = 6
+FRAME_TIME = 1 / 60  # seconds between frames when sorting more bars than pixels
+HIGHLIGHTS_PER_FRAME = 32  # number of the latest operations highlighted in a frame
+STAGE_DELAY = 100  # milliseconds each stage of a sorting network stays on the screen
+NUM_OG_ALGOS = len(SORTING_ALGORITHMS)
+ALGOS_PER_COLUMN = 6  # number of algorithm names listed in each column of the menu
+ALGO_COLUMN_W = 230  # width of each column of the menu
+# the operations of a sort are recorded for the replay up to this many,
+# each one takes about 50 bytes with the snapshots
+MAX_RECORDED_OPERATIONS = 20_000_000
+REPLAY_DURATION = 10  # seconds a replay takes at its initial speed
+MAX_REPLAY_SPEED = 10**8  # operations per second
+PROGRESS_BAR = (30, 130, SCREEN_W - 60, 8)  # the replay position, clicking it seeks
+EXPORT_SWEEP_FRAMES = 30  # frames of the final sweep over the sorted bars in exports
+RACE_TITLE_H = 36  # height of the name and counters above each pane of a race
+RACE_GAP = 4  # space between the panes of a race
+
+# the name displayed in the menu for each algorithm
+ALGORITHM_TITLES = {
+    "merge_sort": "Merge Sort",
+    "quick_sort": "Quick Sort",
+    "heap_sort": "Heap Sort",
+    "insertion_sort": "Insertion Sort",
+    "selection_sort": "Selection Sort",
+    "bubble_sort": "Bubble Sort",
+    "intro_sort": "Introsort",
+    "dual_pivot_intro_sort": "Dual-Pivot Introsort",
+    "lsd_radix_sort": "LSD Radix Sort",
+    "msd_radix_sort": "MSD Radix Sort",
+    "counting_sort": "Counting Sort",
+    "bucket_sort": "Bucket Sort",
+    "parallel_merge_sort": "Parallel Merge Sort",
+    "bitonic_sort": "Bitonic Sort",
+    "odd_even_merge_sort": "Odd-Even Merge Sort",
+    "tim_sort": "Timsort",
+    "block_merge_sort": "Block Merge Sort",
+}
 
 WHITE = (200, 200, 200)
 BLACK = (0, 0, 0)
 YELLOW = (244, 242, 30)
 GREEN = (10, 225, 20)
 RED = (255, 0, 0)
+BLUE = (30, 144, 255)
+# the tint of the bars each worker of a parallel algorithm is working on
+WORKER_COLORS = [
+    (200, 120, 120),
+    (120, 200, 120),
+    (120, 140, 220),
+    (210, 190, 110),
+    (190, 120, 210),
+    (110, 200, 200),
+    (220, 160, 100),
+    (160, 160, 160),
+]
+# the highlight of each kind of operation
+OPERATION_COLORS = {COMPARE: RED, READ: BLUE, SWAP: GREEN, WRITE: GREEN}
+# every color drawn on the screen, exported frames are quantized to them
+EXPORT_PALETTE = [WHITE, BLACK, YELLOW, GREEN, RED, BLUE, GRAY] + WORKER_COLORS
 
 _font = None
-_looping = True  # keep the mainloop run
-_is_sorted = False  # check if the bar list is already _is_sorted
-_stop_sorting = False  # check whether to stop the sorting process without quitting
 
 
 class SortingVisualizer(BaseVisualizer):
@@ -38,7 +116,25 @@ class SortingVisualizer(BaseVisualizer):
     The GUI to visualize the sorting process.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        num_of_bars: int = NUM_OF_BARS,
+        seed: int = DEFAULT_SEED,
+        trace_path: str = TRACE_PATH,
+        distribution: str = "random",
+        algorithm: int = 1,
+        exporter: FrameExporter = None,
+    ) -> None:
+        """
+        Args:
+            num_of_bars (int, optional): the number of bars to sort
+            seed (int, optional): the seed the bars are generated with
+            trace_path (str, optional): where the trace of a sort is saved and loaded
+            distribution (str, optional): the distribution of the bars
+            algorithm (int, optional): the number of the algorithm chosen at first
+            exporter (FrameExporter, optional): sort the bars offscreen at once and
+                give the frames to the exporter, instead of waiting for the user
+        """
         icon_path = getcwd() + "/images/sort_icon.ico"
         super().__init__(
             SCREEN_W,
@@ -47,47 +143,120 @@ class SortingVisualizer(BaseVisualizer):
             BLACK,
             icon_path,
         )
-        global _looping, bar_list, _font, bar_color, _is_sorted, _stop_sorting
+        global _font
         #######  initialize variables  #######
         _font = SysFont("consolas", 16, bold=True)  # the text font
         self._algo_text_colors = [GREEN] * NUM_OG_ALGOS  # generate the bars' colors
         self._bar_list = None  # list of bars to display
         self._bar_color = None  # the color for each bar
+        self._num_of_bars = num_of_bars  # independent from the screen size
+        self._distribution = distribution  # the distribution of the generated bars
+        self._seed = seed  # the seed of the bars, so every run can be repeated
+        self._renderer = BarRenderer(self._screen, (0, SHIFT_DOWN, SCREEN_W, SCREEN_H))
         self._algo = 1
-        _looping = True
-        _is_sorted = False
+        self._race_algos = set()  # the numbers of the algorithms picked for a race
+        self._trace = None  # the operations of the last sort, for the replay
+        self._trace_path = trace_path  # where the trace is saved and loaded
+        self._player = None  # plays the trace back while replaying
+        self._exporter = exporter  # takes the frames when exporting
+        # the state shared with the sorting display
+        self._session = _Session(self._profiler)
         #######  get the visualizer run  #######
-        self.__choose_algo(1)
+        self.__choose_algo(algorithm)
         self.__shuffle()
-        self.__mainloop()
+        if exporter is None:
+            self.__mainloop()
+        else:
+            self.__export()
 
     def __mainloop(self) -> None:
         """
         mainloop to keep the screen displayed
         """
-        while _looping:
-            super().draw()
-            self.__input_handling()
+        while self._session.looping:
+            # nothing moves before the sort starts, so wait for the user
+            events = super().idle()
+            with self._profiler.phase("input"):
+                self.__input_handling(events)
 
-    def __input_handling(self) -> None:
+    def __export(self) -> None:
+        """
+        sort the bars offscreen and give the frames to the exporter
+        """
+        self._exporter.capture(self._screen)
+        self.__start()
+        self._exporter.capture(self._screen, LAST_FRAME_DURATION)
+        self._exporter.close()
+
+    def __input_handling(self, events) -> None:
         """
         handle the keyboard and mouse input before the sorting begins
+        Args:
+            events ([type]): the events that woke the screen up
         """
-        for event in pygame.event.get():
+        for event in events:
+            # F3/F4 -> show the frame profiler/save its timeline
+            if self._profiler.handle(event):
+                continue
             if event.type == pygame.QUIT:
-                quit()
+                self._session.quit()
             elif event.type == pygame.KEYDOWN:
                 # ESC -> back to menu screen
                 if event.key == pygame.K_ESCAPE:
-                    quit()
-                # C -> shuffle
+                    self._session.quit()
+                # C -> shuffle with the next seed
                 elif event.key == pygame.K_c:
+                    self._seed += 1
+                    self.__shuffle()
+                # D -> next input distribution
+                elif event.key == pygame.K_d:
+                    names = list(DISTRIBUTIONS)
+                    next_idx = (names.index(self._distribution) + 1) % len(names)
+                    self._distribution = names[next_idx]
                     self.__shuffle()
                 # Enter -> start sort
-                elif event.key == pygame.K_RETURN and not _is_sorted:
+                elif event.key == pygame.K_RETURN and not self._session.is_sorted:
                     self.__start()
+                # Space -> pick the chosen algorithm for a race, or drop it
+                elif event.key == pygame.K_SPACE:
+                    self._race_algos ^= {self._algo}
+                    self.__create_instruction()
+                # V -> race the picked algorithms
+                elif event.key == pygame.K_v:
+                    self.__race()
+                # R -> replay the last sort
+                elif event.key == pygame.K_r and self._trace is not None:
+                    self.__replay()
+                # S -> save the trace of the last sort
+                elif event.key == pygame.K_s and self._trace is not None:
+                    self._trace.save(self._trace_path)
+                # L -> load a saved trace and replay it
+                elif event.key == pygame.K_l and path.exists(self._trace_path):
+                    self._trace = SortTrace.load(self._trace_path)
+                    self.__replay()
+                # +/- -> 10 times more/less bars
+                elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                    self.__resize(self._num_of_bars * 10)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.__resize(self._num_of_bars // 10)
+                # Up/Down -> choose the previous/next algorithm
+                elif event.key == pygame.K_UP:
+                    self.__choose_algo((self._algo - 2) % NUM_OG_ALGOS + 1)
+                elif event.key == pygame.K_DOWN:
+                    self.__choose_algo(self._algo % NUM_OG_ALGOS + 1)
                 else:
-                    switch = {K_1: 1, K_2: 2, K_3: 3, K_4: 4, K_5: 5, K_6: 6}
+                    switch = {
+                        K_1: 1,
+                        K_2: 2,
+                        K_3: 3,
+                        K_4: 4,
+                        K_5: 5,
+                        K_6: 6,
+                        K_7: 7,
+                        K_8: 8,
+                        K_9: 9,
+                        K_0: 10,
+                    }
                     self.__choose_algo(switch.get(event.key, -1))
 
     def __create_instruction(self) -> None:
@@ -98,35 +267,47 @@ class SortingVisualizer(BaseVisualizer):
         pos_x1 = 700
         self.pos_x2 = 30
         self.pos_y = []
-        display_text(self._screen, "C: Shuffle", pos_x1, 10)
-        display_text(self._screen, "<Enter>: Start", pos_x1, 30)
-        display_text(self._screen, "ESC: Exit visualizer", pos_x1, 50)
+        self._screen.fill(BLACK, (0, 0, SCREEN_W, SHIFT_DOWN))
+        display_text(self._screen, f"C: Shuffle (seed {self._seed})", pos_x1, 10)
+        display_text(self._screen, f"D: Input ({self._distribution})", pos_x1, 30)
+        display_text(self._screen, f"+/-: Size ({self._num_of_bars})", pos_x1, 50)
+        display_text(self._screen, "<Enter>: Start", pos_x1, 70)
+        display_text(self._screen, "ESC: Exit visualizer", pos_x1, 90)
+        display_text(self._screen, "R/S/L: Replay/Save/Load", pos_x1, 110)
+        display_text(self._screen, "Space/V: Pick/Start race", pos_x1, 130)
+        display_text(
+            self._screen,
+            "F3/F4: Profiler/Timeline",
+            self.pos_x2 + 2 * ALGO_COLUMN_W,
+            130,
+        )
         display_text(
             self._screen,
-            "Press a corresponding number " "to choose algorithm",
+            "Press a number or Up/Down to choose algorithm",
             self.pos_x2,
             10,
         )
 
         # create the algorithm names for the user to choose
+        # only the first 10 algorithms have a number key, the rest use Up/Down
+        # and the ones picked for a race are marked with a +
         self._algo_names = [
-            "1. Merge Sort",
-            "2. Quick Sort",
-            "3. Heap Sort",
-            "4. Insertion Sort",
-            "5. Selection Sort",
-            "6. Bubble Sort",
+            ("+" if i + 1 in self._race_algos else " ")
+            + (f"{(i + 1) % 10}. " if i < 10 else "   ")
+            + ALGORITHM_TITLES[name]
+            for i, name in enumerate(SORTING_ALGORITHMS)
         ]
+        # list the names in columns so they stay above the bars
         for i in range(NUM_OG_ALGOS):
-            self.pos_y.append(y)
+            column, row = divmod(i, ALGOS_PER_COLUMN)
+            self.pos_y.append(y + row * 20)
             display_text(
                 self._screen,
                 self._algo_names[i],
-                self.pos_x2,
-                y,
+                self.pos_x2 + column * ALGO_COLUMN_W,
+                self.pos_y[i],
                 self._algo_text_colors[i],
             )
-            y += 20
 
     def __choose_algo(self, chosen) -> None:
         """
@@ -144,70 +325,415 @@ class SortingVisualizer(BaseVisualizer):
             ] = YELLOW  # highlight the newly chosen one
             self.__create_instruction()  # update the display
 
+    def __resize(self, num_of_bars: int) -> None:
+        """
+        change the number of bars and shuffle them
+        """
+        self._num_of_bars = min(max(num_of_bars, MIN_BARS), MAX_BARS)
+        self.__shuffle()
+
     def __shuffle(self) -> None:
         """
         shuffle the bars
         """
-        global _is_sorted
-        self._bar_list = list(range(1, NUM_OF_BARS + 1))  # generate the bars
-        _is_sorted = False  # set un_is_sorted
-        self._bar_color = [WHITE] * NUM_OF_BARS  # reset bar colors
-        for i in range(NUM_OF_BARS):
-            rand = randint(0, NUM_OF_BARS - 1)  # generate a random index
-            swap_bars(self._bar_list, i, rand)  # swap to shuffle
+        # generate the bars
+        self._bar_list = generate(self._distribution, self._num_of_bars, self._seed)
+        self._session.is_sorted = False  # set unsorted
+        self._bar_color = [WHITE] * self._num_of_bars  # reset bar colors
 
         # update the screen display after shuffling
-        show_bars(self._screen, self._bar_list, self._bar_color)  # show the bar list
+        self._renderer.set_values(self._bar_list)
+        self._renderer.draw(self._bar_color)  # show the bar list
         self.__create_instruction()  # show the text
 
     def __start(self) -> None:
         """
         start the sorting process
         """
-        global _is_sorted, _stop_sorting
-        _is_sorted = True
-        _stop_sorting = False
-        switcher = {
-            1: lambda screen, bar_list, bar_color: merge_sort(
-                screen, bar_list, bar_color
-            ),
-            2: lambda screen, bar_list, bar_color: quick_sort(
-                screen, bar_list, bar_color
-            ),
-            3: lambda screen, bar_list, bar_color: heap_sort(
-                screen, bar_list, bar_color
-            ),
-            4: lambda screen, bar_list, bar_color: insertion_sort(
-                screen, bar_list, bar_color
-            ),
-            5: lambda screen, bar_list, bar_color: selection_sort(
-                screen, bar_list, bar_color
-            ),
-            6: lambda screen, bar_list, bar_color: bubble_sort(
-                screen, bar_list, bar_color
-            ),
-        }
+        self._session.is_sorted = True
+        self._session.stop_sorting = False
         # use the algorithm corresponding to the number chosen
-        switcher.get(self._algo)(self._screen, self._bar_list, self._bar_color)
+        name = list(SORTING_ALGORITHMS)[self._algo - 1]
+        # record the operations while they are displayed, so they can be replayed
+        recorder = TraceRecorder(
+            self._bar_list,
+            _SortingDisplay(
+                self._session,
+                self._screen,
+                self._renderer,
+                self._bar_color,
+                self._exporter,
+            ),
+            name,
+            MAX_RECORDED_OPERATIONS,
+        )
+        try:
+            SORTING_ALGORITHMS[name](self._bar_list, recorder)
+        except SortingStopped:
+            # leave the bars as they are when the sorting process is stopped
+            self._bar_color[:] = [WHITE] * self._num_of_bars
+        self._trace = None if recorder.truncated else recorder.trace()
 
         # refresh the screen display
-        if _looping:
-            show_bars(self._screen, self._bar_list, self._bar_color)
+        if self._session.looping:
+            self._renderer.draw(self._bar_color)
             self.__create_instruction()
             pygame.display.update()
 
-        # if the bars are all _is_sorted, we add the running effect
-        if _looping and not _stop_sorting:
-            for i in range(NUM_OF_BARS):
-                self._bar_color[i] = YELLOW
-                pygame.time.delay(1)
+        # if the bars are all sorted, we add the running effect
+        if self._session.looping and not self._session.stop_sorting:
+            # sweep over at most 1 column of the screen per frame
+            step = max(1, self._num_of_bars // SCREEN_W)
+            if self._exporter is not None:
+                step = max(1, self._num_of_bars // EXPORT_SWEEP_FRAMES)
+            for i in range(0, self._num_of_bars, step):
+                end = min(i + step, self._num_of_bars)
+                self._bar_color[i:end] = [YELLOW] * (end - i)
                 # update the display
-                show_bars(self._screen, self._bar_list, self._bar_color)
-                self.__create_instruction()
-                pygame.display.update()
+                with self._profiler.phase("draw"):
+                    self._renderer.draw(self._bar_color)
+                    self.__create_instruction()
+                if self._exporter is not None:
+                    self._exporter.capture(self._screen)
+                else:
+                    with self._profiler.phase("wait"):
+                        pygame.time.delay(1)
+                    self._profiler.present()
 
+    def __race(self) -> None:
+        """
+        sort the bars with every algorithm picked (all of them when none is) at once,
+        each in its own process, and show them side by side in one pane each
+        """
+        names = list(SORTING_ALGORITHMS)
+        if self._race_algos:
+            names = [names[algo - 1] for algo in sorted(self._race_algos)]
+        self._session.stop_sorting = False
+
+        # tile the panes over the bars, as square as possible
+        columns = math.ceil(math.sqrt(len(names)))
+        rows = math.ceil(len(names) / columns)
+        pane_w, pane_h = SCREEN_W // columns, SCREEN_H // rows
+        font = SysFont("consolas", 13, bold=True)
+        panes = []
+        for i, name in enumerate(names):
+            row, column = divmod(i, columns)
+            rect = (column * pane_w, SHIFT_DOWN + row * pane_h, pane_w, pane_h)
+            title = ALGORITHM_TITLES[name]
+            panes.append(_RacePane(self._screen, rect, title, self._bar_list, font))
+
+        self._screen.fill(BLACK, (0, SHIFT_DOWN, SCREEN_W, SCREEN_H))
+
+        race = SortRace(names, self._bar_list)
+        finished = 0
+        try:
+            while self._session.looping and race.is_running():
+                # the workers are paused while a frame is drawn, so instead of
+                # sleeping until the next one their batches are received
+                with self._profiler.phase("wait"):
+                    messages = race.receive(FRAME_TIME)
+                with self._profiler.phase("draw"):
+                    for i, message in messages:
+                        if not panes[i].receive(message):
+                            finished += 1
+                    for pane in panes:
+                        pane.draw()
+                    self._session.show_running_instruction(self._screen)
+                self._profiler.present()
+                with self._profiler.phase("input"):
+                    self._session.running_input_handling()
+                if self._session.stop_sorting:
+                    break
+        finally:
+            race.stop()
+
+        # rank the algorithms by the CPU time they took, the errors last
+        if finished == len(panes):
+            ranking = sorted(panes, key=lambda pane: pane.seconds or math.inf)
+            for rank, pane in enumerate(ranking, 1):
+                pane.rank = rank
+
+        # leave the results on the screen until the bars are shuffled
+        if self._session.looping:
+            for pane in panes:
+                pane.draw()
+            self.__create_instruction()
+
+    def __replay(self) -> None:
+        """
+        play the trace back, forward or backward at any speed, until R is pressed
+        """
+        self._player = TracePlayer(self._trace)
+        self._replay_playing = True
+        self._replay_forward = True
+        # operations per second, so the whole trace takes REPLAY_DURATION
+        self._replay_speed = max(60, len(self._trace) // REPLAY_DURATION)
+        self._replaying = True
+        colors = [WHITE] * len(self._player.values)
+        highlights = deque(maxlen=HIGHLIGHTS_PER_FRAME)
+        self._renderer.set_values(self._player.values)
+        budget = 0  # the operations to play in the frame, can be a fraction
+
+        while self._session.looping and self._replaying:
+            if self._replay_playing:
+                budget += self._replay_speed * FRAME_TIME
+                for _ in range(int(budget)):
+                    if not self.__replay_step(highlights):
+                        self._replay_playing = False
+                        break
+                budget -= int(budget)
+            with self._profiler.phase("draw"):
+                self._renderer.draw(colors, highlights)
+                highlights.clear()
+                self.__show_replay_instruction()
+            # a paused replay waits for the user instead of drawing the same frame
+            if self._replay_playing:
+                super().draw()
+                events = pygame.event.get()
+            else:
+                events = super().idle()
+            with self._profiler.phase("input"):
+                self.__replay_input_handling(highlights, events)
+
+        # show the bars as they were before the replay
+        self._player = None
+        if self._session.looping:
+            self._renderer.set_values(self._bar_list)
+            self._renderer.draw(self._bar_color)
+            self.__create_instruction()
+
+    def __replay_step(self, highlights) -> bool:
+        """
+        play the next operation of the trace in the current direction
+        Args:
+            highlights ([type]): the (index, color) pairs highlighted in the frame
+        Returns:
+            bool: False when there is no operation left in that direction
+        """
+        if self._replay_forward:
+            operation = self._player.forward()
+        else:
+            operation = self._player.backward()
+        if operation is None:
+            return False
+        op, first, second = operation
+        if op == COMPARE:
+            highlights.append((first, RED))
+            if second != -1:
+                highlights.append((second, RED))
+        elif op == READ:
+            highlights.append((first, BLUE))
+        elif op == SWAP:
+            self._renderer.swap(first, second)
+            highlights.extend(((first, GREEN), (second, GREEN)))
+        else:
+            # the written value, or the overwritten one when playing backward
+            self._renderer.update(first, self._player.values[first])
+            highlights.append((first, GREEN))
+        return True
+
+    def __replay_seek(self, position: int) -> None:
+        """
+        jump to the given operation of the trace
+        """
+        self._player.seek(position)
+        self._renderer.set_values(self._player.values)
+
+    def __show_replay_instruction(self) -> None:
+        """
+        display the state of the replay and its instruction text
+        """
+        trace, position = self._trace, self._player.position
+        pos_x1 = 700
+        self._screen.fill(BLACK, (0, 0, SCREEN_W, SHIFT_DOWN))
+        title = ALGORITHM_TITLES.get(trace.algorithm, trace.algorithm)
+        if not self._replay_playing:
+            state = "Paused"
+        elif self._replay_forward:
+            state = "Playing forward"
+        else:
+            state = "Playing backward"
+        display_text(self._screen, f"Replay of {title}", 30, 10)
+        display_text(self._screen, f"Operation {position}/{len(trace)}", 30, 30)
+        display_text(
+            self._screen, f"{state} at {self._replay_speed} operations/s", 30, 50
+        )
+        display_text(self._screen, "Space: Play/Pause", pos_x1, 10)
+        display_text(self._screen, "Left/Right: Direction/Step", pos_x1, 30)
+        display_text(self._screen, "Up/Down: Speed", pos_x1, 50)
+        display_text(self._screen, "0-9/Click bar: Seek", pos_x1, 70)
+        display_text(self._screen, "R: Leave replay", pos_x1, 90)
+        display_text(self._screen, "ESC: Exit visualizer", pos_x1, 110)
+
+        # the progress bar
+        x, y, width, height = PROGRESS_BAR
+        done = width * position // max(len(trace), 1)
+        pygame.draw.rect(self._screen, WHITE, PROGRESS_BAR, 1)
+        self._screen.fill(GREEN, (x, y, done, height))
+
+    def __replay_input_handling(self, highlights, events) -> None:
+        """
+        handle the keyboard and mouse input during the replay
+        Args:
+            highlights ([type]): the (index, color) pairs highlighted in the frame
+            events ([type]): the events since the last frame
+        """
+        for event in events:
+            # F3/F4 -> show the frame profiler/save its timeline
+            if self._profiler.handle(event):
+                continue
+            if event.type == pygame.QUIT:
+                self._session.quit()
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                # click on the progress bar -> seek to that point
+                x, _, width, _ = PROGRESS_BAR
+                if pygame.Rect(PROGRESS_BAR).inflate(0, 10).collidepoint(event.pos):
+                    self.__replay_seek(len(self._trace) * (event.pos[0] - x) // width)
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self._session.quit()
+                # R -> leave the replay
+                elif event.key == pygame.K_r:
+                    self._replaying = False
+                # Space -> play/pause
+                elif event.key == pygame.K_SPACE:
+                    self._replay_playing = not self._replay_playing
+                # Left/Right -> play backward/forward, or step once when paused
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    self._replay_forward = event.key == pygame.K_RIGHT
+                    if not self._replay_playing:
+                        self.__replay_step(highlights)
+                # Up/Down -> twice faster/slower
+                elif event.key == pygame.K_UP:
+                    self._replay_speed = min(self._replay_speed * 2, MAX_REPLAY_SPEED)
+                elif event.key == pygame.K_DOWN:
+                    self._replay_speed = max(self._replay_speed // 2, 1)
+                # Home/End -> seek to the start/end
+                elif event.key == pygame.K_HOME:
+                    self.__replay_seek(0)
+                elif event.key == pygame.K_END:
+                    self.__replay_seek(len(self._trace))
+                # 0-9 -> seek to 0%-90% of the trace
+                elif pygame.K_0 <= event.key <= pygame.K_9:
+                    tenth = event.key - pygame.K_0
+                    self.__replay_seek(len(self._trace) * tenth // 10)
+
+
+class _SortingDisplay(SortTracker):
+    """
+    Tracker that animates the operations of a sorting algorithm on the screen.
+    When every bar has its own pixel column each operation gets its own frame,
+    otherwise a frame is drawn every FRAME_TIME with the latest operations
+    highlighted, so the frame rate stays the same for any number of bars.
+    When exporting, a frame is drawn every few operations whatever the time.
+    """
 
-def display_text(screen, string, pos_x, pos_y, color=GREEN) -> None:
+    needs_operations = True
+
+    def __init__(
+        self,
+        session,
+        screen,
+        renderer: BarRenderer,
+        bar_color,
+        exporter: FrameExporter = None,
+    ) -> None:
+        super().__init__()
+        self._session = session
+        self._screen = screen
+        self._exporter = exporter
+        self._renderer = renderer
+        self._bar_color = bar_color
+        self._frame_per_operation = len(bar_color) <= SCREEN_W
+        self._highlights = deque(maxlen=HIGHLIGHTS_PER_FRAME)
+        self._last_frame = time.perf_counter()
+
+    def assign(self, begin: int, end: int, worker: int) -> None:
+        # tint the segment with the color of the worker sorting it
+        color = WORKER_COLORS[worker % len(WORKER_COLORS)]
+        self._bar_color[begin : end + 1] = [color] * (end - begin + 1)
+
+    def compare(self, idx1: int, idx2: int = None) -> None:
+        super().compare(idx1, idx2)
+        self.__highlight(RED, idx1, idx2)
+
+    def read(self, idx: int) -> None:
+        super().read(idx)
+        self.__highlight(BLUE, idx)
+
+    def swap(self, idx1: int, idx2: int) -> None:
+        super().swap(idx1, idx2)
+        self._renderer.swap(idx1, idx2)
+        self.__highlight(GREEN, idx1, idx2)
+
+    def write(self, idx: int, value) -> None:
+        super().write(idx, value)
+        self._renderer.update(idx, value)
+        self.__highlight(GREEN, idx)
+
+    def compare_exchange(self, low, high, swapped) -> None:
+        super().compare_exchange(low, high, swapped)
+        self._renderer.swap(low[swapped], high[swapped])
+        # the whole stage gets a frame, with about 1 pair highlighted per column
+        step = max(1, len(low) // SCREEN_W)
+        highlights = []
+        for idx1, idx2, exchanged in zip(
+            low[::step].tolist(), high[::step].tolist(), swapped[::step].tolist()
+        ):
+            color = GREEN if exchanged else RED
+            highlights += ((idx1, color), (idx2, color))
+        self.__update_display(highlights)
+        if self._exporter is None and self._session.looping:
+            with self._session.profiler.phase("wait"):
+                pygame.time.delay(STAGE_DELAY)
+
+    def __highlight(self, color, *indices) -> None:
+        """
+        highlight the bars at the given indices in the next frame
+        Args:
+            color ([type]): the color to highlight the bars with
+            indices ([type]): the indices of the bars, None is ignored
+        """
+        for idx in indices:
+            if idx is not None:
+                self._highlights.append((idx, color))
+        if self._exporter is not None:
+            if self._exporter.tick():
+                self.__update_display()
+        elif self._frame_per_operation:
+            self.__update_display()
+        elif time.perf_counter() - self._last_frame >= FRAME_TIME:
+            self.__update_display()
+
+    def __update_display(self, highlights=None) -> None:
+        """
+        update the screen display (including the bar list display, the text display,
+        and also handle the user's input)
+        Args:
+            highlights ([type], optional): the (index, color) pairs to highlight
+                instead of the latest operations
+        """
+        if highlights is None:
+            highlights = self._highlights
+        if self._exporter is not None:
+            self._renderer.draw(self._bar_color, highlights)
+            self._session.show_running_instruction(self._screen)
+            self._exporter.capture(self._screen)
+        elif self._session.looping:
+            profiler = self._session.profiler
+            with profiler.phase("draw"):
+                self._renderer.draw(self._bar_color, highlights)
+                self._session.show_running_instruction(self._screen)
+            profiler.present()
+            with profiler.phase("input"):
+                self._session.running_input_handling()
+        self._highlights.clear()
+        self._last_frame = time.perf_counter()
+        if self._session.stop_sorting:
+            raise SortingStopped()
+
+
+def display_text(screen, string, pos_x, pos_y, color=GREEN, font=None) -> None:
     """
     display the text on the screen
     Args:
@@ -216,328 +742,153 @@ def display_text(screen, string, pos_x, pos_y, color=GREEN) -> None:
         pos_x ([type]): the x-coordinate where the text is located
         pos_y ([type]): the y-coordinate where the text is located
         color ([type], optional): text color (defaults to green)
+        font ([type], optional): text font (defaults to the font of the visualizer)
     """
-    text = _font.render(string, False, color)
+    text = (font or _font).render(string, False, color)
     screen.blit(text, (pos_x, pos_y))
 
 
-def swap_bars(arr, idx1, idx2) -> None:
+class _RacePane:
     """
-    swap 2 bars
-    Args:
-        arr ([type]): the array
-        idx1 ([type]): the index of the 1st bar
-        idx2 ([type]): the index of the 2nd bar
+    The bars of one algorithm of a race, with its name and counters above them
     """
-    arr[idx1], arr[idx2] = arr[idx2], arr[idx1]
 
-
-def show_bars(screen, bar_list, bar_color) -> None:
-    """
-    update the bars on the screen
-    Args:
-        screen ([type]): the screen
-        bar_list ([type]): the list of the bars
-        bar_color ([type]): the bars' color
-    """
-    # since we cannot clear a specific object on the pygame display,
-    # we must clear the screen and then re-display the bar list to show the changes on the list
-    screen.fill(BLACK)
-    for i in range(len(bar_list)):
-        __create_bar(screen, bar_list[i], i, bar_color[i])
+    def __init__(self, screen, rect, title: str, values, font) -> None:
+        """
+        Args:
+            screen ([type]): the screen to draw on
+            rect ([type]): the area of the screen the pane takes
+            title (str): the name of the algorithm
+            values ([type]): the bars before they are sorted
+            font ([type]): the font of the name and counters
+        """
+        x, y, width, height = rect
+        self._screen = screen
+        self._title_rect = (x, y, width - RACE_GAP, RACE_TITLE_H)
+        self._renderer = BarRenderer(
+            screen,
+            (
+                x,
+                y + RACE_TITLE_H,
+                width - RACE_GAP,
+                height - RACE_TITLE_H - RACE_GAP,
+            ),
+        )
+        self._renderer.set_values(values)
+        self._colors = [WHITE] * len(values)
+        self._highlights = []
+        self._title = title
+        self._font = font
+        self._counters = (0, 0, 0, 0)  # comparisons, swaps, writes, reads
+        self._result = None  # the time or the error, once finished
+        self.seconds = None  # the CPU time the algorithm took, once finished
+        self.rank = None  # the place of the algorithm once every one finished
+
+    def receive(self, message) -> bool:
+        """
+        Apply a message sent by the worker of the algorithm
+        Returns:
+            bool: False when the algorithm has finished
+        """
+        if message[0] == OPERATIONS:
+            _, self._counters, indices, values, highlights = message
+            # the net effect of the whole batch is applied at once
+            indices = np.frombuffer(indices, dtype=np.int64)
+            self._renderer.update(indices, np.frombuffer(values, dtype=np.int64))
+            self._highlights = [(idx, OPERATION_COLORS[op]) for op, idx in highlights]
+            return True
+
+        _, counters, seconds, error = message
+        if counters is not None:  # None when the worker died
+            self._counters = counters
+        self._highlights = []
+        if error is None:
+            self.seconds = seconds
+            self._result = f"{seconds:.2f}s"
+            self._colors = [YELLOW] * len(self._colors)
+        else:
+            self._result = error
+        return False
+
+    def draw(self) -> None:
+        self._renderer.draw(self._colors, self._highlights)
+        self._screen.fill(BLACK, self._title_rect)
+        x, y, _, _ = self._title_rect
+        title = self._title
+        if self.rank is not None:
+            title += f"  #{self.rank}"
+        if self._result is not None:
+            title += f"  {self._result}"
+        comparisons, swaps, writes, _ = self._counters
+        counters = (
+            f"{_short_number(comparisons)} cmp  {_short_number(swaps)} swp  "
+            f"{_short_number(writes)} wr"
+        )
+        color = YELLOW if self._result is not None else GREEN
+        display_text(self._screen, title, x + 4, y + 2, color, self._font)
+        display_text(self._screen, counters, x + 4, y + 18, GREEN, self._font)
 
 
-def quit() -> None:
+class _Session:
     """
-    quit the visualize and go back to the menu screen
+    The state of a sorting visualizer, shared with the trackers drawing on its
+    screen instead of living in the module, so every visualizer has its own
     """
-    global _looping, _stop_sorting
-    _looping = False
-    _stop_sorting = True
-    pygame.display.quit()
 
+    def __init__(self, profiler: FrameProfiler) -> None:
+        """
+        Args:
+            profiler (FrameProfiler): times the frames of the visualizer
+        """
+        self.profiler = profiler
+        self.looping = True  # keep the mainloop run
+        self.is_sorted = False  # check if the bar list is already sorted
+        self.stop_sorting = False  # stop the sorting process without quitting
 
-def __show_running_instruction(screen) -> None:
-    """
-    display the instruction text when the sorting process has already begun
-    Args:
-        screen ([type]): the screen
-    """
-    if not _stop_sorting and _looping:
-        display_text(screen, "ECS: Exit visualizer", 30, 10)
-        display_text(screen, "C: Stop sorting", 30, 30)
+    def quit(self) -> None:
+        """
+        quit the visualize and go back to the menu screen
+        """
+        self.looping = False
+        self.stop_sorting = True
+        pygame.display.quit()
 
+    def show_running_instruction(self, screen) -> None:
+        """
+        display the instruction text when the sorting process has already begun
+        Args:
+            screen ([type]): the screen
+        """
+        if not self.stop_sorting and self.looping:
+            screen.fill(BLACK, (0, 0, SCREEN_W, SHIFT_DOWN))
+            display_text(screen, "ECS: Exit visualizer", 30, 10)
+            display_text(screen, "C: Stop sorting", 30, 30)
+            display_text(screen, "F3/F4: Profiler/Timeline", 30, 50)
 
-def __create_bar(screen, value, index, color) -> None:
-    """
-    create a bar with a specific characteristics
-    Args:
-        screen ([type]): the screen to put the bar on
-        value ([type]): the value of the bar (which is also used to determine the bar's height)
-        index ([type]): the bar's index
-        color ([type]): the color of the bar
-    """
-    pos_x = index * BAR_WIDTH + BAR_WIDTH
-    pos_y = SCREEN_H + SHIFT_DOWN
-    height = value
-    # generate the bar with the desired characteristics
-    image = pygame.Surface([BAR_WIDTH, height])
-    rect = image.get_rect()
-    rect.bottomright = [pos_x, pos_y]
-    pygame.draw.rect(screen, color, rect)
+    def running_input_handling(self) -> None:
+        """
+        handle the keyboard and mouse input after the sorting has already begun
+        """
+        for event in pygame.event.get():
+            # F3/F4 -> show the frame profiler/save its timeline
+            if self.profiler.handle(event):
+                continue
+            if event.type == pygame.QUIT:
+                self.quit()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.quit()
+                # C -> stop sorting
+                elif event.key == pygame.K_c:
+                    self.stop_sorting = True
+                    self.is_sorted = False
 
 
-def __input_handling() -> None:
-    """
-    handle the keyboard and mouse input after the sorting has already begun
-    """
-    global _stop_sorting, _is_sorted
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            quit()
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                quit()
-            # C -> stop sorting
-            elif event.key == pygame.K_c:
-                _stop_sorting = True
-                _is_sorted = False
-
-
-def __update_display(screen, bar_list, bar_color) -> None:
+def _short_number(number: int) -> str:
     """
-    update the screen display (including the bar list display, the text display,
-    and also handle the user's input)
-    Args:
-        screen ([type]): the screen
-        bar_list ([type]): the list of bars
-        bar_color ([type]): the color of the bars
+    write a number with a k/M/G suffix, to keep the counters short
     """
-    if _looping:
-        show_bars(screen, bar_list, bar_color)
-        __show_running_instruction(screen)
-        pygame.display.update()
-        __input_handling()
-
-
-#######################################################################################
-######################### S O R T I N G   A L G O R I T H M S #########################
-#######################################################################################
-
-
-def selection_sort(screen, array, bar_color) -> None:
-    for i in range(0, len(array)):
-        min = array[i]
-        for j in range(i, len(array)):
-            if not _stop_sorting:
-                bar_color[i] = GREEN
-                bar_color[j] = RED
-                # if a new minimum is found then swap the old min and the new value
-                if array[j] < min:
-                    temp = min
-                    min = array[j]
-                    array[j] = temp
-                    array[i] = min
-                __update_display(screen, array, bar_color)
-            bar_color[j] = WHITE
-            bar_color[i] = WHITE
-
-
-def bubble_sort(screen, array, bar_color) -> None:
-    for i in range(0, len(array)):
-        for j in range(0, len(array) - i - 1):
-            if not _stop_sorting:
-                bar_color[j] = RED
-                bar_color[len(array) - i - 1] = GREEN
-                # compare the elements by pair
-                if array[j] > array[j + 1]:
-                    # swap to correct the order
-                    swap_bars(array, j, j + 1)
-                    # show bars on display
-                    __update_display(screen, array, bar_color)
-                bar_color[len(array) - i - 1] = WHITE
-                bar_color[j] = WHITE
-
-
-def insertion_sort(screen, arr, bar_color) -> None:
-    # Traverse through 1 to len(arr)
-    for i in range(1, len(arr)):
-        key = arr[i]
-        # Move elements of arr[0..i-1], that are
-        # greater than key, to one position ahead
-        # of their current position
-        j = i - 1
-        while j >= 0 and key < arr[j] and not _stop_sorting:
-            bar_color[i] = GREEN
-            bar_color[j] = RED
-            arr[j + 1] = arr[j]
-            j -= 1
-            # display the bars
-            __update_display(screen, arr, bar_color)
-            bar_color[j + 1] = WHITE
-            bar_color[NUM_OF_BARS - 1] = WHITE
-        arr[j + 1] = key
-        bar_color[i] = WHITE
-
-
-def merge_sort(screen, arr, bar_color) -> None:
-    __merge_sort(screen, arr, bar_color, 0, len(arr) - 1)
-
-
-def __merge_sort(screen, arr, bar_color, begin, end):
-    if begin < end and not _stop_sorting:
-        # find the mid point
-        mid = (begin + end) // 2
-        # keeps dividing the chunks in halves
-        __merge_sort(screen, arr, bar_color, begin, mid)
-        __merge_sort(screen, arr, bar_color, mid + 1, end)
-        # merge the halves together
-        l = begin
-        r = mid + 1
-        left_lim = mid
-        right_lim = end
-        temp = []
-
-        # merge process
-        while l <= left_lim and r <= right_lim:
-            if _stop_sorting:
-                break
-            # compare and put the smaller values in first
-            if arr[l] < arr[r]:
-                # update the display
-                bar_color[l] = GREEN
-                temp.append(arr[l])
-                pygame.time.delay(1)
-                __update_display(screen, arr, bar_color)
-                bar_color[l] = WHITE
-                l += 1
-            else:
-                # update the display
-                bar_color[r] = GREEN
-                temp.append(arr[r])
-                pygame.time.delay(1)
-                __update_display(screen, arr, bar_color)
-                bar_color[r] = WHITE
-                r += 1
-
-        # adding the leftover from the left subarray
-        while l <= left_lim:
-            if _stop_sorting:
-                break
-            bar_color[l] = GREEN
-            pygame.time.delay(3)
-            bar_color[l] = WHITE
-            # add to the array
-            temp.append(arr[l])
-            __update_display(screen, arr, bar_color)
-            l += 1
-
-        # adding the leftover from the right subarray
-        while r <= right_lim:
-            if _stop_sorting:
-                break
-            # update the display
-            bar_color[r] = GREEN
-            pygame.time.delay(3)
-            bar_color[r] = WHITE
-            # add to the array
-            temp.append(arr[r])
-            __update_display(screen, arr, bar_color)
-            r += 1
-
-        i, j = begin, 0
-        # copy the temp to the array
-        if not _stop_sorting:
-            while i < right_lim + 1:
-                # update the display
-                bar_color[i] = RED
-                arr[i] = temp[j]
-                pygame.time.delay(3)
-                __update_display(screen, arr, bar_color)
-                bar_color[i] = WHITE
-                i += 1
-                j += 1
-
-
-def quick_sort(screen, arr, bar_color) -> None:
-    __quick_sort(screen, arr, bar_color, 0, len(arr) - 1)
-
-
-def __quick_sort(screen, arr, bar_color, begin, end) -> None:
-    if begin < end:
-        pivot = arr[end]
-        j = begin - 1
-
-        for i in range(begin, end):
-            if not _stop_sorting:
-                bar_color[i] = RED
-                bar_color[j] = GREEN
-                if arr[i] < pivot:
-                    bar_color[j] = WHITE
-                    # increase j
-                    j += 1
-                    bar_color[j] = GREEN
-                    # then swap arr[j] with arr[i]
-                    swap_bars(arr, i, j)
-
-                # display the bars
-                pygame.time.delay(3)
-                __update_display(screen, arr, bar_color)
-                bar_color[i] = WHITE
-                bar_color[j] = WHITE
-
-        # the position for the pivot is where left values are less than and
-        # the right values are greater than the value at the pivot position
-        arr[end] = arr[j + 1]
-        arr[j + 1] = pivot
-        pivot_index = j + 1
-
-        # do the same process to the left partition and right partition
-        __quick_sort(screen, arr, bar_color, pivot_index + 1, end)
-        __quick_sort(screen, arr, bar_color, begin, pivot_index - 1)
-
-
-def heap_sort(screen, arr, bar_color):
-    def heapify(size: int, idx: int):
-        """
-        An inner helper function to perform max heapify process
-        Args:
-            arr (list): the array
-            size (int): the size limit
-            idx (int):  current index
-        """
-        if _stop_sorting:
-            return
-
-        max_idx = idx  # set the max index to be the current index
-        lidx = idx * 2 + 1  # the left child's index
-        ridx = idx * 2 + 2  # the right child's index
-
-        # find the biggest element among the root and 2 children
-        if lidx < size and arr[lidx] > arr[max_idx]:
-            max_idx = lidx
-        if ridx < size and arr[ridx] > arr[max_idx]:
-            max_idx = ridx
-
-        # if the max index has been changed
-        if max_idx != idx:
-            # swap the elements at current index and max index
-            swap_bars(arr, idx, max_idx)
-
-            # update the display
-            bar_color[idx] = GREEN
-            bar_color[max_idx] = RED
-            __update_display(screen, arr, bar_color)
-            pygame.time.delay(1)
-            bar_color[idx] = WHITE
-            bar_color[max_idx] = WHITE
-
-            # continue heapifying the affected subtree
-            heapify(size, max_idx)
-
-    for i in range(len(arr) // 2 - 1, -1, -1):
-        heapify(len(arr), i)
-
-    for i in range(len(arr) - 1, -1, -1):
-        swap_bars(arr, 0, i)  # move the root to the end of the array
-        heapify(i, 0)  # max heapify the reduced heap
+    for limit, suffix in ((10**9, "G"), (10**6, "M"), (10**3, "k")):
+        if number >= limit:
+            return f"{number / limit:.1f}{suffix}"
+    return str(number)